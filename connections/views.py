@@ -1,5 +1,4 @@
 import json
-import requests
 from datetime import date as date_type
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
@@ -7,6 +6,8 @@ from django.views.decorators.http import require_POST
 from django.conf import settings
 from django.utils import timezone
 
+from library import resilience
+
 GOOGLE_BOOKS_URL    = "https://www.googleapis.com/books/v1/volumes"
 PLACEHOLDER_COVER   = 'https://placehold.co/60x90/2D2D2D/C9A86A?text=N%2FA'
 SESSION_COMPLETE    = 'connections_completed'   # {str(puzzle_id): {guessHistory, mistakes, won}}
@@ -22,7 +23,7 @@ def _fetch_cover_from_api(title, author):
         'fields': 'items(volumeInfo(title,authors,imageLinks))',
     }
     try:
-        resp = requests.get(GOOGLE_BOOKS_URL, params=params, timeout=5)
+        resp = resilience.get('google_books', GOOGLE_BOOKS_URL, params=params, timeout=5)
         resp.raise_for_status()
         for item in resp.json().get('items', []):
             links = item.get('volumeInfo', {}).get('imageLinks', {})
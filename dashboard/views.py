@@ -1,20 +1,18 @@
 import json
-import requests
 
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.views.decorators.http import require_POST
-from django.conf import settings
 
 from library.models import Book
+from library import google_books
+from library.open_library import fetch_ol_data
+from library.subjects import set_book_subjects
 from library.views import (
-    GOOGLE_BOOKS_URL,
     format_book_data,
-    fetch_ol_data,
     get_or_create_author,
-    get_or_create_subjects,
 )
 from .models import ConnectionsPuzzle, ConnectionsGroup, ConnectionsBookEntry, ConnectionsDraft
 
@@ -32,15 +30,12 @@ DIFFICULTY_LEVELS = [
 # ── Utility ───────────────────────────────────────────────────────────────────
 
 def _get_or_fetch_book(google_book_id):
-    book = Book.objects.filter(google_book_id=google_book_id).first()
+    book = Book.objects.select_related('author').filter(google_book_id=google_book_id).first()
     if book:
         return book, None
 
-    api_url = f"{GOOGLE_BOOKS_URL}/{google_book_id}?key={getattr(settings, 'GOOGLE_BOOKS_API_KEY', '')}"
     try:
-        resp = requests.get(api_url, timeout=5)
-        resp.raise_for_status()
-        vol_data = resp.json()
+        vol_data = google_books.get_volume(google_book_id)
         book_info = format_book_data(vol_data['volumeInfo'], vol_data['id'])
     except Exception as e:
         return None, f"Could not fetch book '{google_book_id}' from Google Books: {e}"
@@ -71,7 +66,7 @@ def _get_or_fetch_book(google_book_id):
                     'isbn':          book_info.get('isbn'),
                 },
             )
-            book.subjects.set(get_or_create_subjects(combined_subjects))
+            set_book_subjects(book, combined_subjects)
     except Exception as e:
         return None, f"Could not save book to database: {e}"
 
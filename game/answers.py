@@ -0,0 +1,191 @@
+"""
+Maintains the CategoryAnswer matrix (which books satisfy which categories).
+
+Every Category is materialized, active or not, because archived puzzles keep
+referencing categories after they are retired from generation.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from library.models import Book
+from . import genres
+from .catalog import Catalog
+from .models import Category, CategoryAnswer, DailyPuzzle
+from .puzzle_cache import invalidate_puzzle
+from .rules import get_rule
+
+
+def matching_category_ids(book, categories):
+    # Genres come from the inverted index in one query; everything else from the rules
+    genre_ids = genres.genre_category_ids_for_book(book.pk)
+    return {
+        c.id for c in categories
+        if (c.id in genre_ids if c.logic_code.startswith("S") else get_rule(c.logic_code).matches(book))
+    }
+
+
+def refresh_book_answers(book_id):
+    """Re-evaluates one book against every category and stores the difference."""
+    book = (
+        Book.objects.select_related('author').prefetch_related('subjects')
+        .filter(pk=book_id).first()
+    )
+    if book is None:
+        return
+
+    wanted   = matching_category_ids(book, Category.objects.all())
+    existing = set(
+        CategoryAnswer.objects.filter(book_id=book_id).values_list('category_id', flat=True)
+    )
+
+    with transaction.atomic():
+        stale = existing - wanted
+        if stale:
+            CategoryAnswer.objects.filter(book_id=book_id, category_id__in=stale).delete()
+        CategoryAnswer.objects.bulk_create(
+            [CategoryAnswer(book_id=book_id, category_id=cid) for cid in wanted - existing],
+            ignore_conflicts=True,
+        )
+        if wanted != existing:
+            refresh_book_puzzle_answers(book_id, wanted, touched=wanted | existing)
+
+
+def refresh_category_answers(category):
+    """Re-evaluates one category against the whole catalog (vectorized)."""
+    # Always a fresh snapshot: another worker may have added books since ours was loaded
+    rows = [
+        CategoryAnswer(book_id=book_id, category_id=category.id)
+        for book_id in Catalog().book_ids_for(category.logic_code)
+    ]
+    with transaction.atomic():
+        CategoryAnswer.objects.filter(category_id=category.id).delete()
+        CategoryAnswer.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_all_answers():
+    """Drops and recomputes the whole matrix. Returns the number of rows written."""
+    catalog = Catalog()
+    rows = [
+        CategoryAnswer(book_id=book_id, category_id=category.id)
+        for category in Category.objects.all()
+        for book_id in catalog.book_ids_for(category.logic_code)
+    ]
+    with transaction.atomic():
+        CategoryAnswer.objects.all().delete()
+        CategoryAnswer.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def satisfied_category_ids(book_id, category_ids):
+    """Which of the given categories the book satisfies — one indexed query."""
+    return set(
+        CategoryAnswer.objects
+        .filter(book_id=book_id, category_id__in=category_ids)
+        .values_list('category_id', flat=True)
+    )
+
+
+def satisfied_pairs(book_ids, category_ids):
+    """(book_id, category_id) pairs that hold among the given books and categories — one query."""
+    return set(
+        CategoryAnswer.objects
+        .filter(book_id__in=book_ids, category_id__in=category_ids)
+        .values_list('book_id', 'category_id')
+    )
+
+
+def count_cell_answers(row_category_id, col_category_id):
+    """Number of catalog books that satisfy both categories of a cell."""
+    return (
+        CategoryAnswer.objects
+        .filter(category_id=row_category_id)
+        .filter(book__category_answers__category_id=col_category_id)
+        .count()
+    )
+
+
+# ── Per-puzzle answer sets ────────────────────────────────────────────────────
+
+def puzzle_cell_answers(rows, cols, catalog):
+    """Row-major list of 9 sorted book id lists for the given categories."""
+    return [
+        sorted(catalog.book_ids_for(r.logic_code, c.logic_code))
+        for r in rows for c in cols
+    ]
+
+
+def build_puzzle_answers(puzzle, catalog=None):
+    """Computes and stores a puzzle's cell answers without re-sending post_save."""
+    puzzle.cell_answers = puzzle_cell_answers(puzzle.get_rows(), puzzle.get_cols(), catalog or Catalog())
+    DailyPuzzle.objects.filter(pk=puzzle.pk).update(cell_answers=puzzle.cell_answers)
+    invalidate_puzzle(puzzle.date)
+
+
+def rebuild_category_puzzle_answers(category):
+    """Recomputes stored cell answers for every puzzle using `category`. Returns how many."""
+    slots = Q()
+    for slot in ('row_1', 'row_2', 'row_3', 'col_1', 'col_2', 'col_3'):
+        slots |= Q(**{f'{slot}_id': category.pk})
+    puzzles = list(
+        DailyPuzzle.objects.select_related('row_1', 'row_2', 'row_3', 'col_1', 'col_2', 'col_3').filter(slots)
+    )
+    if puzzles:
+        catalog = Catalog()
+        for puzzle in puzzles:
+            build_puzzle_answers(puzzle, catalog)
+    return len(puzzles)
+
+
+def rebuild_puzzle_answers(missing_only=False):
+    """Recomputes stored cell answers for every puzzle. Returns how many were written."""
+    puzzles = DailyPuzzle.objects.select_related('row_1', 'row_2', 'row_3', 'col_1', 'col_2', 'col_3')
+    if missing_only:
+        puzzles = puzzles.filter(cell_answers__isnull=True)
+    puzzles = list(puzzles)
+    if puzzles:
+        catalog = Catalog()
+        for puzzle in puzzles:
+            build_puzzle_answers(puzzle, catalog)
+    return len(puzzles)
+
+
+def refresh_book_puzzle_answers(book_id, category_ids, touched):
+    """
+    Adds or removes one book from the stored cell answers after its categories
+    changed. Only puzzles with a row and a column among `touched` can be affected.
+    The rows are locked while they are edited, so two books refreshed at once
+    can't each write back a copy missing the other's change.
+    """
+    def any_slot(prefix):
+        q = Q()
+        for i in (1, 2, 3):
+            q |= Q(**{f'{prefix}_{i}_id__in': touched})
+        return q
+
+    with transaction.atomic():
+        puzzles = (
+            DailyPuzzle.objects.select_for_update()
+            .filter(cell_answers__isnull=False).filter(any_slot('row'), any_slot('col'))
+        )
+        for puzzle in puzzles:
+            _update_cells(puzzle, book_id, category_ids)
+
+
+def _update_cells(puzzle, book_id, category_ids):
+    changed = False
+    for r, row_id in enumerate(puzzle.get_row_ids(), start=1):
+        for c, col_id in enumerate(puzzle.get_col_ids(), start=1):
+            should = row_id in category_ids and col_id in category_ids
+            if puzzle.cell_accepts(r, c, book_id) != should:
+                cell = puzzle.get_cell_answers(r, c)
+                if should:
+                    cell.append(book_id)
+                    cell.sort()
+                else:
+                    cell.remove(book_id)
+                changed = True
+    if changed:
+        DailyPuzzle.objects.filter(pk=puzzle.pk).update(cell_answers=puzzle.cell_answers)
+        # Readers must not re-cache the old answers before this commits
+        transaction.on_commit(lambda: invalidate_puzzle(puzzle.date))
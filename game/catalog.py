@@ -0,0 +1,147 @@
+"""
+Columnar, in-memory snapshot of the Book catalog for whole-catalog questions.
+
+Each Rule in game/rules.py can evaluate itself against a Catalog and return
+a boolean NumPy mask (one entry per book), so "which books satisfy SFantasy
+and Td99?" is two array operations instead of a Python call per book.
+
+The snapshot is loaded lazily with five queries and reused by the process
+until a Book, Author, Subject or Category changes here (see game/signals.py) or it is
+older than CATALOG_MAX_AGE, which covers writes made by other workers.
+"""
+import time
+
+import numpy as np
+
+from library.models import Author, Book, Subject
+from .models import Category
+from .rules import get_rule
+
+TITLE_FLAG_FIELDS = (
+    'title_has_digit', 'title_has_number', 'title_has_color', 'title_has_family', 'title_has_season',
+)
+
+AUTHOR_FLAG_FIELDS = ('has_initials', 'is_alliterative')
+
+
+class Catalog:
+    def __init__(self):
+        books = list(
+            Book.objects.order_by('pk')
+            .values_list(
+                'pk', 'normalized_title', 'publish_year', 'page_count', 'author_id',
+                'title_word_count', 'title_leading_word', *TITLE_FLAG_FIELDS,
+            )
+        )
+        self.book_ids = np.array([b[0] for b in books], dtype=object)
+        self._row_of  = {pk: i for i, pk in enumerate(self.book_ids)}
+
+        # ── Numbers ──
+        years = [b[2] for b in books]
+        pages = [b[3] for b in books]
+        self.has_year     = np.array([y is not None for y in years], dtype=bool)
+        self.publish_year = np.array([y or 0 for y in years], dtype=np.int64)
+        self.has_pages    = np.array([p is not None for p in pages], dtype=bool)
+        self.page_count   = np.array([p or 0 for p in pages], dtype=np.int64)
+
+        # ── Titles (precomputed feature columns on Book) ──
+        self.titles              = np.array([b[1] for b in books], dtype=str)
+        self.title_word_count    = np.array([b[5] for b in books], dtype=np.int64)
+        self.title_leading_words = np.array([b[6] for b in books], dtype=str)
+        self.title_flags         = {
+            field: np.array([b[7 + i] for b in books], dtype=bool)
+            for i, field in enumerate(TITLE_FLAG_FIELDS)
+        }
+
+        # ── Authors (precomputed name feature columns on Author) ──
+        authors = {
+            a[0]: a[1:] for a in
+            Author.objects.values_list('id', 'first_name', 'name_token_count', *AUTHOR_FLAG_FIELDS)
+        }
+        rows = [authors.get(b[4]) for b in books]
+        self.has_author         = np.array([row is not None for row in rows], dtype=bool)
+        self.author_first_names = np.array([row[0].lower() if row else "" for row in rows], dtype=str)
+        self.author_single_name = np.array([bool(row) and row[1] == 1 for row in rows], dtype=bool)
+        self.author_flags       = {
+            field: np.array([bool(row) and row[2 + i] for row in rows], dtype=bool)
+            for i, field in enumerate(AUTHOR_FLAG_FIELDS)
+        }
+
+        # ── Subjects (book row index -> subject id pairs) ──
+        subjects = list(Subject.objects.values_list('id', 'name'))
+        self.subject_ids   = np.array([s[0] for s in subjects], dtype=np.int64)
+        self.subject_names = np.array([s[1].lower() for s in subjects], dtype=str)
+
+        links = [
+            (self._row_of[book_id], subject_id)
+            for book_id, subject_id in Book.subjects.through.objects.values_list('book_id', 'subject_id')
+            if book_id in self._row_of
+        ]
+        self.link_book    = np.array([l[0] for l in links], dtype=np.int64)
+        self.link_subject = np.array([l[1] for l in links], dtype=np.int64)
+
+        # Genre inverted index (game/genres.py): logic code -> matching subject ids
+        genre_links = {}
+        for code, subject_id in Category.subjects.through.objects.values_list('category__logic_code', 'subject_id'):
+            genre_links.setdefault(code, []).append(subject_id)
+        self.genre_subject_ids = {code: np.array(ids, dtype=np.int64) for code, ids in genre_links.items()}
+
+        self._masks = {}
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def empty_mask(self):
+        return np.zeros(len(self), dtype=bool)
+
+    def subject_ids_matching(self, code, term):
+        # Indexed genres are a lookup; codes without a Category fall back to a name scan
+        if code in self.genre_subject_ids:
+            return self.genre_subject_ids[code]
+        return self.subject_ids[np.char.find(self.subject_names, term) >= 0]
+
+    def books_with_subjects(self, subject_ids):
+        mask = self.empty_mask()
+        mask[self.link_book[np.isin(self.link_subject, subject_ids)]] = True
+        return mask
+
+    # ── Queries ──
+
+    def code_mask(self, code):
+        """Memoized mask for a single code. Treat it as read-only."""
+        mask = self._masks.get(code)
+        if mask is None:
+            mask = self._masks[code] = get_rule(code).mask(self)
+        return mask
+
+    def mask(self, *codes):
+        """Books satisfying every given logic code."""
+        result = ~self.empty_mask()
+        for code in codes:
+            result &= self.code_mask(code)
+        return result
+
+    def count(self, *codes):
+        return int(self.mask(*codes).sum())
+
+    def book_ids_for(self, *codes):
+        return list(self.book_ids[self.mask(*codes)])
+
+
+CATALOG_MAX_AGE = 300  # seconds
+
+_catalog = None
+_loaded_at = 0.0
+
+
+def get_catalog():
+    global _catalog, _loaded_at
+    if _catalog is None or time.monotonic() - _loaded_at > CATALOG_MAX_AGE:
+        _catalog = Catalog()
+        _loaded_at = time.monotonic()
+    return _catalog
+
+
+def invalidate_catalog():
+    global _catalog
+    _catalog = None
@@ -0,0 +1,71 @@
+"""
+Inverted index for genre (S) categories: Category.subjects holds every Subject
+whose name contains the category's search term, so "which books are Horror?"
+is a join over library_book_subjects instead of a substring scan.
+
+The index is refreshed when a Category is saved and when a Subject is created
+or renamed (e.g. by library.subjects.resolve_subjects), see game/signals.py.
+"""
+from library.models import Book, Subject
+from .models import Category
+from .rules import get_rule, SubjectRule
+
+
+def genre_term(code):
+    rule = get_rule(code)
+    return rule.term if isinstance(rule, SubjectRule) else None
+
+
+def genre_categories():
+    return Category.objects.filter(logic_code__startswith="S")
+
+
+def rebuild_category_subjects(category):
+    """Re-matches one category against every subject name."""
+    term = genre_term(category.logic_code)
+    if term is None:
+        category.subjects.clear()
+        return 0
+    ids = [sid for sid, name in Subject.objects.values_list('id', 'name') if term in name.lower()]
+    category.subjects.set(ids)
+    return len(ids)
+
+
+def rebuild_genre_index():
+    """Rebuilds the index for every category. Returns the number of links."""
+    subjects = list(Subject.objects.values_list('id', 'name'))
+    links = 0
+    for category in Category.objects.all():
+        term = genre_term(category.logic_code)
+        ids = [sid for sid, name in subjects if term in name.lower()] if term else []
+        category.subjects.set(ids)
+        links += len(ids)
+    return links
+
+
+def index_subject(subject):
+    """
+    Files one subject under the genres whose term it contains.
+    Returns True when its genre memberships changed.
+    """
+    name = subject.name.lower()
+    wanted = {c.id for c in genre_categories() if genre_term(c.logic_code) in name}
+    current = set(subject.genre_categories.values_list('id', flat=True))
+    if wanted == current:
+        return False
+    subject.genre_categories.set(wanted)
+    return True
+
+
+def genre_category_ids_for_book(book_id):
+    """Every genre category the book satisfies, in one indexed query."""
+    return set(
+        Category.subjects.through.objects
+        .filter(subject__books=book_id)
+        .values_list('category_id', flat=True)
+        .distinct()
+    )
+
+
+def count_genre_books(category):
+    return Book.objects.filter(subjects__genre_categories=category).distinct().count()
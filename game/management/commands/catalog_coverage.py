@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from game.catalog import Catalog
+from game.models import Category
+
+class Command(BaseCommand):
+    help = 'Reports how many catalog books satisfy each category (vectorized over the whole catalog).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--include-inactive',
+            action='store_true',
+            help='Also report categories that are hidden from future puzzles.',
+        )
+
+    def handle(self, *args, **kwargs):
+        categories = Category.objects.order_by('logic_code')
+        if not kwargs['include_inactive']:
+            categories = categories.filter(is_active=True)
+
+        start = time.perf_counter()
+        catalog = Catalog()
+        loaded = time.perf_counter()
+
+        counts = [(category, catalog.count(category.logic_code)) for category in categories]
+        done = time.perf_counter()
+
+        for category, count in counts:
+            line = f"{category.logic_code:<16} {count:>6}  {category.display_name}"
+            self.stdout.write(self.style.WARNING(line) if count == 0 else line)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{len(catalog)} books x {len(counts)} categories. "
+            f"Snapshot {(loaded - start) * 1000:.1f}ms, evaluation {(done - loaded) * 1000:.1f}ms."
+        ))
@@ -1,6 +1,8 @@
+import time
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
+from game.catalog import Catalog
 from game.models import DailyPuzzle
 from game.utils import generate_puzzle_for_date
 
@@ -14,14 +16,31 @@ class Command(BaseCommand):
             action='store_true',
             help='Overwrite existing puzzles if they already exist for a date.',
         )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Number of days to generate, starting today (default 30).',
+        )
+        parser.add_argument(
+            '--min-answers',
+            type=int,
+            default=1,
+            help='Minimum number of catalog books every cell must accept (0 disables the check).',
+        )
 
     def handle(self, *args, **kwargs):
         start_date = timezone.now().date()
-        days_to_generate = 30
+        days_to_generate = kwargs['days']
         overwrite = kwargs['overwrite']
+        min_answers = kwargs['min_answers']
 
         self.stdout.write(f"Generating puzzles for {days_to_generate} days starting {start_date}...")
 
+        # One catalog snapshot serves the whole batch
+        started = time.perf_counter()
+        catalog = Catalog()
+
         for i in range(days_to_generate):
             target_date = start_date + timedelta(days=i)
             
@@ -33,11 +52,20 @@ class Command(BaseCommand):
 
             try:
                 # This calls your existing logic which picks random categories
-                puzzle = generate_puzzle_for_date(target_date)
+                puzzle = generate_puzzle_for_date(target_date, min_answers=min_answers, catalog=catalog)
                 
                 self.stdout.write(self.style.SUCCESS(f"[{target_date}] Success: {puzzle}"))
+                self._write_counts(puzzle)
                 
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"[{target_date}] Failed: {e}"))
 
-        self.stdout.write(self.style.SUCCESS("\nMonthly batch generation complete!"))
\ No newline at end of file
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"\nMonthly batch generation complete in {elapsed:.2f}s!"))
+
+    def _write_counts(self, puzzle):
+        rows, cols = puzzle.get_rows(), puzzle.get_cols()
+        width = max(len(c.logic_code) for c in rows + cols) + 2
+        self.stdout.write("    " + " " * width + "".join(f"{c.logic_code:>{width}}" for c in cols))
+        for row, counts in zip(rows, puzzle.cell_counts):
+            self.stdout.write("    " + f"{row.logic_code:<{width}}" + "".join(f"{n:>{width}}" for n in counts))
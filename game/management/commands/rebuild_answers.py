@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from game.answers import rebuild_all_answers, rebuild_puzzle_answers
+from game.genres import rebuild_genre_index
+from game.models import CategoryAnswer
+
+class Command(BaseCommand):
+    help = 'Rebuilds the genre index, the book x category answer matrix and every puzzle\'s stored cell answers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty',
+            action='store_true',
+            help='Only fill what is missing: an empty matrix and puzzles without answers (safe to run on every deploy).',
+        )
+
+    def handle(self, *args, **kwargs):
+        if_empty = kwargs['if_empty']
+
+        if if_empty and CategoryAnswer.objects.exists():
+            self.stdout.write("Answer matrix already populated, skipping.")
+        else:
+            self.stdout.write("Rebuilding genre index...")
+            links = rebuild_genre_index()
+            self.stdout.write(f"Indexed {links} genre/subject links.")
+
+            self.stdout.write("Rebuilding answer matrix...")
+            count = rebuild_all_answers()
+            self.stdout.write(self.style.SUCCESS(f"Stored {count} book/category answers."))
+
+        self.stdout.write("Rebuilding puzzle cell answers...")
+        count = rebuild_puzzle_answers(missing_only=if_empty)
+        self.stdout.write(self.style.SUCCESS(f"Done! Updated {count} puzzles."))
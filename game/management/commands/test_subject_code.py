@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from game.views import validate_cell_to_category
+from game.rules import get_rule
 from library.models import Book 
 
 class Command(BaseCommand):
@@ -20,13 +20,14 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR("No books found in database to test against."))
             return
 
-        self.stdout.write(f"Testing Subject Code: '{code}' against Book: '{book.title}'...")
+        # 3. Compile the code so a typo shows up as a NeverRule instead of a silent False
+        rule = get_rule(code)
+        self.stdout.write(f"Testing Subject Code: '{code}' ({rule!r}) against Book: '{book.title}'...")
 
-        # 3. Run validation
-        # (Ensure validate_cell_to_category expects a string code, not a Category object)
-        valid = validate_cell_to_category(code, book)
+        # 4. Run validation
+        valid = rule.matches(book)
         
-        # 4. Output result
+        # 5. Output result
         if valid:
             self.stdout.write(self.style.SUCCESS(f"RESULT: True (Match)"))
         else:
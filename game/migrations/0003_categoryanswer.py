@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_dailypuzzle'),
+        ('library', '0003_remove_book_cover_override'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_answers', to='library.book')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='game.category')),
+            ],
+            options={
+                'unique_together': {('book', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_categoryanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailypuzzle',
+            name='cell_answers',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+def index_genre_subjects(apps, schema_editor):
+    # Same matching as game.genres.rebuild_genre_index, frozen for the migration
+    Category = apps.get_model('game', 'Category')
+    Subject = apps.get_model('library', 'Subject')
+    subjects = list(Subject.objects.values_list('id', 'name'))
+    for category in Category.objects.filter(logic_code__startswith='S'):
+        term = category.logic_code[1:].lower()
+        category.subjects.set([sid for sid, name in subjects if term in name.lower()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_dailypuzzle_cell_answers'),
+        ('library', '0003_remove_book_cover_override'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='subjects',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='genre_categories', to='library.subject'),
+        ),
+        migrations.RunPython(index_genre_subjects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:52
+
+from django.db import migrations
+
+
+def clear_answers(apps, schema_editor):
+    # Title (N) categories now read Book's feature columns and "Ns" matches the first
+    # word rather than a raw prefix, so drop the stored answers. The deploy step
+    # `rebuild_answers --if-empty` recomputes them.
+    apps.get_model('game', 'CategoryAnswer').objects.all().delete()
+    apps.get_model('game', 'DailyPuzzle').objects.update(cell_answers=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_category_subjects'),
+        ('library', '0004_book_title_features'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_answers, migrations.RunPython.noop),
+    ]
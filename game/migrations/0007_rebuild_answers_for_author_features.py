@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:05
+
+from django.db import migrations
+
+
+def clear_answers(apps, schema_editor):
+    # Author (A) categories now read Author's name feature columns and "AN" compares
+    # the parsed first name instead of searching the whole name, so drop the stored
+    # answers. The deploy step `rebuild_answers --if-empty` recomputes them.
+    apps.get_model('game', 'CategoryAnswer').objects.all().delete()
+    apps.get_model('game', 'DailyPuzzle').objects.update(cell_answers=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0006_rebuild_answers_for_title_features'),
+        ('library', '0005_author_name_features'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_answers, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from bisect import bisect_left
 import datetime
 
 class Category(models.Model):
@@ -29,6 +30,10 @@ class Category(models.Model):
     is_active = models.BooleanField(default=True, help_text="Uncheck to hide this category from future puzzles.")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Genre (S) categories only: the inverted index of subjects whose name contains
+    # the search term. Maintained by game/genres.py, so it isn't editable in the admin.
+    subjects = models.ManyToManyField('library.Subject', related_name='genre_categories', blank=True, editable=False)
+
     def __str__(self):
         return self.display_name
 
@@ -53,6 +58,10 @@ class DailyPuzzle(models.Model):
     col_2 = models.ForeignKey('Category', related_name='+', on_delete=models.CASCADE)
     col_3 = models.ForeignKey('Category', related_name='+', on_delete=models.CASCADE)
 
+    # Valid book ids for each cell, row-major (r1c1, r1c2, ... r3c3), each list sorted.
+    # Filled when the puzzle is saved and kept current by game/answers.py.
+    cell_answers = models.JSONField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -63,4 +72,40 @@ class DailyPuzzle(models.Model):
         return [self.row_1, self.row_2, self.row_3]
         
     def get_cols(self):
-        return [self.col_1, self.col_2, self.col_3]
\ No newline at end of file
+        return [self.col_1, self.col_2, self.col_3]
+
+    # Id-only variants that don't load the Category rows
+    def get_row_ids(self):
+        return [self.row_1_id, self.row_2_id, self.row_3_id]
+
+    def get_col_ids(self):
+        return [self.col_1_id, self.col_2_id, self.col_3_id]
+
+    def get_cell_answers(self, row_idx, col_idx):
+        """Sorted book ids for a 1-indexed cell, or None if not computed yet."""
+        if self.cell_answers is None:
+            return None
+        return self.cell_answers[(row_idx - 1) * 3 + (col_idx - 1)]
+
+    def cell_accepts(self, row_idx, col_idx, book_id):
+        """True/False from the stored answers, or None if they aren't computed."""
+        answers = self.get_cell_answers(row_idx, col_idx)
+        if answers is None:
+            return None
+        i = bisect_left(answers, book_id)
+        return i < len(answers) and answers[i] == book_id
+
+class CategoryAnswer(models.Model):
+    """
+    Materialized answer matrix: one row for every (book, category) pair where
+    the book satisfies the category. Kept current by game/signals.py and
+    rebuilt in bulk with `manage.py rebuild_answers`.
+    """
+    book = models.ForeignKey('library.Book', on_delete=models.CASCADE, related_name='category_answers')
+    category = models.ForeignKey('Category', on_delete=models.CASCADE, related_name='answers')
+
+    class Meta:
+        unique_together = [('book', 'category')]
+
+    def __str__(self):
+        return f"{self.book_id} satisfies {self.category_id}"
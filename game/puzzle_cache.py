@@ -0,0 +1,97 @@
+"""
+Process-local LRU cache of DailyPuzzle definitions, keyed by date.
+
+A cached puzzle is loaded once with its six categories (codes, display names,
+descriptions) and stored answers, so a guess costs one cache lookup instead of
+seven queries. Entries are checked against version tokens in the shared Django
+cache, which every worker sees:
+
+  * a global token, bumped when any Category or DailyPuzzle is saved/deleted
+  * a per-date token, bumped when a puzzle's stored answers are rewritten
+
+Both tokens are read with a single get_many, and a mismatch reloads the puzzle.
+Cached puzzles are shared between requests, so treat them as read-only.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .models import DailyPuzzle
+
+PUZZLE_CACHE_SIZE = 64
+
+GLOBAL_VERSION_KEY = 'game:puzzles:version'
+
+
+def _date_version_key(target_date):
+    return f'game:puzzles:version:{target_date.isoformat()}'
+
+
+class PuzzleCache:
+    def __init__(self, max_size=PUZZLE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()   # date -> (versions, puzzle)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, target_date):
+        """The puzzle for a date; raises DailyPuzzle.DoesNotExist like a plain .get()."""
+        versions = current_versions(target_date)
+        with self._lock:
+            entry = self._entries.get(target_date)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(target_date)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        puzzle = (
+            DailyPuzzle.objects
+            .select_related('row_1', 'row_2', 'row_3', 'col_1', 'col_2', 'col_3')
+            .get(date=target_date)
+        )
+        with self._lock:
+            self._entries[target_date] = (versions, puzzle)
+            self._entries.move_to_end(target_date)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return puzzle
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def current_versions(target_date):
+    date_key = _date_version_key(target_date)
+    found = cache.get_many([GLOBAL_VERSION_KEY, date_key])
+    versions = []
+    for key in (GLOBAL_VERSION_KEY, date_key):
+        version = found.get(key)
+        if version is None:
+            # Missing (never set, or evicted): mint one so nothing cached before counts
+            cache.add(key, uuid.uuid4().hex, None)
+            version = cache.get(key)
+        versions.append(version)
+    return tuple(versions)
+
+
+def invalidate_all_puzzles():
+    cache.set(GLOBAL_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_puzzle(target_date):
+    cache.set(_date_version_key(target_date), uuid.uuid4().hex, None)
+
+
+_puzzles = PuzzleCache()
+
+
+def get_puzzle(target_date):
+    return _puzzles.get(target_date)
@@ -0,0 +1,353 @@
+"""
+Compiles Category logic codes (see the code table in game/views.py) into
+reusable predicate objects.
+
+A logic code is parsed once into a Rule whose attributes hold everything the
+check needs (the subject term, the year prefix, the page limit, the title or
+author feature field...). Rules are cached per code for the life of the process, so
+validating a guess is just `get_rule(code).matches(book)`. Rules also know how
+to evaluate against the whole catalog at once: `rule.mask(catalog)` returns a
+boolean NumPy array (see game/catalog.py).
+"""
+import calendar
+
+import numpy as np
+from django.db.models import Q
+
+from library.features import TITLE_KEYWORD_FIELDS, normalize_title
+
+
+# ── Rules ─────────────────────────────────────────────────────────────────────
+
+class Rule:
+    """Base predicate. Subclasses precompute their state in __init__."""
+    family = None
+
+    def __init__(self, code):
+        self.code = code
+
+    def matches(self, book):
+        return False
+
+    def mask(self, catalog):
+        return catalog.empty_mask()
+
+    def __call__(self, book):
+        return self.matches(book)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.code!r}>"
+
+
+class NeverRule(Rule):
+    """Codes the validator doesn't understand never match (same as before)."""
+
+
+class SubjectRule(Rule):
+    family = "S"
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.term = code[1:].lower()
+
+    def matches(self, book):
+        return any(self.term in subject.name.lower() for subject in book.subjects.all())
+
+    def mask(self, catalog):
+        return catalog.books_with_subjects(catalog.subject_ids_matching(self.code, self.term))
+
+
+class AuthorRule(Rule):
+    """
+    Author checks read the name feature fields Author stores on save
+    (library/features.py); fetch guesses with select_related('author').
+    """
+    family = "A"
+    field = None
+
+    def matches(self, book):
+        if book.author is None:
+            return False
+        return bool(getattr(book.author, self.field))
+
+    def mask(self, catalog):
+        return catalog.author_flags[self.field].copy()
+
+    def as_q(self):
+        return Q(**{f'author__{self.field}': True})
+
+
+class AuthorFirstNameRule(AuthorRule):
+    def __init__(self, code):
+        super().__init__(code)
+        self.name = code[2:].lower()
+
+    def matches(self, book):
+        if book.author is None:
+            return False
+        return book.author.first_name.lower() == self.name
+
+    def mask(self, catalog):
+        return catalog.has_author & (catalog.author_first_names == self.name)
+
+    def as_q(self):
+        return Q(author__first_name__iexact=self.name)
+
+
+class AuthorInitialsRule(AuthorRule):
+    field = 'has_initials'
+
+
+class AuthorAlliterationRule(AuthorRule):
+    field = 'is_alliterative'
+
+
+class AuthorSingleNameRule(AuthorRule):
+    def matches(self, book):
+        if book.author is None:
+            return False
+        return book.author.name_token_count == 1
+
+    def mask(self, catalog):
+        return catalog.author_single_name.copy()
+
+    def as_q(self):
+        return Q(author__name_token_count=1)
+
+
+class TimeRule(Rule):
+    family = "T"
+
+    def matches(self, book):
+        if book.publish_year is None:
+            return False
+        return self.matches_year(book.publish_year)
+
+    def matches_year(self, year):
+        return False
+
+    def mask(self, catalog):
+        # Evaluate once per distinct year, then broadcast back to the books
+        years = np.unique(catalog.publish_year[catalog.has_year])
+        hits  = [year for year in years if self.matches_year(int(year))]
+        return catalog.has_year & np.isin(catalog.publish_year, hits)
+
+
+class YearPrefixRule(TimeRule):
+    """Century (Tc20 -> '19') and decade (Td99 -> '199') checks."""
+
+    def __init__(self, code, prefix):
+        super().__init__(code)
+        self.prefix = prefix
+        self.width = len(prefix)
+
+    def matches_year(self, year):
+        return str(year)[:self.width] == self.prefix
+
+
+class YearRangeRule(TimeRule):
+    def __init__(self, code, start, end):
+        super().__init__(code)
+        self.start = start
+        self.end = end
+
+    def matches_year(self, year):
+        return self.start <= year <= self.end
+
+    def mask(self, catalog):
+        years = catalog.publish_year
+        return catalog.has_year & (years >= self.start) & (years <= self.end)
+
+
+class LeapYearRule(TimeRule):
+    def matches_year(self, year):
+        return calendar.isleap(year)
+
+    def mask(self, catalog):
+        years = catalog.publish_year
+        return catalog.has_year & (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+class LengthRule(Rule):
+    family = "L"
+
+    def __init__(self, code, limit, over):
+        super().__init__(code)
+        self.limit = limit
+        self.over = over
+
+    def matches(self, book):
+        if book.page_count is None:
+            return False
+        if self.over:
+            return book.page_count > self.limit
+        return book.page_count < self.limit
+
+    def mask(self, catalog):
+        if self.over:
+            return catalog.has_pages & (catalog.page_count > self.limit)
+        return catalog.has_pages & (catalog.page_count < self.limit)
+
+
+class TitleRule(Rule):
+    """
+    Title checks read the title_* feature fields Book stores on save
+    (library/features.py), so they never re-parse the title.
+    as_q() expresses the same check as a filter for SQL counts.
+    """
+    family = "N"
+
+    def as_q(self):
+        return Q(pk__in=[])
+
+
+class TitleWordCountRule(TitleRule):
+    def __init__(self, code, target, or_more):
+        super().__init__(code)
+        self.target = target
+        self.or_more = or_more
+
+    def matches(self, book):
+        if self.or_more:
+            return book.title_word_count >= self.target
+        return book.title_word_count == self.target
+
+    def mask(self, catalog):
+        if self.or_more:
+            return catalog.title_word_count >= self.target
+        return catalog.title_word_count == self.target
+
+    def as_q(self):
+        if self.or_more:
+            return Q(title_word_count__gte=self.target)
+        return Q(title_word_count=self.target)
+
+
+class TitleKeywordRule(TitleRule):
+    def __init__(self, code, keyword_family, digits=False):
+        super().__init__(code)
+        self.field = TITLE_KEYWORD_FIELDS.get(keyword_family, (None, None))[0]
+        self.fields = [f for f in (self.field, 'title_has_digit' if digits else None) if f]
+
+    def matches(self, book):
+        return any(getattr(book, field) for field in self.fields)
+
+    def mask(self, catalog):
+        mask = catalog.empty_mask()
+        for field in self.fields:
+            mask |= catalog.title_flags[field]
+        return mask
+
+    def as_q(self):
+        q = Q(pk__in=[])
+        for field in self.fields:
+            q |= Q(**{field: True})
+        return q
+
+
+class TitleStartsRule(TitleRule):
+    """Ns___: the title's first word (or first words, for a phrase) is ___."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.phrase = normalize_title(code[2:])
+        self.single_word = " " not in self.phrase
+
+    def matches(self, book):
+        if self.single_word:
+            return book.title_leading_word == self.phrase
+        return (book.normalized_title + " ").startswith(self.phrase + " ")
+
+    def mask(self, catalog):
+        if self.single_word:
+            return catalog.title_leading_words == self.phrase
+        return np.char.startswith(np.char.add(catalog.titles, " "), self.phrase + " ")
+
+    def as_q(self):
+        if self.single_word:
+            return Q(title_leading_word=self.phrase)
+        return Q(normalized_title=self.phrase) | Q(normalized_title__startswith=self.phrase + " ")
+
+
+# ── Compiler ──────────────────────────────────────────────────────────────────
+
+def _decade_prefix(code):
+    # Td99 -> "199", Td22 -> "202": a first digit above 2 means the 1900s
+    century = code[2]
+    if int(century) > 2:
+        century = "1" + century
+    else:
+        century = century + "0"
+    return century + code[3]
+
+
+def compile_rule(code):
+    """
+    Parses a logic code into a Rule. Unknown codes compile to a NeverRule;
+    malformed numbers raise ValueError/IndexError exactly like the old parser.
+    """
+    family = code[:1]
+    kind = code[1:2]
+
+    if family == "S":
+        return SubjectRule(code)
+
+    if family == "A":
+        if kind == "N":
+            return AuthorFirstNameRule(code)
+        author_rules = {
+            "ini": AuthorInitialsRule,
+            "all": AuthorAlliterationRule,
+            "sin": AuthorSingleNameRule,
+        }
+        rule_class = author_rules.get(code[1:])
+        if rule_class:
+            return rule_class(code)
+
+    elif family == "T":
+        if kind == "c":
+            return YearPrefixRule(code, str(int(code[2:]) - 1))
+        if kind == "d":
+            return YearPrefixRule(code, _decade_prefix(code))
+        if kind == "p":
+            return YearRangeRule(code, int(code[2:6]), int(code[6:]))
+        if kind == "m" and code[2:] == "leap":
+            return LeapYearRule(code)
+
+    elif family == "L":
+        if kind == "u":
+            return LengthRule(code, int(code[2:]), over=False)
+        if kind == "o":
+            return LengthRule(code, int(code[2:]), over=True)
+
+    elif family == "N":
+        if kind == "w":
+            target = int(code[2])
+            if len(code) == 3:
+                return TitleWordCountRule(code, target, or_more=False)
+            if code[3] == "+":
+                return TitleWordCountRule(code, target, or_more=True)
+        elif kind == "c":
+            cat_type = code[2:]
+            return TitleKeywordRule(code, cat_type, digits=(cat_type == "num"))
+        elif kind == "s":
+            return TitleStartsRule(code)
+
+    return NeverRule(code)
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+_rules = {}
+
+
+def get_rule(code):
+    """Returns the compiled Rule for a code, compiling it on first use."""
+    rule = _rules.get(code)
+    if rule is None:
+        rule = _rules[code] = compile_rule(code)
+    return rule
+
+
+def clear_rule_cache():
+    _rules.clear()
@@ -0,0 +1,129 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_save
+from django.dispatch import receiver
+
+from library.models import Author, Book, Subject
+from . import answers, genres
+from .catalog import invalidate_catalog
+from .models import Category, DailyPuzzle
+from .puzzle_cache import invalidate_all_puzzles
+from .rules import clear_rule_cache
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_rules(sender, instance, **kwargs):
+    # A renamed logic_code leaves the old entry behind, so drop the lot
+    clear_rule_cache()
+
+
+# ── Puzzle definition cache ───────────────────────────────────────────────────
+# Answer rewrites (which use .update()) invalidate their own date in answers.py.
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=DailyPuzzle)
+def invalidate_puzzle_cache(sender, **kwargs):
+    invalidate_all_puzzles()
+
+
+# ── Catalog snapshot ──────────────────────────────────────────────────────────
+# Registered before the answer handlers so they never read a stale snapshot.
+
+@receiver([post_save, post_delete], sender=Book)
+@receiver([post_save, post_delete], sender=Author)
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_catalog_snapshot(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(m2m_changed, sender=Book.subjects.through)
+@receiver(m2m_changed, sender=Category.subjects.through)
+def invalidate_catalog_subjects(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_catalog()
+
+
+# ── Genre inverted index ──────────────────────────────────────────────────────
+# Also ahead of the answer handlers, which read the index.
+
+@receiver(post_save, sender=Category)
+def index_category_subjects(sender, instance, raw=False, **kwargs):
+    if not raw:
+        genres.rebuild_category_subjects(instance)
+
+
+@receiver(post_save, sender=Subject)
+def index_subject_genres(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    # A brand new subject has no books yet; a renamed one may change their verdicts
+    if genres.index_subject(instance) and not created:
+        for book_id in instance.books.values_list('pk', flat=True):
+            answers.refresh_book_answers(book_id)
+
+
+# ── Answer matrix maintenance ─────────────────────────────────────────────────
+
+@receiver(post_save, sender=Category)
+def refresh_category_answers(sender, instance, raw=False, **kwargs):
+    if not raw:
+        answers.refresh_category_answers(instance)
+        # Stored cell answers are checked first, so puzzles using it must follow
+        answers.rebuild_category_puzzle_answers(instance)
+
+
+@receiver(post_save, sender=Book)
+def refresh_book_answers(sender, instance, raw=False, **kwargs):
+    if not raw:
+        answers.refresh_book_answers(instance.pk)
+
+
+@receiver(pre_save, sender=Author)
+def remember_author_name(sender, instance, **kwargs):
+    instance._previous_name = (
+        Author.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Author)
+def refresh_author_answers(sender, instance, created=False, raw=False, **kwargs):
+    # Author categories only look at the name, so skip saves that don't touch it
+    if raw or created or instance.name == getattr(instance, '_previous_name', None):
+        return
+    for book_id in instance.books.values_list('pk', flat=True):
+        answers.refresh_book_answers(book_id)
+
+
+@receiver(m2m_changed, sender=Book.subjects.through)
+def refresh_subject_answers(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            answers.refresh_book_answers(instance.pk)
+        return
+
+    # subject.books.add(...) and friends: instance is the Subject
+    if action == 'pre_clear':
+        instance._cleared_book_ids = list(instance.books.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        for book_id in pk_set:
+            answers.refresh_book_answers(book_id)
+    elif action == 'post_clear':
+        for book_id in getattr(instance, '_cleared_book_ids', []):
+            answers.refresh_book_answers(book_id)
+
+
+# ── Per-puzzle answer sets ────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=DailyPuzzle)
+def forget_stale_puzzle_answers(sender, instance, raw=False, **kwargs):
+    if raw or not instance.pk:
+        return
+    old = DailyPuzzle.objects.filter(pk=instance.pk).first()
+    if old is None or old.get_row_ids() + old.get_col_ids() != instance.get_row_ids() + instance.get_col_ids():
+        instance.cell_answers = None
+
+
+@receiver(post_save, sender=DailyPuzzle)
+def fill_puzzle_answers(sender, instance, raw=False, **kwargs):
+    if not raw and instance.cell_answers is None:
+        answers.build_puzzle_answers(instance)
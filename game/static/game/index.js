@@ -96,28 +96,58 @@ $(document).ready(function() {
         }
     });
 
-    // 3. Book Search (AJAX) - Unchanged
+    // 3. Book Search (streamed: local matches first, Google results appended)
+    let searchSeq = 0;
+
     $bookInput.on('input', function() {
         const query = $(this).val().trim();
         const $resultsContainer = $('#search-results');
         $resultsContainer.empty();
+        searchSeq++;
 
-        if (query.length >= 4) {
+        if (query.length >= 2) {
             $resultsContainer.html('<p style="color:var(--primary-beige); text-align:center; padding: 15px;">Searching...</p>');
             clearTimeout(window.searchTimeout);
-            window.searchTimeout = setTimeout(() => {
-                $.ajax({
-                    url: BOOK_SEARCH_URL,
-                    data: { q: query },
-                    success: function(data) { renderSearchResults(data); },
-                    error: function() {
-                        $resultsContainer.html('<p style="color:var(--error-red); text-align:center; padding: 15px;">Error connecting.</p>');
-                    }
-                });
-            }, 300);
+            window.searchTimeout = setTimeout(() => streamSearch(query, searchSeq), 300);
         }
     });
 
+    async function streamSearch(query, seq) {
+        const $resultsContainer = $('#search-results');
+        let shown = [];
+        try {
+            const resp = await fetch(`${BOOK_SEARCH_STREAM_URL}?q=${encodeURIComponent(query)}`);
+            if (!resp.ok) throw new Error(resp.status);
+            const reader  = resp.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (value) buffer += decoder.decode(value, { stream: true });
+                let newline;
+                while ((newline = buffer.indexOf('\n')) >= 0) {
+                    const line = buffer.slice(0, newline).trim();
+                    buffer = buffer.slice(newline + 1);
+                    if (!line) continue;
+                    if (seq !== searchSeq) { reader.cancel(); return; }   // user kept typing
+                    const chunk = JSON.parse(line);
+                    // An empty local phase keeps "Searching..." up while Google is asked
+                    if (chunk.phase === 'local' && chunk.results.length === 0) continue;
+                    shown = shown.concat(chunk.results);
+                    renderSearchResults(shown);
+                }
+                if (done) break;
+            }
+            if (seq === searchSeq && shown.length === 0) renderSearchResults(shown);
+        } catch (err) {
+            if (seq !== searchSeq) return;
+            if (shown.length === 0) {
+                $resultsContainer.html('<p style="color:var(--error-red); text-align:center; padding: 15px;">Error connecting.</p>');
+            }
+        }
+    }
+
     function renderSearchResults(books) {
         const $resultsContainer = $('#search-results');
         $resultsContainer.empty();
@@ -198,13 +228,21 @@ $(document).ready(function() {
                 data: JSON.stringify({ book_id: bookId, row: row, col: col, puzzle_date: CURRENT_PUZZLE_DATE }),
                 success: function(response) {
                     if (response.is_correct) {
-                        markCellCorrect(activeCell, response.book_title || bookTitle, bookAuthor, bookCover);
+                        markCellCorrect(activeCell, response.book_title || bookTitle, bookAuthor, bookCover, true, bookId);
                     } else {
                         markCellIncorrect(activeCell, response.book_title || bookTitle);
                     }
                     checkGameOver(); // Check if they ran out of guesses
                 },
                 error: function(xhr, status, error) {
+                    if (xhr.status === 429) {
+                        // Rate limited: the guess wasn't checked, so it shouldn't cost one
+                        guessesRemaining++;
+                        updateStatsUI();
+                        saveGameState();
+                        alert("You're guessing too quickly. Wait a few seconds and try again.");
+                        return;
+                    }
                     console.error("Error:", error);
                     markCellIncorrect(activeCell, bookTitle + ' (Error)');
                     checkGameOver();
@@ -218,7 +256,7 @@ $(document).ready(function() {
     }
 
     // 6. UI Update Functions
-    function markCellCorrect($cell, title, author, coverUrl, shouldSave= true) {
+    function markCellCorrect($cell, title, author, coverUrl, shouldSave= true, bookId = null) {
         // --- GAME STATE UPDATE: Increment Solved ---
         if ($cell.hasClass('solved-correctly')) return;
         if (shouldSave) {
@@ -231,7 +269,7 @@ $(document).ready(function() {
         $cell.addClass('solved-correctly');
 
         const bookHtml = `
-            <div class="book-result-final">
+            <div class="book-result-final" data-book-id="${bookId || ''}">
                 <img src="${coverUrl}" class="final-book-cover" alt="Cover of ${title}" onerror="this.onerror=null;this.src='https://placehold.co/150x220/101010/C9A86A?text=No+Cover'">
                 <p class="final-book-title">${title}</p>
                 <p class="final-book-author">${author}</p>
@@ -531,7 +569,9 @@ $(document).ready(function() {
                 bookData = {
                     title: $cell.find('.final-book-title').text(),
                     author: $cell.find('.final-book-author').text(),
-                    cover: $cell.find('.final-book-cover').attr('src')
+                    cover: $cell.find('.final-book-cover').attr('src'),
+                    // Lets the next visit re-check the board with one batch request
+                    bookId: $cell.find('.book-result-final').attr('data-book-id') || null
                 };
             }
 
@@ -577,12 +617,17 @@ $(document).ready(function() {
             isGameComplete = save.isGameComplete;
 
             if (save.grid) {
+                const toVerify = [];
                 save.grid.forEach(cellData => {
-                    if (cellData.status === 'SOLVED') {
-                        const $cell = $(`.input-box[data-row="${cellData.row}"][data-col="${cellData.col}"]`);
-                        markCellCorrect($cell, cellData.bookData.title, cellData.bookData.author, cellData.bookData.cover, false);
+                    if (cellData.status !== 'SOLVED') return;
+                    if (cellData.bookData.bookId) {
+                        toVerify.push(cellData);
+                    } else {
+                        // Older saves have no book id, so trust them as before
+                        restoreSolvedCell(cellData);
                     }
                 });
+                if (toVerify.length) verifySavedCells(toVerify);
             }
 
             // Force UI State if game was finished
@@ -599,6 +644,45 @@ $(document).ready(function() {
         }
     }
 
+    function restoreSolvedCell(cellData) {
+        const $cell = $(`.input-box[data-row="${cellData.row}"][data-col="${cellData.col}"]`);
+        const book = cellData.bookData;
+        markCellCorrect($cell, book.title, book.author, book.cover, false, book.bookId || null);
+    }
+
+    // Re-checks every restored cell in one request instead of one per cell
+    function verifySavedCells(cells) {
+        const csrfToken = $('input[name="csrfmiddlewaretoken"]').val();
+        $.ajax({
+            url: BOOK_VALIDATE_GRID_URL,
+            type: 'POST',
+            headers: { 'X-CSRFToken': csrfToken, 'Content-Type': 'application/json' },
+            data: JSON.stringify({
+                puzzle_date: CURRENT_PUZZLE_DATE,
+                guesses: cells.map(c => ({ book_id: c.bookData.bookId, row: c.row, col: c.col }))
+            }),
+            success: function(response) {
+                let rejected = 0;
+                response.results.forEach((result, i) => {
+                    if (result.is_correct) {
+                        restoreSolvedCell(cells[i]);
+                    } else {
+                        rejected++;
+                    }
+                });
+                if (rejected) {
+                    booksSolved = Math.max(0, booksSolved - rejected);
+                    updateStatsUI();
+                    saveGameState();
+                }
+            },
+            error: function() {
+                // Can't reach the server: show the save as it was
+                cells.forEach(restoreSolvedCell);
+            }
+        });
+    }
+
     $('#dev-reset-btn').on('click', function() {
         if(confirm("This will wipe your save and reload. Are you sure?")) {
             // Remove the ACTUAL key you are using in saveGameState()
@@ -1,3 +1,329 @@
+import calendar
+import string
+from datetime import date
+
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from library.models import Author, Book, Subject
+from . import puzzle_cache
+from .models import Category, CategoryAnswer, DailyPuzzle
+from .rules import NeverRule, compile_rule, get_rule
+from .views import get_daily_puzzle, validate_cell
+
+
+# ── Rule compilation ──────────────────────────────────────────────────────────
+
+def legacy_matches(c, book):
+    """
+    validate_cell_to_category as it was before logic codes were compiled,
+    for the codes whose meaning hasn't changed since (Ns and AN have).
+    """
+    if c[0] == "S":
+        return any(c[1:].lower() in subject.name.lower() for subject in book.subjects.all())
+
+    if c[0] == "A":
+        author_name = book.author.name
+        if c[1:] == "ini":
+            return any(
+                letter.isupper() and index + 1 < len(author_name) and author_name[index + 1] == "."
+                for index, letter in enumerate(author_name)
+            )
+        if c[1:] == "all":
+            names = author_name.split()
+            return len(names) >= 2 and names[0][0].lower() == names[-1][0].lower()
+        if c[1:] == "sin":
+            return len(author_name.split()) == 1
+
+    if c[0] == "T":
+        if c[1] == "c":
+            return str(book.publish_year)[:2] == str(int(c[2:]) - 1)
+        if c[1] == "d":
+            century = "1" + c[2] if int(c[2]) > 2 else c[2] + "0"
+            return str(book.publish_year)[:3] == century + c[3]
+        if c[1] == "p":
+            return int(c[2:6]) <= book.publish_year <= int(c[6:])
+        if c[1] == "m" and c[2:] == "leap":
+            return calendar.isleap(book.publish_year)
+
+    if c[0] == "L":
+        if c[1] == "u":
+            return book.page_count < int(c[2:])
+        if c[1] == "o":
+            return book.page_count > int(c[2:])
+
+    if c[0] == "N":
+        title = book.title.lower()
+        if c[1] == "w":
+            count = len(title.split())
+            return count >= int(c[2]) if c[3:] == "+" else count == int(c[2])
+        if c[1] == "c":
+            title_words = set(title.translate(str.maketrans('', '', string.punctuation)).split())
+            keywords = {
+                "num": {
+                    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+                    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen",
+                    "eighteen", "nineteen", "twenty", "thirty", "forty", "fifty", "sixty", "seventy",
+                    "eighty", "ninety", "hundred", "thousand", "million", "billion"
+                },
+                "col": {
+                    "red", "blue", "green", "yellow", "gold", "silver", "black", "white",
+                    "orange", "purple", "brown", "pink", "gray", "grey", "violet", "indigo",
+                    "scarlet", "crimson", "emerald", "ruby", "sapphire"
+                },
+                "fam": {
+                    "mother", "father", "sister", "brother", "daughter", "son", "aunt", "uncle",
+                    "wife", "husband", "mom", "dad", "parent", "child", "grandmother", "grandfather",
+                    "grandma", "grandpa", "niece", "nephew", "cousin", "stepmother", "stepfather"
+                },
+                "sea": {"spring", "summer", "autumn", "fall", "winter"},
+            }[c[2:]]
+            if c[2:] == "num" and any(char.isdigit() for char in title):
+                return True
+            return not keywords.isdisjoint(title_words)
+
+    return False
+
+
+class RuleCompilationTests(TestCase):
+    CODES = [
+        'SFantasy', 'Sfiction', 'Aini', 'Aall', 'Asin',
+        'Tc20', 'Tc19', 'Td99', 'Td22', 'Td05', 'Tp19001950', 'Tmleap',
+        'Lu200', 'Lo400', 'Nw1', 'Nw3', 'Nw3+', 'Ncnum', 'Nccol', 'Ncfam', 'Ncsea',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        fantasy = Subject.objects.create(name='Fantasy')
+        scifi   = Subject.objects.create(name='Science Fiction')
+        books = [
+            ('Tolkien, J.R.R.', 'The Hobbit', 1937, 310, [fantasy]),
+            ('Marilyn Monroe', 'My Story', 1974, 180, []),
+            ('Homer', 'The Odyssey', -700, 541, [fantasy]),
+            ('Ray Bradbury', 'Fahrenheit 451', 1953, 256, [scifi]),
+            ('Toni Morrison', 'The Bluest Eye', 1970, 224, []),
+            ('Zadie Smith', 'White Teeth', 2000, 448, []),
+            ('Lucy Maud Montgomery', 'Anne of Green Gables', 1908, 320, []),
+            ('Kazuo Ishiguro', 'The Remains of the Day', 1989, 245, []),
+            ('Sally Rooney', 'Scared Sons, Red Summer!', 2024, 199, [scifi]),
+            ('Ivan Turgenev', 'Fathers and Sons', 1862, 226, []),
+            ('N. K. Jemisin', 'The Fifth Season', 2015, 468, [fantasy, scifi]),
+            ('Colm Toibin', 'Brooklyn', 2009, 262, []),
+        ]
+        for i, (author, title, year, pages, subjects) in enumerate(books):
+            book = Book.objects.create(
+                google_book_id=f'b{i}', title=title, author=Author.objects.create(name=author),
+                publish_year=year, page_count=pages,
+            )
+            book.subjects.set(subjects)
+
+    def test_compiled_rules_agree_with_the_legacy_parser(self):
+        books = Book.objects.select_related('author').prefetch_related('subjects')
+        for book in books:
+            for code in self.CODES:
+                with self.subTest(book=book.title, code=code):
+                    self.assertEqual(get_rule(code).matches(book), legacy_matches(code, book))
+
+    def test_missing_year_or_page_count_never_matches(self):
+        book = Book.objects.create(google_book_id='bare', title='Untitled', author=Author.objects.create(name='Anon'))
+        for code in ('Tc20', 'Td99', 'Tp19001950', 'Tmleap', 'Lu200', 'Lo400'):
+            with self.subTest(code=code):
+                self.assertFalse(get_rule(code).matches(book))
+
+    def test_book_without_author_never_matches_author_rules(self):
+        book = Book.objects.create(google_book_id='orphan', title='Orphan')
+        for code in ('Aini', 'Aall', 'Asin', 'ANjane'):
+            with self.subTest(code=code):
+                self.assertFalse(get_rule(code).matches(book))
+
+    def test_unknown_codes_never_match(self):
+        for code in ('Xyz', 'Amystery', 'Tmprime', 'Lx100', 'Nq'):
+            with self.subTest(code=code):
+                self.assertIsInstance(compile_rule(code), NeverRule)
+
+    def test_malformed_numbers_raise_like_the_legacy_parser(self):
+        for code in ('Tcxx', 'Lu', 'Tp1900'):
+            with self.subTest(code=code), self.assertRaises(ValueError):
+                compile_rule(code)
+
+    def test_rules_are_cached_until_a_category_changes(self):
+        rule = get_rule('Tc20')
+        self.assertIs(get_rule('Tc20'), rule)
+        Category.objects.create(display_name='20th century', logic_code='Tc20')
+        self.assertIsNot(get_rule('Tc20'), rule)
+
+
+# ── Answer matrix maintenance ─────────────────────────────────────────────────
+
+class AnswerSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.colour  = Category.objects.create(display_name='Colour in the title', logic_code='Nccol')
+        cls.fantasy = Category.objects.create(display_name='Fantasy', logic_code='SFantasy')
+        cls.allit   = Category.objects.create(display_name='Alliterative author', logic_code='Aall')
+        cls.modern  = Category.objects.create(display_name='21st century', logic_code='Tc21')
+        cls.short   = Category.objects.create(display_name='Under 300 pages', logic_code='Lu300')
+        cls.author  = Author.objects.create(name='Sally Smith')
+        cls.book    = Book.objects.create(
+            google_book_id='b1', title='Blue Moon', author=cls.author, publish_year=1999, page_count=250,
+        )
+        cls.subject = Subject.objects.create(name='Epic Fantasy')
+
+    def answers(self):
+        return set(CategoryAnswer.objects.filter(book=self.book).values_list('category__logic_code', flat=True))
+
+    def test_saving_a_book_refreshes_its_answers(self):
+        self.assertEqual(self.answers(), {'Nccol', 'Aall', 'Lu300'})
+        self.book.title = 'Pale Moon'
+        self.book.publish_year = 2005
+        self.book.save()
+        self.assertEqual(self.answers(), {'Aall', 'Lu300', 'Tc21'})
+
+    def test_subject_links_refresh_answers_from_either_side(self):
+        self.book.subjects.add(self.subject)
+        self.assertIn('SFantasy', self.answers())
+        self.book.subjects.remove(self.subject)
+        self.assertNotIn('SFantasy', self.answers())
+
+        self.subject.books.add(self.book)
+        self.assertIn('SFantasy', self.answers())
+        self.subject.books.clear()
+        self.assertNotIn('SFantasy', self.answers())
+
+    def test_renaming_a_subject_refreshes_its_books(self):
+        romance = Subject.objects.create(name='Romance')
+        self.book.subjects.add(romance)
+        self.assertNotIn('SFantasy', self.answers())
+        romance.name = 'Romantic Fantasy'
+        romance.save()
+        self.assertIn('SFantasy', self.answers())
+
+    def test_renaming_an_author_refreshes_their_books(self):
+        self.author.name = 'Sally Rooney'
+        self.author.save()
+        self.assertNotIn('Aall', self.answers())
+
+    def test_new_category_is_filled_from_the_catalog(self):
+        category = Category.objects.create(display_name='Moon', logic_code='Nw2')
+        self.assertEqual(list(category.answers.values_list('book_id', flat=True)), ['b1'])
+
+    def test_puzzle_cell_answers_follow_the_book(self):
+        puzzle = DailyPuzzle.objects.create(
+            date=date(2026, 1, 1),
+            row_1=self.colour, row_2=self.fantasy, row_3=self.modern,
+            col_1=self.allit, col_2=self.short, col_3=self.fantasy,
+        )
+        puzzle.refresh_from_db()
+        self.assertTrue(puzzle.cell_accepts(1, 1, 'b1'))
+        self.assertFalse(puzzle.cell_accepts(3, 1, 'b1'))
+
+        self.book.title = 'Pale Moon'
+        self.book.publish_year = 2005
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+        puzzle.refresh_from_db()
+        self.assertFalse(puzzle.cell_accepts(1, 1, 'b1'))
+        self.assertTrue(puzzle.cell_accepts(3, 1, 'b1'))
+        self.assertTrue(puzzle.cell_accepts(3, 2, 'b1'))
+
+    def test_puzzle_cell_answers_follow_a_category_edit(self):
+        puzzle = DailyPuzzle.objects.create(
+            date=date(2026, 1, 2),
+            row_1=self.colour, row_2=self.fantasy, row_3=self.modern,
+            col_1=self.allit, col_2=self.short, col_3=self.fantasy,
+        )
+        self.assertFalse(validate_cell(self.book, 1, 3, target_date=puzzle.date))
+
+        self.modern.logic_code = 'Tc20'
+        self.modern.save()
+        puzzle.refresh_from_db()
+        self.assertTrue(puzzle.cell_accepts(3, 1, 'b1'))
+        self.assertTrue(validate_cell(self.book, 1, 3, target_date=puzzle.date))
+
+        self.colour.logic_code = 'Ncsea'
+        self.colour.save()
+        puzzle.refresh_from_db()
+        self.assertEqual(puzzle.get_cell_answers(1, 1), [])
+        self.assertFalse(validate_cell(self.book, 1, 1, target_date=puzzle.date))
+
+
+# ── Puzzle cache ──────────────────────────────────────────────────────────────
+
+class PuzzleCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = [
+            Category.objects.create(display_name=f'Under {pages} pages', logic_code=f'Lu{pages}')
+            for pages in (100, 200, 300, 400, 500, 600)
+        ]
+        cls.book = Book.objects.create(
+            google_book_id='b1', title='Blue Moon', author=Author.objects.create(name='Sally Smith'),
+            publish_year=1999, page_count=250,
+        )
+        cls.puzzles = [
+            DailyPuzzle.objects.create(
+                date=day,
+                row_1=cls.categories[0], row_2=cls.categories[1], row_3=cls.categories[2],
+                col_1=cls.categories[3], col_2=cls.categories[4], col_3=cls.categories[5],
+            )
+            for day in (date(2026, 3, 1), date(2026, 3, 2))
+        ]
+
+    def setUp(self):
+        self.cache = puzzle_cache.PuzzleCache()
+        patcher = mock.patch.object(puzzle_cache, '_puzzles', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.first, self.second = (puzzle.date for puzzle in self.puzzles)
+
+    def test_cached_puzzle_costs_one_query(self):
+        puzzle = get_daily_puzzle(self.first)
+        with self.assertNumQueries(1):   # the version tokens
+            self.assertIs(get_daily_puzzle(self.first), puzzle)
+        with self.assertNumQueries(1):
+            self.assertEqual((puzzle.row_1.display_name, puzzle.col_3.logic_code), ('Under 100 pages', 'Lu600'))
+            self.assertTrue(validate_cell(self.book, 1, 3, target_date=self.first))
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_missing_puzzle_raises(self):
+        with self.assertRaises(DailyPuzzle.DoesNotExist):
+            get_daily_puzzle(date(2026, 4, 1))
+
+    def test_category_save_invalidates_every_date(self):
+        first, second = get_daily_puzzle(self.first), get_daily_puzzle(self.second)
+        category = self.categories[0]
+        category.display_name = 'Very short'
+        category.save()
+        self.assertIsNot(get_daily_puzzle(self.first), first)
+        self.assertIsNot(get_daily_puzzle(self.second), second)
+        self.assertEqual(get_daily_puzzle(self.second).row_1.display_name, 'Very short')
+
+    def test_puzzle_save_invalidates_every_date(self):
+        first, second = get_daily_puzzle(self.first), get_daily_puzzle(self.second)
+        self.puzzles[1].row_1 = self.categories[5]
+        self.puzzles[1].save()
+        self.assertIsNot(get_daily_puzzle(self.first), first)
+        self.assertEqual(get_daily_puzzle(self.second).row_1, self.categories[5])
+
+    def test_answer_rewrite_invalidates_only_its_date(self):
+        first, second = get_daily_puzzle(self.first), get_daily_puzzle(self.second)
+        puzzle_cache.invalidate_puzzle(self.first)
+        self.assertIsNot(get_daily_puzzle(self.first), first)
+        self.assertIs(get_daily_puzzle(self.second), second)
+
+    def test_book_edit_reloads_puzzles_with_new_answers(self):
+        first = get_daily_puzzle(self.first)
+        self.assertFalse(validate_cell(self.book, 1, 2, target_date=self.first))
+        self.book.page_count = 150
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save()
+        self.assertIsNot(get_daily_puzzle(self.first), first)
+        self.assertTrue(validate_cell(self.book, 1, 2, target_date=self.first))
+
+    def test_least_recently_used_date_is_evicted(self):
+        self.cache.max_size = 1
+        first = get_daily_puzzle(self.first)
+        get_daily_puzzle(self.second)
+        self.assertEqual(len(self.cache), 1)
+        self.assertIsNot(get_daily_puzzle(self.first), first)
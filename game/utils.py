@@ -1,15 +1,31 @@
 import random
 from datetime import date
 from .models import Category, DailyPuzzle
+from .catalog import get_catalog
+from .answers import puzzle_cell_answers
 
-def generate_puzzle_for_date(target_date=None):
+def generate_puzzle_for_date(target_date=None, min_answers=0, max_attempts=50, catalog=None):
+    """
+    Picks 6 categories for a date and saves the DailyPuzzle.
+
+    With min_answers > 0 every one of the 9 cells must have at least that many
+    valid catalog books. Candidate grids are repaired (same-type category swaps)
+    and re-rolled up to max_attempts times, using the vectorized catalog masks.
+    The chosen per-cell counts are attached as puzzle.cell_counts when known.
+    """
     if target_date is None:
         target_date = date.today()
 
+    if min_answers > 0 and catalog is None:
+        catalog = get_catalog()
+
     # 1. Check if it already exists to prevent overwriting
     if DailyPuzzle.objects.filter(date=target_date).exists():
         print(f"Puzzle for {target_date} already exists.")
-        return DailyPuzzle.objects.get(date=target_date)
+        puzzle = DailyPuzzle.objects.get(date=target_date)
+        if catalog is not None:
+            puzzle.cell_counts = cell_answer_counts(puzzle.get_rows(), puzzle.get_cols(), catalog)
+        return puzzle
 
     # 2. Get all active categories
     all_cats = list(Category.objects.filter(is_active=True))
@@ -17,7 +33,40 @@ def generate_puzzle_for_date(target_date=None):
     if len(all_cats) < 6:
         raise ValueError("Not enough categories to generate a puzzle!")
 
-    # 3. Selection
+    # 3. Selection, re-rolled until every cell has enough answers
+    for attempt in range(max_attempts):
+        selected = _pick_grid(all_cats)
+        if not min_answers:
+            break
+        selected, lowest = _repair_grid(selected, all_cats, catalog, min_answers)
+        if lowest >= min_answers:
+            break
+    else:
+        raise ValueError(
+            f"No grid with at least {min_answers} answers per cell after {max_attempts} attempts!"
+        )
+
+    # 4. Create the DailyPuzzle (with its answer sets, if we already have a snapshot;
+    # otherwise the post_save signal computes them)
+    cell_answers = puzzle_cell_answers(selected[:3], selected[3:], catalog) if catalog is not None else None
+    puzzle = DailyPuzzle.objects.create(
+        date=target_date,
+        row_1=selected[0],
+        row_2=selected[1],
+        row_3=selected[2],
+        col_1=selected[3],
+        col_2=selected[4],
+        col_3=selected[5],
+        cell_answers=cell_answers,
+    )
+    
+    if cell_answers is not None:
+        puzzle.cell_counts = [[len(cell_answers[r * 3 + c]) for c in range(3)] for r in range(3)]
+
+    return puzzle
+
+
+def _pick_grid(all_cats):
     """ Selection for the Litgrid is relatively simple
     There are a few rules that define the way it can be made
     - No same category type can intersect
@@ -83,15 +132,39 @@ def generate_puzzle_for_date(target_date=None):
     # Finalize
     selected = row_bucket + col_bucket
 
-    # 4. Create the DailyPuzzle
-    puzzle = DailyPuzzle.objects.create(
-        date=target_date,
-        row_1=selected[0],
-        row_2=selected[1],
-        row_3=selected[2],
-        col_1=selected[3],
-        col_2=selected[4],
-        col_3=selected[5]
-    )
-    
-    return puzzle
\ No newline at end of file
+    return selected
+
+
+def cell_answer_counts(rows, cols, catalog):
+    """3x3 list of how many catalog books satisfy each row/col intersection."""
+    return [[catalog.count(r.logic_code, c.logic_code) for c in cols] for r in rows]
+
+
+def _lowest_cell(selected, catalog):
+    return min(min(row) for row in cell_answer_counts(selected[:3], selected[3:], catalog))
+
+
+def _repair_grid(selected, all_cats, catalog, min_answers):
+    """
+    Greedily swaps single categories for unused ones of the same type (S, A, T...)
+    while that raises the weakest cell. Same-type swaps keep the genre layout and
+    the one-per-type rule intact. Returns (grid, lowest cell count).
+    """
+    best = list(selected)
+    lowest = _lowest_cell(best, catalog)
+
+    improved = True
+    while improved and lowest < min_answers:
+        improved = False
+        for slot in range(6):
+            family = best[slot].logic_code[0]
+            for alternative in all_cats:
+                if alternative in best or alternative.logic_code[0] != family:
+                    continue
+                trial = best[:slot] + [alternative] + best[slot + 1:]
+                trial_lowest = _lowest_cell(trial, catalog)
+                if trial_lowest > lowest:
+                    best, lowest, improved = trial, trial_lowest, True
+                    break
+
+    return best, lowest
\ No newline at end of file
@@ -2,13 +2,19 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.views import View
 from library.models import Book
+from library.autocomplete import fuzzy_search
 from . import validation
-import calendar
+from . import answers
+from .rules import get_rule
 from .utils import generate_puzzle_for_date
+from .puzzle_cache import get_puzzle
 from .models import DailyPuzzle
 from datetime import date, datetime
 import json
 from django.views.decorators.csrf import csrf_exempt
+
+# BookSearchData only falls back to a fuzzy match this close (0..1, see library/fuzzy.py)
+FUZZY_TITLE_MIN_SCORE = 0.6
 """
 The Litgrid Category Validation uses a special code system to track the subjects in an efficient manner.
 
@@ -50,7 +56,7 @@ class DailyGame(View):
         else:
             target_date = date.today()
 
-        daily_puzzle = DailyPuzzle.objects.get(date=target_date)
+        daily_puzzle = get_daily_puzzle(target_date)
         
         context = {
             'row_categories': daily_puzzle.get_rows(),
@@ -78,8 +84,15 @@ def BookSearchData(request):
     if request.method == 'POST':
         title_input = request.POST.get('user_text_input', "").strip()
         try:
-            book = Book.objects.get(title__iexact=title_input)
-            url = f"https://covers.openlibrary.org/b/id/{book.cover_id}-M.jpg"
+            book = Book.objects.select_related('author').filter(title__iexact=title_input).first()
+            if book is None:
+                # Tolerate typos, missing articles and punctuation (library/fuzzy.py);
+                # no matches while a worker's index is still loading
+                matches = fuzzy_search(title_input, limit=1, min_score=FUZZY_TITLE_MIN_SCORE)
+                if not matches:
+                    raise Book.DoesNotExist
+                book = Book.objects.select_related('author').get(pk=matches[0][1]['id'])
+            url = book.thumbnail_url or ''
             return JsonResponse({
                 "success": True,
                 "title": book.title,
@@ -94,9 +107,10 @@ def BookSearchData(request):
     return JsonResponse({"success": False, "error": "An error occurred."}, status=500)
 
 def get_daily_puzzle(target_date=None):
+    # Served from the per-date puzzle cache (see game/puzzle_cache.py); read-only
     if target_date is None:
         target_date = date.today()
-    return DailyPuzzle.objects.get(date=target_date)
+    return get_puzzle(target_date)
 
 def get_cell_categories():
     # This is the method that defines the Categories for a given day (and therefore a given Litgrid).
@@ -118,170 +132,47 @@ def get_category_codes(target_date=None):
 # This view will validate that the book entered is correct for the given row & col the user guessed it in.
 # Each col/row will have a specific symbol to represent what it is asking
 # For example subject: historical fiction will be SHistorical or (subject)(seach_query)
+# The verdict comes from the puzzle's stored cell answers, falling back to the
+# materialized answer matrix (game/answers.py) if they haven't been computed yet.
 def validate_cell(book, col_idx, row_idx, target_date=None):
     # Pass the specific date to get the correct categories
-    row_codes, col_codes = get_category_codes(target_date)
-    
-    col = col_codes[col_idx - 1]
-    row = row_codes[row_idx - 1]
-
-    col_valid = validate_cell_to_category(col, book)
-    row_valid = validate_cell_to_category(row, book)
-    
-    if row_valid and col_valid:
-        return True
-    else:
-        return False
-
-def validate_cell_to_category(c, book):
-    if c[0] == "S": # Category Code: Subject
-
-
-        # For a subject code, we are going to simply look for the subject provided AFTER the S. If Book has subject, then valid.
-        cat_subject = c[1:]
-        for subject in book.subjects.all():
-            if cat_subject.lower() in subject.name.lower():
-                return True
-
-            
-    elif c[0] == "A": # Category Code: Author
-        author_name = book.author.name
-        if c[1] == "N": # Author with name
-            name = c[2:]
-            if name in author_name.lower():
-                return True
-        
-        author_cat = c[1:]
-        
-        if author_cat == "ini": # Author has initials
-            for index, letter in enumerate(author_name):
-                if letter.isupper():
-                    if index + 1 < len(author_name) and author_name[index + 1] == ".":
-                        return True
-
-        if author_cat == "all":
-        # Split name into parts (e.g. ["Marilyn", "Monroe"])
-            names = author_name.split()
-            # Need at least 2 names to compare
-            if len(names) >= 2:
-                # Compare first letter of First Name vs first letter of Last Name
-                if names[0][0].lower() == names[-1][0].lower():
-                    return True
-
-        if author_cat == "sin": # Author has a single name
-            # If splitting by space results in exactly 1 item
-            if len(author_name.split()) == 1:
-                return True
-        
-
-            
-
-    elif c[0] == "T": # Category Code: Time
-
-        if c[1] == "c": # Time Period: Century
-            century = c[2:]
-            century = int(century) - 1
-            if str(book.publish_year)[:2] == str(century):
-                return True
-            
-        elif c[1] == "d": # Time Period: Decade
-            century = c[2]
-            if int(century) > 2:
-                century = "1" + century
-            else:
-                century = century + "0"
-            decade = century + c[3]
-            if str(book.publish_year)[:3] == str(decade):
-                return True
-        
-        elif c[1] == "p": 
-            year1 = c[2:6]
-            year2 = c[6:]
-            if book.publish_year >= int(year1) and book.publish_year <= int(year2):
-                return True
-            
-        elif c[1] == "m":
-            if c[2:] == "leap":
-                if calendar.isleap(book.publish_year):
-                    return True
-
-
-    elif c[0] == "L": # Category Code: Length
-        if c[1] == "u": # Length under x
-            max_length = int(c[2:])
-            if book.page_count < max_length:
-                return True
-        elif c[1] == "o": # Length over x
-            min_length = int(c[2:])
-            if book.page_count > min_length:
-                return True
-            
-    elif c[0] == "N": # Category Code: Name/Title
-        title = book.title.lower()
-
-        if c[1] == "w": # Word count Logic
-            words = title.split()
-            count = len(words)
-            
-            target = c[2]
-            try:
-                if c[3] == "+": # Word count is x or greater
-                    if count >= int(target): 
-                        return True
-            except IndexError:
-                if count == int(target): 
-                    return True
-
-        if c[1] == "c": # Contains x in title
-
-            cat_type = c[2:]
-            keywords = set()
-
-            # For "Contains" checks, we need clean words to avoid partial matches 
-            # (e.g. preventing "Scared" from matching "Red")
-            import string
-            translator = str.maketrans('', '', string.punctuation)
-            # This creates a set of all individual words in the title, stripped of punctuation
-            title_words = set(title.translate(translator).split())
-
-            if cat_type == "num": # Ncnum
-                # Check for actual digits first (e.g. "1984")
-                if any(char.isdigit() for char in title):
-                    return True
-                # Number words
-                keywords = {
-                    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", 
-                    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", 
-                    "eighteen", "nineteen", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", 
-                    "eighty", "ninety", "hundred", "thousand", "million", "billion"
-                }
-            elif cat_type == "col": # Nccol
-                keywords = {
-                    "red", "blue", "green", "yellow", "gold", "silver", "black", "white", 
-                    "orange", "purple", "brown", "pink", "gray", "grey", "violet", "indigo", 
-                    "scarlet", "crimson", "emerald", "ruby", "sapphire"
-                }
-
-            elif cat_type == "fam": # Ncfam
-                keywords = {
-                    "mother", "father", "sister", "brother", "daughter", "son", "aunt", "uncle", 
-                    "wife", "husband", "mom", "dad", "parent", "child", "grandmother", "grandfather", 
-                    "grandma", "grandpa", "niece", "nephew", "cousin", "stepmother", "stepfather"
-                }
-
-            elif cat_type == "sea": # Ncsea
-                keywords = {"spring", "summer", "autumn", "fall", "winter"}
+    daily_puzzle = get_daily_puzzle(target_date)
 
-            # Efficiently check if ANY keyword exists in the title's word set
-            # !isdisjoint returns True if there is at least one common element
-            if not keywords.isdisjoint(title_words):
-                return True
+    accepted = daily_puzzle.cell_accepts(row_idx, col_idx, book.pk)
+    if accepted is not None:
+        return accepted
 
-        if c[1] == "s": # Start Word is x
-            start_word = c[2:]
-            if title.startswith(start_word):
-                return True
+    col_id = daily_puzzle.get_col_ids()[col_idx - 1]
+    row_id = daily_puzzle.get_row_ids()[row_idx - 1]
 
+    satisfied = answers.satisfied_category_ids(book.pk, [row_id, col_id])
+    return row_id in satisfied and col_id in satisfied
 
-    return False
+def validate_cells(guesses, target_date=None):
+    """
+    Validates a batch of (book_id, row_idx, col_idx) guesses against one puzzle.
+    The puzzle is loaded once and any cells without stored answers share a
+    single matrix query. Returns the verdicts in the same order.
+    """
+    daily_puzzle = get_daily_puzzle(target_date)
+    row_ids = daily_puzzle.get_row_ids()
+    col_ids = daily_puzzle.get_col_ids()
+
+    verdicts = [daily_puzzle.cell_accepts(row, col, book_id) for book_id, row, col in guesses]
+
+    pending = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    if pending:
+        satisfied = answers.satisfied_pairs(
+            {guesses[i][0] for i in pending}, row_ids + col_ids
+        )
+        for i in pending:
+            book_id, row, col = guesses[i]
+            verdicts[i] = (
+                (book_id, row_ids[row - 1]) in satisfied
+                and (book_id, col_ids[col - 1]) in satisfied
+            )
+    return verdicts
 
+def validate_cell_to_category(c, book):
+    # Logic codes are compiled once per process (see game/rules.py)
+    return get_rule(c).matches(book)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Book, Author, Subject
+from .models import Book, Author, Job, Subject
 # Register your models here.
 
 
@@ -8,4 +8,9 @@ admin.site.register(Subject)
 
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
-    search_fields = ('title', 'author__name')
\ No newline at end of file
+    search_fields = ('title', 'author__name')
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'run_after', 'updated_at')
+    list_filter  = ('status', 'kind')
@@ -0,0 +1,222 @@
+"""
+In-process prefix index for typeahead, answering short queries (under the
+4-character cutoff of the full search) without touching the DB or Google.
+
+Every worker holds its own copy. Keys are normalized title and author strings
+plus every word-start suffix of them ("the hobbit" -> "the hobbit", "hobbit"),
+kept in one sorted list so a prefix lookup is two bisects over a contiguous
+range: a trie's lookup cost with a flat list's memory footprint.
+
+Each build also produces a typo-tolerant FuzzyIndex (library/fuzzy.py) over
+the same books, used to top up prefix results and by fuzzy_search().
+
+The index is built when the worker starts (litgrid/wsgi.py) and rebuilt in a
+background thread when Books change here (library/signals.py) or it is older
+than AUTOCOMPLETE_MAX_AGE, which covers books added by other workers.
+Processes that never built one (run_worker, commands, the shell, tests)
+don't start rebuilding on writes. Lookups
+keep serving the previous index while a rebuild runs.
+"""
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connection
+
+from .features import PUNCTUATION_TABLE, normalize_title
+from .fuzzy import FuzzyIndex
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_MAX_AGE   = 600  # seconds
+AUTOCOMPLETE_MAX_BYTES = getattr(settings, 'AUTOCOMPLETE_MAX_BYTES', 16 * 1024 * 1024)
+
+PLACEHOLDER_COVER = 'https://placehold.co/55x80/4a4a4a/ffffff?text=N/A'
+
+# Match tiers, best first. Entries are added tier by tier, so when the memory
+# budget runs out it is the weakest kind of match that gets dropped.
+TITLE, TITLE_WORD, AUTHOR, AUTHOR_WORD = range(4)
+
+
+def normalize_key(text):
+    return " ".join(normalize_title(text).translate(PUNCTUATION_TABLE).split())
+
+
+def word_suffixes(key):
+    """'the hobbit' -> ['hobbit'] (every suffix starting at a later word)."""
+    words = key.split()
+    return [" ".join(words[i:]) for i in range(1, len(words))]
+
+
+class PrefixIndex:
+    def __init__(self, books, max_bytes=AUTOCOMPLETE_MAX_BYTES):
+        """`books` are (book_id, title, author_name, cover) rows."""
+        started = time.perf_counter()
+
+        self.max_bytes = max_bytes
+        self.books = {}
+        tiers = {tier: [] for tier in (TITLE, TITLE_WORD, AUTHOR, AUTHOR_WORD)}
+        for book_id, title, author_name, cover in books:
+            self.books[book_id] = {
+                'id':     book_id,
+                'title':  title,
+                'author': author_name or 'Unknown Author',
+                'cover':  (cover or PLACEHOLDER_COVER).replace('http://', 'https://'),
+            }
+            title_key = normalize_key(title)
+            author_key = normalize_key(author_name)
+            if title_key:
+                tiers[TITLE].append((title_key, TITLE, book_id))
+                tiers[TITLE_WORD] += [(key, TITLE_WORD, book_id) for key in word_suffixes(title_key)]
+            if author_key:
+                tiers[AUTHOR].append((author_key, AUTHOR, book_id))
+                tiers[AUTHOR_WORD] += [(key, AUTHOR_WORD, book_id) for key in word_suffixes(author_key)]
+
+        entries = []
+        self.size_bytes = sum(sys.getsizeof(b) for b in self.books.values())
+        self.truncated = False
+        for tier in (TITLE, TITLE_WORD, AUTHOR, AUTHOR_WORD):
+            for entry in tiers[tier]:
+                cost = sys.getsizeof(entry) + sys.getsizeof(entry[0])
+                if self.size_bytes + cost > max_bytes:
+                    self.truncated = True
+                    break
+                entries.append(entry)
+                self.size_bytes += cost
+            if self.truncated:
+                break
+
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+        self.size_bytes += sys.getsizeof(self.keys) + sys.getsizeof(self.entries)
+
+        self.fuzzy = FuzzyIndex(self.books.values())
+
+        self.built_at = time.monotonic()
+        self.build_seconds = time.perf_counter() - started
+
+    def lookup(self, prefix, limit=10):
+        """Display dicts for books whose title or author has a word starting with `prefix`."""
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return []
+
+        best = {}
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            key, tier, book_id = self.entries[i]
+            rank = (tier, key != prefix, len(self.books[book_id]['title']))
+            if book_id not in best or rank < best[book_id]:
+                best[book_id] = rank
+            i += 1
+
+        ranked = sorted(best, key=best.get)[:limit]
+        return [self.books[book_id] for book_id in ranked]
+
+    def stats(self):
+        return {
+            'books':         len(self.books),
+            'entries':       len(self.entries),
+            'fuzzy_grams':   len(self.fuzzy.postings),
+            'size_bytes':    self.size_bytes,
+            'max_bytes':     self.max_bytes,
+            'truncated':     self.truncated,
+            'build_seconds': round(self.build_seconds, 4),
+            'age_seconds':   round(time.monotonic() - self.built_at, 1),
+        }
+
+
+# ── Process-wide index ────────────────────────────────────────────────────────
+
+_index = None
+_state_lock = threading.Lock()
+_rebuilding = False
+_pending = False
+
+
+def build_index():
+    """Loads the catalog in one query and swaps in a fresh index."""
+    from .models import Book
+
+    global _index
+    rows = Book.objects.values_list('google_book_id', 'title', 'author__name', 'thumbnail_url')
+    _index = PrefixIndex(rows)
+    logger.info("Autocomplete index built: %s", _index.stats())
+    return _index
+
+
+def _rebuild():
+    global _rebuilding, _pending
+    try:
+        while True:
+            try:
+                build_index()
+            except Exception:
+                logger.exception("Autocomplete index rebuild failed")
+            with _state_lock:
+                # Books saved while we were loading need one more pass
+                if not _pending:
+                    _rebuilding = False
+                    return
+                _pending = False
+    finally:
+        connection.close()
+
+
+def in_use():
+    """True once this process holds an index or is building one."""
+    return _index is not None or _rebuilding
+
+
+def refresh_in_background():
+    """Rebuilds on a daemon thread; if one is already running, it runs once more."""
+    global _rebuilding, _pending
+    with _state_lock:
+        if _rebuilding:
+            _pending = True
+            return
+        _rebuilding = True
+    threading.Thread(target=_rebuild, name='autocomplete-index', daemon=True).start()
+
+
+FUZZY_MIN_LENGTH = 3   # shorter prefixes have too few trigrams to say anything
+
+
+def _current_index():
+    index = _index
+    if index is None or time.monotonic() - index.built_at > AUTOCOMPLETE_MAX_AGE:
+        refresh_in_background()
+    return index
+
+
+def suggest(prefix, limit=10):
+    """Typeahead results from the current index ([] until the first build lands)."""
+    index = _current_index()
+    if index is None:
+        return []
+    results = index.lookup(prefix, limit)
+    if len(results) < limit and len(prefix.strip()) >= FUZZY_MIN_LENGTH:
+        # Nothing starts with a misspelled prefix; fill in with close matches
+        seen = {book['id'] for book in results}
+        for _, book in index.fuzzy.search(prefix, limit):
+            if book['id'] not in seen and len(results) < limit:
+                results.append(book)
+    return results
+
+
+def fuzzy_search(query, limit=10, min_score=None):
+    """[(score, display dict)] from the current index ([] until the first build lands)."""
+    index = _current_index()
+    if index is None:
+        return []
+    if min_score is None:
+        return index.fuzzy.search(query, limit)
+    return index.fuzzy.search(query, limit, min_score=min_score)
+
+
+def index_stats():
+    return _index.stats() if _index is not None else None
@@ -0,0 +1,117 @@
+"""
+Derived features stored on library models so category checks (game/rules.py)
+are plain field comparisons instead of string parsing on every guess.
+"""
+import re
+import string
+
+
+# ── Title keyword families (Nc___ categories) ─────────────────────────────────
+
+NUMBER_WORDS = frozenset({
+    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen",
+    "eighteen", "nineteen", "twenty", "thirty", "forty", "fifty", "sixty", "seventy",
+    "eighty", "ninety", "hundred", "thousand", "million", "billion"
+})
+
+COLOR_WORDS = frozenset({
+    "red", "blue", "green", "yellow", "gold", "silver", "black", "white",
+    "orange", "purple", "brown", "pink", "gray", "grey", "violet", "indigo",
+    "scarlet", "crimson", "emerald", "ruby", "sapphire"
+})
+
+FAMILY_WORDS = frozenset({
+    "mother", "father", "sister", "brother", "daughter", "son", "aunt", "uncle",
+    "wife", "husband", "mom", "dad", "parent", "child", "grandmother", "grandfather",
+    "grandma", "grandpa", "niece", "nephew", "cousin", "stepmother", "stepfather"
+})
+
+SEASON_WORDS = frozenset({"spring", "summer", "autumn", "fall", "winter"})
+
+# Nc code suffix -> (Book flag field, keywords)
+TITLE_KEYWORD_FIELDS = {
+    "num": ("title_has_number", NUMBER_WORDS),
+    "col": ("title_has_color",  COLOR_WORDS),
+    "fam": ("title_has_family", FAMILY_WORDS),
+    "sea": ("title_has_season", SEASON_WORDS),
+}
+
+# Strips punctuation so "Scared" can't match "Red" and "Red," still does
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+LEADING_WORD_MAX_LENGTH = 100
+
+
+def normalize_title(title):
+    """Lowercased with whitespace collapsed: 'The  Hobbit ' -> 'the hobbit'."""
+    return " ".join((title or "").lower().split())
+
+
+def normalize_subject(name):
+    """Subject.normalized_name: ' Science  fiction' and 'Science Fiction' -> 'science fiction'."""
+    return " ".join((name or "").lower().split())
+
+
+def title_features(title):
+    """Every Book title_* feature field, computed from the raw title."""
+    normalized = normalize_title(title)
+    words = normalized.translate(PUNCTUATION_TABLE).split()
+    word_set = set(words)
+
+    features = {
+        'normalized_title':   normalized,
+        'title_word_count':   len(normalized.split()),
+        'title_leading_word': words[0][:LEADING_WORD_MAX_LENGTH] if words else "",
+        'title_has_digit':    any(char.isdigit() for char in normalized),
+    }
+    for field, keywords in TITLE_KEYWORD_FIELDS.values():
+        features[field] = not keywords.isdisjoint(word_set)
+    return features
+
+
+# ── Author names (A___ categories) ────────────────────────────────────────────
+
+INITIAL_PATTERN = re.compile(r'^[A-Z]\.?$')
+
+
+def parse_author_name(name):
+    """
+    Splits a full name into (first_name, last_name). "Walker, Alice" is
+    reordered, leading initials are skipped for the first name, so
+    "C. Stephen Evans" -> ("Stephen", "Evans"); a mononym has no last name.
+    """
+    name = (name or "").strip()
+    if not name:
+        return "", ""
+
+    if ',' in name:
+        last, _, rest = name.partition(',')
+        rest_parts = rest.split()
+        return (rest_parts[0] if rest_parts else last.strip()), last.strip()
+
+    parts = name.split()
+    if len(parts) == 1:
+        return name, ""
+
+    first = next((p for p in parts[:-1] if not INITIAL_PATTERN.match(p)), parts[0])
+    return first, parts[-1]
+
+
+def author_features(name):
+    """Every Author feature field, computed from the raw name."""
+    name = name or ""
+    first_name, last_name = parse_author_name(name)
+    tokens = name.split()
+    return {
+        'first_name':       first_name[:200],
+        'last_name':        last_name[:200],
+        'name_token_count': len(tokens),
+        # An uppercase letter followed by a period, like George R.R. Martin
+        'has_initials':     any(
+            letter.isupper() and name[index + 1:index + 2] == "."
+            for index, letter in enumerate(name)
+        ),
+        # First letter of the first and last tokens match, like Marilyn Monroe
+        'is_alliterative':  len(tokens) >= 2 and tokens[0][0].lower() == tokens[-1][0].lower(),
+    }
@@ -0,0 +1,129 @@
+"""
+Typo-tolerant matching over the catalog, in memory.
+
+Titles and author names are folded (case, punctuation, a leading "the"/"a"/
+"an") and indexed by character trigrams. A query collects candidates through
+the trigram postings, then each candidate is scored by the better of trigram
+similarity (Dice) and a bounded edit distance, so "hobit", "Hobbit" and
+"the hobbit!" all find The Hobbit. No database or network access.
+
+A FuzzyIndex is built alongside the prefix index in library/autocomplete.py
+and shares its refresh lifecycle.
+"""
+from collections import Counter, defaultdict
+
+from .features import PUNCTUATION_TABLE, normalize_title
+
+ARTICLES = ("the ", "a ", "an ")
+
+MIN_SCORE       = 0.45   # weaker candidates aren't returned
+CANDIDATE_LIMIT = 50     # candidates scored per query, by trigram overlap
+AUTHOR_WEIGHT   = 0.9    # an author match ranks just below an equal title match
+
+
+def fold(text):
+    """'The Hobbit, or There and Back Again' -> 'hobbit or there and back again'"""
+    folded = " ".join(normalize_title(text).translate(PUNCTUATION_TABLE).split())
+    for article in ARTICLES:
+        if folded.startswith(article) and len(folded) > len(article):
+            return folded[len(article):]
+    return folded
+
+
+def trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a, b):
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def bounded_edit_distance(a, b, bound):
+    """Levenshtein distance, or bound + 1 as soon as it must exceed bound."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+def similarity(query, text):
+    """0..1 score of how well a folded query matches a folded title or name."""
+    if not query or not text:
+        return 0.0
+    if query == text:
+        return 1.0
+    score = dice(trigrams(query), trigrams(text))
+    # Short strings have few trigrams, so a single typo costs a lot; edit distance doesn't
+    bound = max(1, len(query) // 4)
+    distance = bounded_edit_distance(query, text, bound)
+    if distance <= bound:
+        score = max(score, 1 - distance / max(len(query), len(text)))
+    return score
+
+
+class FuzzyIndex:
+    def __init__(self, books):
+        """`books` are display dicts with 'id', 'title' and 'author' (see autocomplete)."""
+        self.books = list(books)
+        self.titles = [fold(book['title']) for book in self.books]
+        self.authors = [fold(book['author']) for book in self.books]
+
+        self.postings = defaultdict(list)
+        for position, (title, author) in enumerate(zip(self.titles, self.authors)):
+            for gram in trigrams(title) | trigrams(author):
+                self.postings[gram].append(position)
+
+    def score(self, folded_query, position):
+        return max(
+            similarity(folded_query, self.titles[position]),
+            similarity(folded_query, self.authors[position]) * AUTHOR_WEIGHT,
+        )
+
+    def search(self, query, limit=10, min_score=MIN_SCORE):
+        """[(score, book dict)] best first."""
+        folded = fold(query)
+        if not folded:
+            return []
+
+        overlap = Counter()
+        for gram in trigrams(folded):
+            overlap.update(self.postings.get(gram, ()))
+
+        scored = []
+        for position, _ in overlap.most_common(CANDIDATE_LIMIT):
+            score = self.score(folded, position)
+            if score >= min_score:
+                scored.append((score, position))
+        scored.sort(key=lambda hit: (-hit[0], len(self.titles[hit[1]])))
+        return [(score, self.books[position]) for score, position in scored[:limit]]
+
+    def __len__(self):
+        return len(self.books)
+
+
+def rank_key(query, title, author=""):
+    """Sort key for search results: exact title, then title prefix, then closeness."""
+    folded = fold(query)
+    folded_title = fold(title)
+    if folded_title == folded:
+        tier = 0
+    elif folded_title.startswith(folded):
+        tier = 1
+    else:
+        tier = 2
+    score = max(similarity(folded, folded_title), similarity(folded, fold(author)) * AUTHOR_WEIGHT)
+    return (tier, -score)
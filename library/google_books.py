@@ -0,0 +1,238 @@
+"""
+Google Books API client.
+
+Search responses are cached in the shared 'google_books' cache (see CACHES in
+settings), keyed by the normalized query so "The Hobbit", "the  hobbit" and
+"the hobbit!" are one entry. Queries with no results are cached too, for the
+shorter GOOGLE_BOOKS_NEGATIVE_TTL, so repeated typos don't go upstream. Failed
+requests are never cached. Size is bounded by the cache's MAX_ENTRIES culling.
+
+Each volume a search returns is also stashed by volume id for a few minutes
+(VOLUME_STASH_TTL), so when a player picks one, get_volume() already has it
+and saving the guess skips the per-volume request. The stash only has to
+outlive a player's pick, so it doesn't hold the cache's entries for a day.
+
+Cache misses are single-flight: the first request for a query fetches it and
+concurrent requests for the same query wait for that result instead of making
+their own call. Threads in a worker wait on an Event; other workers see the
+leader's lock key in the shared cache and poll for the entry it writes.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+import requests
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from . import resilience
+from .features import PUNCTUATION_TABLE, normalize_title
+
+GOOGLE_BOOKS_API_KEY = getattr(settings, 'GOOGLE_BOOKS_API_KEY', '')
+GOOGLE_BOOKS_URL     = "https://www.googleapis.com/books/v1/volumes"
+SEARCH_MAX_RESULTS   = 15
+
+SEARCH_TTL       = getattr(settings, 'GOOGLE_BOOKS_SEARCH_TTL', 60 * 60 * 24)
+NEGATIVE_TTL     = getattr(settings, 'GOOGLE_BOOKS_NEGATIVE_TTL', 60 * 60)
+VOLUME_STASH_TTL = 10 * 60   # seconds; long enough for a player to pick a result
+
+# Shared hit/miss counters live in the default cache so culling can't reset them
+STATS_KEYS = {
+    'hits':           'google_books:search:hits',
+    'negative_hits':  'google_books:search:negative_hits',
+    'misses':         'google_books:search:misses',
+    'coalesced':      'google_books:search:coalesced',
+}
+
+# Single-flight: how long followers wait for the leader before fetching themselves
+COALESCE_WAIT  = 6      # seconds; covers the leader's retries
+COALESCE_POLL  = 0.1    # seconds between shared-cache checks
+LOCK_TTL       = 10     # seconds; a crashed leader's lock expires on its own
+
+
+def search_cache():
+    return caches['google_books']
+
+
+def normalize_query(query):
+    """Case, whitespace and punctuation folded: ' The Hobbit! ' -> 'the hobbit'."""
+    return " ".join(normalize_title(query).translate(PUNCTUATION_TABLE).split())
+
+
+def _search_key(normalized):
+    return 'search:' + hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def _volume_key(volume_id):
+    return f'volume:{volume_id}'
+
+
+# Exact counts for this worker, added to the shared totals in batches: at most
+# one write per stat every STATS_FLUSH_INTERVAL, not a DatabaseCache incr (a
+# read then a write) on every search. The shared totals lag by up to that much.
+STATS_FLUSH_INTERVAL = 60   # seconds
+
+_worker_counts  = Counter()
+_pending_counts = Counter()   # not yet in the shared totals
+_stats_lock     = threading.Lock()
+_last_flush     = time.monotonic()
+
+
+def _count(stat):
+    with _stats_lock:
+        _worker_counts[stat] += 1
+        _pending_counts[stat] += 1
+        due = time.monotonic() - _last_flush >= STATS_FLUSH_INTERVAL
+    if due:
+        flush_search_stats()
+
+
+def flush_search_stats():
+    """Adds this worker's pending counts to the shared totals."""
+    global _last_flush
+    with _stats_lock:
+        pending = dict(_pending_counts)
+        _pending_counts.clear()
+        _last_flush = time.monotonic()
+    for stat, n in pending.items():
+        key = STATS_KEYS[stat]
+        try:
+            cache.incr(key, n)
+        except ValueError:
+            cache.add(key, 0, None)
+            cache.incr(key, n)
+
+
+def search_cache_stats():
+    """{'shared': totals across workers, 'worker': this process's exact counts}"""
+    flush_search_stats()
+    values = cache.get_many(list(STATS_KEYS.values()))
+    with _stats_lock:
+        worker = {stat: _worker_counts[stat] for stat in STATS_KEYS}
+    return {
+        'shared': {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()},
+        'worker': worker,
+    }
+
+
+def fetch_search(query):
+    """
+    Raw `items` for a query straight from the API, or None if the request
+    failed (including while the circuit is open, see resilience.py).
+    """
+    params = {'q': query, 'maxResults': SEARCH_MAX_RESULTS, 'key': GOOGLE_BOOKS_API_KEY}
+    try:
+        resp = resilience.get('google_books', GOOGLE_BOOKS_URL, params=params, timeout=5)
+        resp.raise_for_status()
+        data = resp.json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return data.get('items', [])
+
+
+def search_volumes(query):
+    """
+    Raw `items` (id + volumeInfo) for a query, from the shared cache when
+    possible. Returns [] for no results and for failed requests.
+    """
+    normalized = normalize_query(query)
+    if not normalized:
+        return []
+
+    key   = _search_key(normalized)
+    items = search_cache().get(key)
+    if items is not None:
+        _count('hits' if items else 'negative_hits')
+        return items
+
+    _count('misses')
+    return _single_flight(query, normalized, key)
+
+
+# ── Single-flight ─────────────────────────────────────────────────────────────
+
+class _Flight:
+    def __init__(self):
+        self.done  = threading.Event()
+        self.items = []
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _single_flight(query, normalized, key):
+    # Within this worker: one thread leads, the rest wait for its result
+    with _flights_lock:
+        flight = _flights.get(normalized)
+        leader = flight is None
+        if leader:
+            flight = _flights[normalized] = _Flight()
+
+    if not leader:
+        if flight.done.wait(COALESCE_WAIT):
+            _count('coalesced')
+            return flight.items
+        return _fetch_and_store(query, key)
+
+    try:
+        flight.items = _shared_flight(query, key)
+    finally:
+        flight.done.set()
+        with _flights_lock:
+            _flights.pop(normalized, None)
+    return flight.items
+
+
+def _shared_flight(query, key):
+    # Across workers: whoever adds the lock key fetches, the others poll for its entry
+    lock_key = 'lock:' + key
+    if search_cache().add(lock_key, 1, LOCK_TTL):
+        try:
+            return _fetch_and_store(query, key)
+        finally:
+            search_cache().delete(lock_key)
+
+    deadline = time.monotonic() + COALESCE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(COALESCE_POLL)
+        found = search_cache().get_many([key, lock_key])
+        if key in found:
+            _count('coalesced')
+            return found[key]
+        if lock_key not in found:
+            break   # the leader gave up without caching (request failed)
+    return _fetch_and_store(query, key)
+
+
+def _fetch_and_store(query, key):
+    # Google gets the query as typed; the normalized form only keys the cache
+    items = fetch_search(query)
+    if items is None:
+        return []
+
+    items = [
+        {'id': item['id'], 'volumeInfo': item['volumeInfo']}
+        for item in items if item.get('id') and item.get('volumeInfo')
+    ]
+    search_cache().set(key, items, SEARCH_TTL if items else NEGATIVE_TTL)
+    if items:
+        search_cache().set_many({_volume_key(item['id']): item for item in items}, VOLUME_STASH_TTL)
+    return items
+
+
+def get_volume(volume_id):
+    """
+    One volume (id + volumeInfo): stashed from a recent search if possible,
+    otherwise fetched. Raises requests exceptions like a direct fetch would.
+    """
+    volume = search_cache().get(_volume_key(volume_id))
+    if volume is not None:
+        return volume
+
+    resp = resilience.get(
+        'google_books', f"{GOOGLE_BOOKS_URL}/{volume_id}", params={'key': GOOGLE_BOOKS_API_KEY}, timeout=5
+    )
+    resp.raise_for_status()
+    return resp.json()
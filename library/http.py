@@ -0,0 +1,128 @@
+"""
+Shared outbound HTTP client for Google Books, Open Library and Wikidata.
+
+Every call goes through a requests.Session, so connections are kept alive and
+reused (one urllib3 pool per host) instead of paying a TCP + TLS handshake per
+request. Sessions are per thread, since requests.Session isn't guaranteed to be
+thread-safe. All requests get the common User-Agent and a default timeout.
+
+Per-host counters are kept for http_stats(), and add_hook() registers extra
+callbacks, called after each request as
+hook(method, host, status_code_or_None, elapsed_seconds, error_or_None).
+
+Bulk jobs that must stay polite to a host (the ingestion commands) pass a
+HostRateLimiter as `limiter=` to space their requests. Those commands can also turn on the
+on-disk response cache (library/http_cache.py), which then answers GETs here
+before they reach the network.
+"""
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import http_cache
+
+USER_AGENT      = 'Litgrid/1.0 (https://github.com/colin-ingraham/litgrid; colinringraham@email.com)'
+DEFAULT_TIMEOUT = 5      # seconds
+POOL_HOSTS      = 8      # hosts with a kept-alive pool per session
+POOL_MAXSIZE    = 10     # connections kept per host
+
+_local = threading.local()
+_hooks = []
+_stats = defaultdict(lambda: {'requests': 0, 'errors': 0, 'seconds': 0.0})
+_stats_lock = threading.Lock()
+
+
+def get_session():
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+    return session
+
+
+def add_hook(hook):
+    _hooks.append(hook)
+
+
+def _record(method, host, response, elapsed, error):
+    with _stats_lock:
+        stats = _stats[host]
+        stats['requests'] += 1
+        stats['seconds'] += elapsed
+        if error is not None or response.status_code >= 500:
+            stats['errors'] += 1
+    status = response.status_code if response is not None else None
+    for hook in _hooks:
+        hook(method, host, status, elapsed, error)
+
+
+def request(method, url, **kwargs):
+    """Session-backed requests.request() with the shared defaults."""
+    limiter = kwargs.pop('limiter', None)
+    disk_cache = http_cache.active() if method == 'GET' else None
+    if disk_cache is not None:
+        cached = disk_cache.get(url, kwargs.get('params'))
+        if cached is not None:
+            return cached
+
+    if limiter is not None:
+        limiter.wait(url)   # after the cache check: hits don't need spacing out
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    host = urlsplit(url).hostname or ''
+    started = time.perf_counter()
+    _local.network_requests = network_requests() + 1
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except requests.exceptions.RequestException as exc:
+        _record(method, host, None, time.perf_counter() - started, exc)
+        raise
+    _record(method, host, response, time.perf_counter() - started, None)
+
+    if disk_cache is not None:
+        disk_cache.put(url, kwargs.get('params'), response)
+    return response
+
+
+def network_requests():
+    """Requests this thread has sent over the network (disk cache hits don't count)."""
+    return getattr(_local, 'network_requests', 0)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request('HEAD', url, **kwargs)
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).hostname or ''
+        with self._lock:
+            now  = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def http_stats():
+    """Per-host request counts, server/transport errors and total seconds for this process."""
+    with _stats_lock:
+        return {host: dict(stats) for host, stats in _stats.items()}
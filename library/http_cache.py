@@ -0,0 +1,198 @@
+"""
+On-disk cache of outbound GET responses for the ingestion commands, so a
+re-run doesn't download the same Open Library works, editions and Wikidata
+entities again and import logic can be iterated on at disk speed.
+
+Entries are content-addressed: the file name is a hash of the URL with its
+query parameters (from the URL and `params`) in sorted order, so the same
+request always lands on the same file whatever order the params come in.
+Headers aren't part of the key. Each file holds a JSON header line (status,
+headers, final URL, when it was stored) and then the raw body.
+
+  ttl        entries older than this are fetched again (HTTP_CACHE_TTL)
+  max_bytes  past this, least recently used entries are evicted (reads touch
+             the file) down to 90% of the cap (HTTP_CACHE_MAX_BYTES)
+  offline    never touch the network: hits are served whatever their age and
+             a miss raises OfflineMiss, a RequestException, so commands
+             handle it like any failed request
+
+Only 200 and 404 responses are stored; errors and rate limits are retried
+next time. The cache is off unless a command turns it on with configure(),
+after which library.http consults it for every GET in the process.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from django.conf import settings
+
+HTTP_CACHE_DIR       = getattr(settings, 'HTTP_CACHE_DIR', Path(settings.BASE_DIR) / '.http_cache')
+HTTP_CACHE_TTL       = getattr(settings, 'HTTP_CACHE_TTL', 60 * 60 * 24 * 30)
+HTTP_CACHE_MAX_BYTES = getattr(settings, 'HTTP_CACHE_MAX_BYTES', 1024 * 1024 * 1024)
+
+CACHEABLE_STATUSES = frozenset({200, 404})
+EVICT_TO           = 0.9   # of max_bytes, so eviction doesn't run on every write
+
+
+class OfflineMiss(requests.exceptions.ConnectionError):
+    pass
+
+
+def cache_key(url, params=None):
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if isinstance(params, dict) else params
+        query += [(str(k), str(v)) for k, v in items if v is not None]
+    canonical = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ''))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class DiskCache:
+    def __init__(self, directory=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES, offline=False):
+        self.directory = Path(directory)
+        self.ttl       = ttl
+        self.max_bytes = max_bytes
+        self.offline   = offline
+        self.counts    = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self._lock     = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.size_bytes = sum(path.stat().st_size for path in self._files())
+
+    def _files(self):
+        return self.directory.glob('*/*.cache')
+
+    def _path(self, key):
+        return self.directory / key[:2] / f'{key}.cache'
+
+    def _count(self, stat, n=1):
+        with self._lock:
+            self.counts[stat] += n
+
+    def get(self, url, params=None):
+        """A requests.Response rebuilt from disk, or None (OfflineMiss when offline)."""
+        path = self._path(cache_key(url, params))
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (FileNotFoundError, ValueError):
+            meta = None
+
+        if meta is not None and (self.offline or time.time() - meta['stored_at'] < self.ttl):
+            try:
+                os.utime(path)   # recently used, last to be evicted
+            except FileNotFoundError:
+                pass
+            self._count('hits')
+            response = requests.Response()
+            response.status_code = meta['status']
+            response.headers.update(meta['headers'])
+            response.url = meta['url']
+            response.encoding = meta.get('encoding')
+            response._content = body
+            response.from_cache = True
+            return response
+
+        self._count('misses')
+        if self.offline:
+            raise OfflineMiss(f"Not in the offline HTTP cache: {url}")
+        return None
+
+    def put(self, url, params, response):
+        if response.status_code not in CACHEABLE_STATUSES:
+            return
+        path = self._path(cache_key(url, params))
+        meta = {
+            'status':    response.status_code,
+            'headers':   dict(response.headers),
+            'url':       response.url,
+            'encoding':  response.encoding,
+            'stored_at': time.time(),
+        }
+        data = json.dumps(meta).encode() + b'\n' + response.content
+
+        path.parent.mkdir(exist_ok=True)
+        old_size = path.stat().st_size if path.exists() else 0
+        # Write then rename, so concurrent readers never see half a file
+        tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self.counts['stored'] += 1
+            self.size_bytes += len(data) - old_size
+            over = self.size_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self):
+        """Drops least recently used entries until the cache is under EVICT_TO of its cap."""
+        with self._lock:
+            files = sorted(
+                ((path.stat().st_mtime, path.stat().st_size, path) for path in self._files()),
+                key=lambda entry: entry[0],
+            )
+            target = self.max_bytes * EVICT_TO
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= target:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self.counts['evicted'] += 1
+            self.size_bytes = total
+
+    def summary(self):
+        counts = self.counts
+        mode = "offline" if self.offline else "online"
+        return (
+            f"HTTP cache ({mode}, {self.directory}): {counts['hits']} hits, {counts['misses']} misses, "
+            f"{counts['stored']} stored, {counts['evicted']} evicted, {self.size_bytes / 1024 / 1024:.1f} MiB"
+        )
+
+
+# ── Command integration ───────────────────────────────────────────────────────
+
+_active = None
+
+
+def active():
+    return _active
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '--no-http-cache',
+        action='store_true',
+        help='Always fetch from the network and leave the on-disk HTTP cache alone.'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Replay responses from the on-disk HTTP cache only; uncached requests fail.'
+    )
+    parser.add_argument(
+        '--http-cache-dir',
+        default=None,
+        help=f'Where to keep cached responses (default {HTTP_CACHE_DIR}).'
+    )
+
+
+def configure(options):
+    """Turns the cache on (or off) for this process from a command's options."""
+    global _active
+    if options.get('no_http_cache') and not options.get('offline'):
+        _active = None
+        return None
+
+    directory = Path(options.get('http_cache_dir') or HTTP_CACHE_DIR)
+    offline   = bool(options.get('offline'))
+    if _active is None or _active.directory != directory or _active.offline != offline:
+        _active = DiskCache(directory, offline=offline)
+    return _active
@@ -0,0 +1,113 @@
+"""
+A small DB-backed job queue, so slow follow-up work (Open Library lookups)
+happens after the player has their answer instead of before.
+
+    jobs.enqueue('enrich_book', book_id=...)    # inside the request
+    python manage.py run_worker                  # the 'worker' Procfile process
+
+Jobs are rows in library.Job. A worker claims one with a conditional UPDATE
+(pending -> running), which works the same on SQLite and Postgres and lets
+several workers share the table without taking a job twice. A failed job is
+retried with backoff up to MAX_ATTEMPTS, then left as 'failed' with its
+error. A job left 'running' by a crashed worker goes back to pending after
+STALE_AFTER. Finished jobs are deleted by prune() once they are KEEP_DAYS
+old; failed ones are kept for inspection.
+
+Enqueueing inside a transaction is safe: the row, like the data it refers
+to, only becomes visible to workers on commit. Handlers are registered with
+@handler in library/tasks.py.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF      = 30     # seconds before retry n is BACKOFF * 2**(n-1)
+STALE_AFTER  = 600    # seconds a job may stay 'running' before it's retried
+CLAIM_BATCH  = 10     # pending jobs looked at per claim attempt
+KEEP_DAYS    = 7      # days a finished job is kept before prune() deletes it
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, **payload):
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def requeue_stale():
+    cutoff = timezone.now() - timedelta(seconds=STALE_AFTER)
+    return Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff).update(status=Job.PENDING)
+
+
+def prune(days=KEEP_DAYS):
+    """Deletes jobs that finished more than `days` ago. Returns how many."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Job.objects.filter(status=Job.DONE, updated_at__lt=cutoff).delete()
+    return deleted
+
+
+def claim():
+    """The next due job, now marked running and owned by this caller, or None."""
+    now = timezone.now()
+    due = (
+        Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:CLAIM_BATCH]
+    )
+    for job_id in due:
+        # Another worker may have taken it since the SELECT; the UPDATE decides
+        claimed = Job.objects.filter(pk=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run(job):
+    """Runs a claimed job and records the outcome. Returns True on success."""
+    try:
+        func = HANDLERS[job.kind]
+        func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= MAX_ATTEMPTS or job.kind not in HANDLERS:
+            job.status = Job.FAILED
+            logger.error("Job %s failed for good:\n%s", job, job.last_error)
+        else:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(seconds=BACKOFF * 2 ** (job.attempts - 1))
+            logger.warning("Job %s failed, retrying at %s", job, job.run_after)
+        job.save(update_fields=['status', 'run_after', 'last_error', 'updated_at'])
+        return False
+
+    job.status = Job.DONE
+    job.last_error = ""
+    job.save(update_fields=['status', 'last_error', 'updated_at'])
+    return True
+
+
+def work(limit=None):
+    """Runs due jobs until none are left (or `limit` have run). Returns how many ran."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim()
+        if job is None:
+            break
+        run(job)
+        ran += 1
+    return ran
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from library.autocomplete import build_index
+
+
+class Command(BaseCommand):
+    help = "Builds the in-memory typeahead index once and reports its size and build time."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'prefixes',
+            nargs='*',
+            help='Optional prefixes to look up against the fresh index.'
+        )
+
+    def handle(self, *args, **options):
+        index = build_index()
+        stats = index.stats()
+
+        for prefix in options['prefixes']:
+            titles = [book['title'] for book in index.lookup(prefix)]
+            self.stdout.write(f"{prefix!r:<12} {', '.join(titles) or '-'}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {stats['books']} books, {stats['entries']} keys, "
+            f"~{stats['size_bytes'] / 1024:.0f} KiB of {stats['max_bytes'] / 1024:.0f} KiB budget, "
+            f"built in {stats['build_seconds'] * 1000:.1f}ms."
+        ))
+        if stats['truncated']:
+            self.stdout.write(self.style.WARNING(
+                "Budget reached: the weakest matches were left out. Raise AUTOCOMPLETE_MAX_BYTES to keep them."
+            ))
@@ -0,0 +1,56 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from library.models import Author, Book
+
+
+class Command(BaseCommand):
+    help = "Recomputes the derived feature columns on Book (title features) and Author (name features)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows written per bulk_update (default 500).'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        changed = self.backfill(
+            Book, 'title', Book.TITLE_FEATURE_FIELDS,
+            lambda book: book.refresh_title_features(),
+            "title features", "books", batch_size,
+        )
+        changed += self.backfill(
+            Author, 'name', Author.NAME_FEATURE_FIELDS,
+            lambda author: author.refresh_name_features(),
+            "name features", "authors", batch_size,
+        )
+
+        if changed:
+            # bulk_update skips the signals that maintain the game's answer tables
+            call_command('rebuild_answers', stdout=self.stdout)
+
+    def backfill(self, model, source_field, fields, refresh, label, plural, batch_size):
+        rows = model.objects.only('pk', source_field, *fields).order_by('pk')
+        total = rows.count()
+        self.stdout.write(f"Backfilling {label} for {total} {plural}...")
+
+        batch = []
+        changed = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            before = [getattr(row, f) for f in fields]
+            refresh(row)
+            if before != [getattr(row, f) for f in fields]:
+                batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, fields)
+                changed += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, fields)
+            changed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Updated {changed} of {total} {plural}."))
+        return changed
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 import requests
+from library import http, http_cache
 
 class Command(BaseCommand):
     help = "Fetches and structures data for a single book from OpenLibrary."
@@ -10,6 +11,7 @@ class Command(BaseCommand):
             type=str,
             help="The title of the book being queried for."
         )
+        http_cache.add_arguments(parser)
 
     def get_nationality(self, author_key, wikidata_id, headers):
         """Helper method to fetch nationality for an author"""
@@ -27,7 +29,7 @@ class Command(BaseCommand):
                 'props': 'claims'
             }
             
-            wd_response = requests.get(wd_url, params=wd_params, headers=headers, timeout=10)
+            wd_response = http.get(wd_url, params=wd_params, headers=headers, timeout=10)
             
             if wd_response.status_code != 200:
                 return "Unknown"
@@ -53,7 +55,7 @@ class Command(BaseCommand):
                 'props': 'labels'
             }
             
-            country_response = requests.get(wd_url, params=country_params, headers=headers, timeout=10)
+            country_response = http.get(wd_url, params=country_params, headers=headers, timeout=10)
             
             if country_response.status_code != 200:
                 return "Unknown"
@@ -68,6 +70,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         title = options['title']
+        http_cache.configure(options)
         
         # Set User-Agent header
         headers = {
@@ -90,7 +93,7 @@ class Command(BaseCommand):
         try:
             # --- 2. Initial Search (OpenLibrary Work) ---
             url = f"https://openlibrary.org/search.json?q={title}"
-            response = requests.get(url, headers=headers, timeout=10).json()
+            response = http.get(url, headers=headers, timeout=10).json()
             documents = response.get('docs', [])
 
             if not documents:
@@ -120,7 +123,7 @@ class Command(BaseCommand):
             if author_key != 'N/A':
                 try:
                     author_url = f"https://openlibrary.org/authors/{author_key}.json"
-                    author_response = requests.get(author_url, headers=headers, timeout=10).json()
+                    author_response = http.get(author_url, headers=headers, timeout=10).json()
                     wikidata_id = author_response.get('remote_ids', {}).get('wikidata')
                 except Exception:
                     pass  # If author fetch fails, continue without nationality
@@ -132,7 +135,7 @@ class Command(BaseCommand):
             # --- 5. Second API Call (Full Work Details) ---
             if book_key:
                 second_url = f"https://openlibrary.org{book_key}.json"
-                second_response = requests.get(second_url, headers=headers, timeout=10).json()
+                second_response = http.get(second_url, headers=headers, timeout=10).json()
 
                 page_count = second_response.get('number_of_pages', -1)
                 subjects = second_response.get('subjects', [])
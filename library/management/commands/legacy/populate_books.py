@@ -1,4 +1,4 @@
-import requests
+from library import http, http_cache
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.core.management.base import BaseCommand, CommandError
@@ -30,6 +30,7 @@ class Command(BaseCommand):
             type=str,
             help="The exact list of book titles to add."
         )
+        http_cache.add_arguments(parser)
 
     def handle(self, *args, **options):
         """
@@ -37,6 +38,7 @@ class Command(BaseCommand):
         """
         book_titles = options["book_titles"]
         start_time = time.time()
+        disk_cache = http_cache.configure(options)
         self.stdout.write(self.style.NOTICE(
             f"Starting concurrent ingestion for {len(book_titles)} books..."
         ))
@@ -67,6 +69,8 @@ class Command(BaseCommand):
                     failed_titles.append(title)
 
         self.stdout.write(self.style.NOTICE("\n--- API Fetching Complete ---"))
+        if disk_cache is not None:
+            self.stdout.write(disk_cache.summary())
         if failed_titles:
             self.stdout.write(self.style.WARNING(
                 f"Failed to fetch: {', '.join(failed_titles)}"
@@ -210,7 +214,7 @@ class Command(BaseCommand):
     def _find_best_book_match(self, title):
         """Finds the best 'work' from OpenLibrary search."""
         params = {'title': title, 'language': 'eng', 'limit': 5}
-        response = requests.get(OL_SEARCH_URL, params=params, headers=HEADERS, timeout=10)
+        response = http.get(OL_SEARCH_URL, params=params, headers=HEADERS, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -239,7 +243,7 @@ class Command(BaseCommand):
         """Gets detailed info (subjects, pages) for a specific /works/ key."""
         try:
             url = f"{OL_BASE_URL}{book_key}.json"
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            response = http.get(url, headers=HEADERS, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -264,7 +268,7 @@ class Command(BaseCommand):
         try:
             # --- 1. Get Author Details (Name, Wikidata ID) ---
             author_url = f"{OL_BASE_URL}/authors/{author_key}.json"
-            author_response = requests.get(author_url, headers=HEADERS, timeout=10)
+            author_response = http.get(author_url, headers=HEADERS, timeout=10)
             author_response.raise_for_status()
             author_data = author_response.json()
             
@@ -277,7 +281,7 @@ class Command(BaseCommand):
             # --- 3. Find Debut Novel Key ---
             works_url = f"{OL_BASE_URL}/authors/{author_key}/works.json"
             works_params = {'limit': 200, 'sort': 'old'} # Sort by oldest
-            works_response = requests.get(works_url, params=works_params, headers=HEADERS, timeout=10)
+            works_response = http.get(works_url, params=works_params, headers=HEADERS, timeout=10)
             works_response.raise_for_status()
             works_data = works_response.json()
 
@@ -318,7 +322,7 @@ class Command(BaseCommand):
                 'action': 'wbgetentities', 'ids': wikidata_id,
                 'format': 'json', 'props': 'claims'
             }
-            response = requests.get(WIKIDATA_API_URL, params=params, headers=HEADERS, timeout=10)
+            response = http.get(WIKIDATA_API_URL, params=params, headers=HEADERS, timeout=10)
             response.raise_for_status()
             entities = response.json().get('entities', {})
             
@@ -357,7 +361,7 @@ class Command(BaseCommand):
                 'action': 'wbgetentities', 'ids': entity_id,
                 'format': 'json', 'props': 'labels', 'languages': 'en'
             }
-            response = requests.get(WIKIDATA_API_URL, params=params, headers=HEADERS, timeout=10)
+            response = http.get(WIKIDATA_API_URL, params=params, headers=HEADERS, timeout=10)
             response.raise_for_status()
             entities = response.json().get('entities', {})
             if entity_id in entities:
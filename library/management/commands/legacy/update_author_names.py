@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 from library.models import Author
-import requests
+from library import http, http_cache
 import time
 import re
 
@@ -14,6 +14,7 @@ class Command(BaseCommand):
             default=None,
             help='Limit the number of authors to update (for testing)'
         )
+        http_cache.add_arguments(parser)
 
     def get_english_name(self, author_key, current_name, headers):
         """
@@ -30,7 +31,7 @@ class Command(BaseCommand):
             
             # Step 2: Get OpenLibrary author data
             ol_url = f"https://openlibrary.org/authors/{author_key}.json"
-            ol_response = requests.get(ol_url, headers=headers, timeout=10)
+            ol_response = http.get(ol_url, headers=headers, timeout=10)
             
             if ol_response.status_code != 200:
                 return None
@@ -69,7 +70,7 @@ class Command(BaseCommand):
                     'languages': 'en'
                 }
                 
-                wd_response = requests.get(wd_url, params=wd_params, headers=headers, timeout=10)
+                wd_response = http.get(wd_url, params=wd_params, headers=headers, timeout=10)
                 
                 if wd_response.status_code == 200:
                     wd_data = wd_response.json()
@@ -143,6 +144,8 @@ class Command(BaseCommand):
         return (first_name, last_name)
 
     def handle(self, *args, **options):
+        disk_cache = http_cache.configure(options)
+
         # Set a User-Agent header
         headers = {
             'User-Agent': 'Litgrid/1.0 (https://github.com/colin-ingraham/litgrid; colinringraham@email.com)'
@@ -168,6 +171,7 @@ class Command(BaseCommand):
         
         for i, author in enumerate(authors, 1):
             self.stdout.write(f"[{i}/{total}] {author.name} ({author.key})...")
+            sent = http.network_requests()
             
             try:
                 # Try to get a better English name
@@ -206,7 +210,9 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.WARNING(f"    - No change needed"))
                 
                 # Be nice to the APIs - rate limit
-                time.sleep(0.5)
+                # (answers replayed from the disk cache don't need it)
+                if http.network_requests() > sent:
+                    time.sleep(0.5)
                 
             except Exception as e:
                 unchanged_count += 1
@@ -216,4 +222,6 @@ class Command(BaseCommand):
         self.stdout.write("\n" + "="*50)
         self.stdout.write(self.style.SUCCESS(f"Successfully updated: {success_count}"))
         self.stdout.write(self.style.WARNING(f"Unchanged: {unchanged_count}"))
-        self.stdout.write("="*50)
\ No newline at end of file
+        self.stdout.write("="*50)
+        if disk_cache is not None:
+            self.stdout.write(disk_cache.summary())
\ No newline at end of file
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand, CommandError
 from library.models import Author
-import requests
+from library import http, http_cache
 import time
 
 class Command(BaseCommand):
@@ -13,13 +13,14 @@ class Command(BaseCommand):
             default=None,
             help='Limit the number of authors to update (for testing)'
         )
+        http_cache.add_arguments(parser)
 
     def get_nationality(self, author_key, headers):
         """Helper method to fetch nationality for a single author"""
         try:
             # Step 1: Get OpenLibrary author data
             ol_url = f"https://openlibrary.org/authors/{author_key}.json"
-            ol_response = requests.get(ol_url, headers=headers, timeout=10)
+            ol_response = http.get(ol_url, headers=headers, timeout=10)
             
             if ol_response.status_code != 200:
                 return None
@@ -41,7 +42,7 @@ class Command(BaseCommand):
                 'props': 'claims'
             }
             
-            wd_response = requests.get(wd_url, params=wd_params, headers=headers, timeout=10)
+            wd_response = http.get(wd_url, params=wd_params, headers=headers, timeout=10)
             
             if wd_response.status_code != 200:
                 return None
@@ -67,7 +68,7 @@ class Command(BaseCommand):
                 'props': 'labels'
             }
             
-            country_response = requests.get(wd_url, params=country_params, headers=headers, timeout=10)
+            country_response = http.get(wd_url, params=country_params, headers=headers, timeout=10)
             
             if country_response.status_code != 200:
                 return None
@@ -82,6 +83,8 @@ class Command(BaseCommand):
             return None
 
     def handle(self, *args, **options):
+        disk_cache = http_cache.configure(options)
+
         # Set a User-Agent header (required by Wikidata)
         headers = {
             'User-Agent': 'Litgrid/1.0 (https://github.com/colin-ingraham/litgrid; colinringraham@email.com)'
@@ -107,6 +110,7 @@ class Command(BaseCommand):
         
         for i, author in enumerate(authors, 1):
             self.stdout.write(f"[{i}/{total}] {author.name} ({author.key})...")
+            sent = http.network_requests()
             
             try:
                 nationality = self.get_nationality(author.key, headers)
@@ -121,7 +125,9 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.WARNING(f"    ✗ No nationality data found"))
                 
                 # Be nice to the APIs - rate limit (1 request every 0.5 seconds)
-                time.sleep(0.5)
+                # (answers replayed from the disk cache don't need it)
+                if http.network_requests() > sent:
+                    time.sleep(0.5)
                 
             except Exception as e:
                 fail_count += 1
@@ -131,4 +137,6 @@ class Command(BaseCommand):
         self.stdout.write("\n" + "="*50)
         self.stdout.write(self.style.SUCCESS(f"Successfully updated: {success_count}"))
         self.stdout.write(self.style.WARNING(f"Failed: {fail_count}"))
-        self.stdout.write("="*50)
\ No newline at end of file
+        self.stdout.write("="*50)
+        if disk_cache is not None:
+            self.stdout.write(disk_cache.summary())
\ No newline at end of file
@@ -1,9 +1,52 @@
-from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-import requests
+"""
+Bulk import of authors and books from a JSON file, with covers, ISBNs and page
+counts filled in from Open Library:
+
+    [{"author_name": "...", "books": [{"title": "...", "key": "/works/OL45804W",
+      "publish_year": 1937, "page_count": 310, "subjects": [...], "is_debut": true}]}]
+
+Books are processed in chunks, as a two-stage pipeline:
+
+  fetch  a thread pool gets each book's work and editions records (two
+         requests per book), spaced per host by a HostRateLimiter
+  write  one transaction per chunk: authors, books, subjects and subject
+         links are each a handful of bulk queries
+
+The next chunk is fetched while the current one is written. After each chunk
+commits, the ids of its books are added to a checkpoint file next to the
+input, so an interrupted import picks up where it stopped. A book whose Open
+Library fetch failed (including a miss with --offline) is still written from
+the file's data, but is kept out of the done list and recorded as failed, so
+the next run fetches it again. The checkpoint is removed once every book is
+done. Books are keyed by their OL work id
+("OL45804W"), and a book already in the catalog under the same title and
+author (e.g. saved from Google) is updated instead of duplicated.
+
+Bulk writes skip the model signals, so feature columns are computed here and
+the game's answer tables are rebuilt (rebuild_answers) once the import ends.
+"""
 import json
+import os
 import time
-from library.models import Author, Book, Subject
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from library import http, http_cache
+from library.features import normalize_subject
+from library.models import Author, Book
+from library.open_library import OL_COVERS_URL, OL_WORKS_URL
+from library.subjects import display_name, resolve_subjects
+
+BOOK_FIELDS = ('title', 'author', 'publish_year', 'page_count', 'thumbnail_url', 'isbn') + Book.TITLE_FEATURE_FIELDS
+
+
+def work_id(key):
+    """'/works/OL45804W' -> 'OL45804W'"""
+    return key.rstrip('/').rsplit('/', 1)[-1] if key else None
 
 
 class Command(BaseCommand):
@@ -15,236 +58,267 @@ class Command(BaseCommand):
             type=str,
             help="Path to the JSON file containing author and book data."
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Concurrent Open Library requests (default 8).'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=5.0,
+            help='Requests per second per host (default 5).'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Books fetched and written per chunk (default 200).'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and import everything again.'
+        )
+        http_cache.add_arguments(parser)
 
     def handle(self, *args, **options):
         json_file = options['json_file']
-        
-        # Set User-Agent header for API requests
-        self.headers = {
-            'User-Agent': 'Litgrid/1.0 (https://github.com/colin-ingraham/litgrid; colinringraham@email.com)'
-        }
-        
         try:
-            # Load JSON data
             with open(json_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            self.stdout.write(self.style.SUCCESS(f"Loaded JSON file: {json_file}"))
-            self.stdout.write(f"Processing {len(data)} authors...")
-            
-            # Process each author
-            for author_data in data:
-                self.process_author(author_data)
-                
-            self.stdout.write(self.style.SUCCESS("✓ Database population complete!"))
-            
         except FileNotFoundError:
             raise CommandError(f"File not found: {json_file}")
         except json.JSONDecodeError as e:
             raise CommandError(f"Invalid JSON format: {e}")
-        except Exception as e:
-            raise CommandError(f"Error processing data: {e}")
-
-    def process_author(self, author_data):
-        """Process a single author and all their books"""
-        author_name = author_data.get('author_name')
-        author_key = author_data.get('author_key')
-        nationality = author_data.get('nationality', 'Unknown')
-        gender = author_data.get('gender', 'U')
-        
-        self.stdout.write(f"\nProcessing author: {author_name}")
-        
-        # Create or get the author
-        author, created = Author.objects.get_or_create(
-            key=author_key,
-            defaults={
-                'name': author_name,
-                'nationality': nationality,
-                'gender': gender,
-            }
-        )
-        
-        if created:
-            self.stdout.write(self.style.SUCCESS(f"  ✓ Created author: {author_name}"))
-        else:
-            # Update existing author
-            author.name = author_name
-            author.nationality = nationality
-            author.gender = gender
-            author.save()
-            self.stdout.write(f"  → Updated author: {author_name}")
-        
-        # Process books
-        books_data = author_data.get('books', [])
-        debut_book = None
-        
-        for book_data in books_data:
-            book = self.process_book(book_data, author)
-            
-            # Track debut novel
-            if book_data.get('is_debut', False):
-                debut_book = book
-        
-        # Set debut novel if found
-        if debut_book and author.debut_novel != debut_book:
-            author.debut_novel = debut_book
-            author.save()
-            self.stdout.write(f"  ✓ Set debut novel: {debut_book.title}")
-
-    def process_book(self, book_data, author):
-        """Process a single book and fetch additional data from API"""
-        title = book_data.get('title')
-        book_key = book_data.get('key')
-        publish_year = book_data.get('publish_year')
-        page_count = book_data.get('page_count')
-        subjects_list = book_data.get('subjects', [])
-        
-        self.stdout.write(f"  → Processing book: {title}")
-        
-        # Fetch additional data from OpenLibrary if we have a work key
-        cover_id = None
-        isbn = None
-        
-        if book_key:
-            api_data = self.fetch_openlibrary_data(book_key)
-            cover_id = api_data.get('cover_id')
-            isbn = api_data.get('isbn')
-            
-            # If page_count is missing from JSON, try to get it from API
-            if page_count is None or page_count == -1:
-                page_count = api_data.get('page_count')
-        
-        # Create or update the book
-        book, created = Book.objects.update_or_create(
-            key=book_key,
-            defaults={
-                'title': title,
-                'author': author,
-                'publish_year': publish_year,
-                'page_count': page_count,
-                'cover_id': cover_id,
-                'isbn': isbn,
-            }
-        )
-        
-        if created:
-            self.stdout.write(self.style.SUCCESS(f"    ✓ Created book: {title}"))
-        else:
-            self.stdout.write(f"    → Updated book: {title}")
-        
-        # Process subjects
-        if subjects_list:
-            self.process_subjects(book, subjects_list)
-        
-        return book
+
+        self.stdout.write(self.style.SUCCESS(f"Loaded JSON file: {json_file}"))
+        disk_cache = http_cache.configure(options)
+        self.limiter = http.HostRateLimiter(options['rate'])
+        self.checkpoint_path = f"{json_file}.checkpoint"
+        done, failed = (set(), set()) if options['restart'] else self.load_checkpoint()
+
+        items, skipped = [], 0
+        for author_data in data:
+            for book_data in author_data.get('books', []):
+                book_id = work_id(book_data.get('key'))
+                if not book_id or not author_data.get('author_name'):
+                    skipped += 1
+                elif book_id not in done:
+                    items.append((author_data, book_data, book_id))
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipping {skipped} books without a work key or author."))
+        if done or failed:
+            self.stdout.write(
+                f"Resuming: {len(done)} books already imported, {len(items)} to go "
+                f"({len(failed)} retried after failed fetches)."
+            )
+        self.stdout.write(f"Processing {len(items)} books from {len(data)} authors...")
+
+        batch_size = options['batch_size']
+        chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        started = time.perf_counter()
+        imported = 0
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            def fetch(chunk):
+                return [pool.submit(self.fetch_openlibrary_data, book_data.get('key')) for _, book_data, _ in chunk]
+
+            pending = fetch(chunks[0]) if chunks else []
+            for number, chunk in enumerate(chunks, start=1):
+                fetched = [future.result() for future in pending]
+                # The next chunk downloads while this one is written
+                pending = fetch(chunks[number]) if number < len(chunks) else []
+
+                self.write_chunk(chunk, fetched)
+                for (_, _, book_id), api_data in zip(chunk, fetched):
+                    if api_data is None:
+                        failed.add(book_id)
+                    else:
+                        failed.discard(book_id)
+                        done.add(book_id)
+                self.save_checkpoint(done, failed)
+
+                imported += len(chunk)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"  chunk {number}/{len(chunks)}: {imported}/{len(items)} books, "
+                    f"{imported / elapsed:.1f} books/sec"
+                )
+
+        if failed:
+            self.stdout.write(self.style.WARNING(
+                f"{len(failed)} books were saved without Open Library data; run the command again to retry them."
+            ))
+        elif os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Database population complete! {imported} books in {elapsed:.1f}s ({rate:.1f} books/sec)."
+        ))
+        if disk_cache is not None:
+            self.stdout.write(disk_cache.summary())
+        if imported:
+            # Bulk writes skip the signals that maintain the game's answer tables
+            call_command('rebuild_answers', stdout=self.stdout)
+
+    # ── Checkpoint ────────────────────────────────────────────────────────────
+
+    def load_checkpoint(self):
+        """(done ids, failed ids) from the checkpoint; failed ones aren't done."""
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            return set(checkpoint['done']), set(checkpoint.get('failed', []))
+        except FileNotFoundError:
+            return set(), set()
+        except (json.JSONDecodeError, KeyError):
+            self.stdout.write(self.style.WARNING(f"Ignoring unreadable checkpoint {self.checkpoint_path}"))
+            return set(), set()
+
+    def save_checkpoint(self, done, failed):
+        # Write then rename, so a crash mid-write never leaves a torn checkpoint
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(done), 'failed': sorted(failed)}, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    # ── Fetch stage (worker threads, no DB access) ────────────────────────────
+
+    def get_json(self, url):
+        """Parsed JSON, or None for a 404; other statuses raise HTTPError."""
+        response = http.get(url, timeout=10, limiter=self.limiter)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"API returned status {response.status_code} for {url}", response=response)
+        return response.json()
 
     def fetch_openlibrary_data(self, work_key):
-        """Fetch cover_id, isbn, and page_count from OpenLibrary API"""
+        """Fetch cover_id, isbn, and page_count from OpenLibrary API (None if the fetch failed)"""
         try:
-            # Fetch work details to get editions
-            work_url = f"https://openlibrary.org{work_key}.json"
-            
-            # Add a small delay to avoid rate limiting
-            time.sleep(0.2)
-            
-            response = requests.get(work_url, headers=self.headers, timeout=10)
-            
-            if response.status_code != 200:
-                self.stdout.write(self.style.WARNING(f"    ⚠ API returned status {response.status_code} for {work_key}"))
-                return {}
-            
-            work_data = response.json()
-            
-            # Try to get cover from work level first (some works have covers)
-            cover_id = None
-            if 'covers' in work_data and work_data['covers']:
-                cover_id = work_data['covers'][0]
-            
-            # If no cover at work level, fetch the work's editions to find one with a cover
-            if not cover_id:
-                editions_url = f"https://openlibrary.org{work_key}/editions.json"
-                time.sleep(0.2)
-                
-                editions_response = requests.get(editions_url, headers=self.headers, timeout=10)
-                
-                if editions_response.status_code == 200:
-                    editions_data = editions_response.json()
-                    entries = editions_data.get('entries', [])
-                    
-                    # Find the first edition with a cover
-                    for edition in entries:
-                        if 'covers' in edition and edition['covers']:
-                            cover_id = edition['covers'][0]
-                            break
-            
-            # Try to get ISBN and page count from editions
-            isbn = None
-            page_count = None
-            
-            # Fetch editions if we haven't already
-            if not cover_id or not isbn or not page_count:
-                editions_url = f"https://openlibrary.org{work_key}/editions.json"
-                time.sleep(0.2)
-                
-                editions_response = requests.get(editions_url, headers=self.headers, timeout=10)
-                
-                if editions_response.status_code == 200:
-                    editions_data = editions_response.json()
-                    entries = editions_data.get('entries', [])
-                    
-                    # Find the first edition with the data we need
-                    for edition in entries:
-                        # Get cover if we don't have one yet
-                        if not cover_id and 'covers' in edition and edition['covers']:
-                            cover_id = edition['covers'][0]
-                        
-                        # Get ISBN if we don't have one yet
-                        if not isbn:
-                            if 'isbn_13' in edition and edition['isbn_13']:
-                                isbn = edition['isbn_13'][0]
-                            elif 'isbn_10' in edition and edition['isbn_10']:
-                                isbn = edition['isbn_10'][0]
-                        
-                        # Get page count if we don't have one yet
-                        if not page_count and 'number_of_pages' in edition:
-                            page_count = edition['number_of_pages']
-                        
-                        # Break if we have everything
-                        if cover_id and isbn and page_count:
-                            break
-            
-            return {
-                'cover_id': cover_id,
-                'isbn': isbn,
-                'page_count': page_count,
-            }
-            
+            work_data = self.get_json(f"{OL_WORKS_URL}{work_key}.json") or {}
+            editions  = (self.get_json(f"{OL_WORKS_URL}{work_key}/editions.json") or {}).get('entries', [])
         except requests.exceptions.Timeout:
             self.stdout.write(self.style.WARNING(f"    ⚠ API timeout for {work_key}"))
-            return {}
+            return None
         except requests.exceptions.RequestException as e:
             self.stdout.write(self.style.WARNING(f"    ⚠ API error for {work_key}: {e}"))
-            return {}
-        except Exception as e:
+            return None
+        except ValueError as e:
             self.stdout.write(self.style.WARNING(f"    ⚠ Error parsing API response for {work_key}: {e}"))
-            return {}
-
-    def process_subjects(self, book, subjects_list):
-        """Create or get subjects and link them to the book"""
-        # Clear existing subjects
-        book.subjects.clear()
-        
-        for subject_name in subjects_list:
-            # Normalize subject name (lowercase, strip whitespace)
-            subject_name = subject_name.strip().lower()
-            
-            # Create or get subject
-            subject, created = Subject.objects.get_or_create(
-                name=subject_name
-            )
-            
-            # Link to book
-            book.subjects.add(subject)
-        
-        if subjects_list:
-            self.stdout.write(f"    ✓ Linked {len(subjects_list)} subjects")
\ No newline at end of file
+            return None
+
+        # The work's own cover first, then the first edition that has one
+        cover_id = (work_data.get('covers') or [None])[0]
+        isbn = None
+        page_count = None
+        for edition in editions:
+            if not cover_id and edition.get('covers'):
+                cover_id = edition['covers'][0]
+            if not isbn:
+                isbn = (edition.get('isbn_13') or edition.get('isbn_10') or [None])[0]
+            if not page_count and edition.get('number_of_pages'):
+                page_count = edition['number_of_pages']
+            if cover_id and isbn and page_count:
+                break
+
+        return {
+            'cover_id': cover_id,
+            'isbn': isbn,
+            'page_count': page_count,
+        }
+
+    # ── Write stage (main thread) ─────────────────────────────────────────────
+
+    @transaction.atomic
+    def write_chunk(self, chunk, fetched):
+        authors = self.resolve_authors({author_data['author_name'] for author_data, _, _ in chunk})
+
+        # A book already in the catalog under the same title and author (e.g.
+        # saved from Google) is updated in place rather than duplicated
+        by_title = {
+            (title.lower(), author_id): pk
+            for pk, title, author_id in Book.objects.filter(author__in=authors.values())
+            .values_list('pk', 'title', 'author_id')
+        }
+        targets = [
+            by_title.get(((book_data.get('title') or '').lower(), authors[author_data['author_name']].pk), book_id)
+            for author_data, book_data, book_id in chunk
+        ]
+        existing = Book.objects.in_bulk(targets)
+
+        books, debuts = {}, {}
+        for (author_data, book_data, _), pk, api_data in zip(chunk, targets, fetched):
+            if pk in books:
+                continue   # listed twice in the file
+            api_data = api_data or {}   # failed fetch: the file's data for now, retried next run
+            author = authors[author_data['author_name']]
+            book   = existing.get(pk) or Book(google_book_id=pk)
+
+            page_count = book_data.get('page_count')
+            if page_count is None or page_count == -1:
+                page_count = api_data.get('page_count')
+
+            book.title        = book_data.get('title') or 'Unknown Title'
+            book.author       = author
+            book.publish_year = book_data.get('publish_year') or book.publish_year
+            book.page_count   = page_count or book.page_count
+            book.isbn         = api_data.get('isbn') or book.isbn
+            if api_data.get('cover_id'):
+                book.thumbnail_url = f"{OL_COVERS_URL}/id/{api_data['cover_id']}-L.jpg"
+            book.refresh_title_features()
+
+            books[pk] = (book, book_data.get('subjects', []))
+            if book_data.get('is_debut', False):
+                author.debut_novel_id = pk
+                debuts[author.pk] = author
+
+        Book.objects.bulk_create([book for pk, (book, _) in books.items() if pk not in existing])
+        Book.objects.bulk_update([book for pk, (book, _) in books.items() if pk in existing], BOOK_FIELDS)
+        Author.objects.bulk_update(debuts.values(), ['debut_novel'])
+        self.link_subjects(books.values())
+
+    def resolve_authors(self, names):
+        """{name: Author}, creating the missing ones in one bulk insert."""
+        authors = {}
+        for author in Author.objects.filter(name__in=names).order_by('pk'):
+            authors.setdefault(author.name, author)
+        missing = []
+        for name in names - authors.keys():
+            author = Author(name=name)
+            author.refresh_name_features()
+            missing.append(author)
+        Author.objects.bulk_create(missing)
+        if missing and any(author.pk is None for author in missing):
+            # Backends that don't return ids from bulk inserts
+            return self.resolve_authors(names)
+        authors.update({author.name: author for author in missing})
+        return authors
+
+    def link_subjects(self, books):
+        """
+        Replaces the subjects of each book the file lists subjects for,
+        resolving all names in a few queries. Books without any keep theirs.
+        """
+        books = [(book, [name for name in subjects if name.strip()]) for book, subjects in books]
+        books = [(book, names) for book, names in books if names]
+        if not books:
+            return
+        subject_ids = {
+            subject.normalized_name: subject.pk
+            for subject in resolve_subjects(name for _, names in books for name in names)
+        }
+        wanted = {book.pk: {normalize_subject(display_name(name)) for name in names} for book, names in books}
+
+        through = Book.subjects.through
+        through.objects.filter(book_id__in=wanted.keys()).delete()
+        through.objects.bulk_create([
+            through(book_id=book_id, subject_id=subject_ids[name])
+            for book_id, names in wanted.items()
+            for name in names if name in subject_ids
+        ], ignore_conflicts=True)
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from library import jobs, tasks  # noqa: F401  (tasks registers the handlers)
+
+PRUNE_EVERY = 60 * 60   # seconds between deletions of old finished jobs
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (Open Library enrichment of guessed books) until stopped."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every job that is due, then exit instead of polling.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default 2).',
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=float,
+            default=jobs.KEEP_DAYS,
+            help=f'Days to keep finished jobs before deleting them (default {jobs.KEEP_DAYS}).',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        last_prune = None
+        try:
+            while True:
+                close_old_connections()
+                if last_prune is None or time.monotonic() - last_prune >= PRUNE_EVERY:
+                    pruned = jobs.prune(days=options['keep_days'])
+                    last_prune = time.monotonic()
+                    if pruned:
+                        self.stdout.write(f"Deleted {pruned} finished job(s) older than {options['keep_days']:g} days.")
+
+                stale = jobs.requeue_stale()
+                if stale:
+                    self.stdout.write(self.style.WARNING(f"Requeued {stale} stale job(s)."))
+
+                ran = jobs.work()
+                if ran:
+                    total += ran
+                    self.stdout.write(f"Ran {ran} job(s).")
+                if options['once']:
+                    break
+                if not ran:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Worker stopped after {total} job(s)."))
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:39
+
+import string
+
+from django.db import migrations, models
+
+# library.features.title_features as of this migration, frozen so later changes
+# to the live rules can't change what this backfill writes
+
+NUMBER_WORDS = frozenset({
+    "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen", "seventeen",
+    "eighteen", "nineteen", "twenty", "thirty", "forty", "fifty", "sixty", "seventy",
+    "eighty", "ninety", "hundred", "thousand", "million", "billion"
+})
+
+COLOR_WORDS = frozenset({
+    "red", "blue", "green", "yellow", "gold", "silver", "black", "white",
+    "orange", "purple", "brown", "pink", "gray", "grey", "violet", "indigo",
+    "scarlet", "crimson", "emerald", "ruby", "sapphire"
+})
+
+FAMILY_WORDS = frozenset({
+    "mother", "father", "sister", "brother", "daughter", "son", "aunt", "uncle",
+    "wife", "husband", "mom", "dad", "parent", "child", "grandmother", "grandfather",
+    "grandma", "grandpa", "niece", "nephew", "cousin", "stepmother", "stepfather"
+})
+
+SEASON_WORDS = frozenset({"spring", "summer", "autumn", "fall", "winter"})
+
+TITLE_KEYWORD_FIELDS = {
+    "num": ("title_has_number", NUMBER_WORDS),
+    "col": ("title_has_color",  COLOR_WORDS),
+    "fam": ("title_has_family", FAMILY_WORDS),
+    "sea": ("title_has_season", SEASON_WORDS),
+}
+
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+LEADING_WORD_MAX_LENGTH = 100
+
+
+def title_features(title):
+    normalized = " ".join((title or "").lower().split())
+    words = normalized.translate(PUNCTUATION_TABLE).split()
+    word_set = set(words)
+
+    features = {
+        'normalized_title':   normalized,
+        'title_word_count':   len(normalized.split()),
+        'title_leading_word': words[0][:LEADING_WORD_MAX_LENGTH] if words else "",
+        'title_has_digit':    any(char.isdigit() for char in normalized),
+    }
+    for field, keywords in TITLE_KEYWORD_FIELDS.values():
+        features[field] = not keywords.isdisjoint(word_set)
+    return features
+
+
+def backfill_title_features(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    books = list(Book.objects.only('pk', 'title'))
+    for book in books:
+        for field, value in title_features(book.title).items():
+            setattr(book, field, value)
+    Book.objects.bulk_update(books, list(title_features('').keys()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_remove_book_cover_override'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='normalized_title',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_has_color',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_has_digit',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_has_family',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_has_number',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_has_season',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_leading_word',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_word_count',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_title_features, migrations.RunPython.noop),
+    ]
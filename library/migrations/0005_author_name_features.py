@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-16 22:40
+
+import re
+
+from django.db import migrations, models
+
+# library.features.author_features as of this migration, frozen so later changes
+# to the live parsing can't change what this backfill writes
+
+INITIAL_PATTERN = re.compile(r'^[A-Z]\.?$')
+
+
+def parse_author_name(name):
+    name = (name or "").strip()
+    if not name:
+        return "", ""
+
+    if ',' in name:
+        last, _, rest = name.partition(',')
+        rest_parts = rest.split()
+        return (rest_parts[0] if rest_parts else last.strip()), last.strip()
+
+    parts = name.split()
+    if len(parts) == 1:
+        return name, ""
+
+    first = next((p for p in parts[:-1] if not INITIAL_PATTERN.match(p)), parts[0])
+    return first, parts[-1]
+
+
+def author_features(name):
+    name = name or ""
+    first_name, last_name = parse_author_name(name)
+    tokens = name.split()
+    return {
+        'first_name':       first_name[:200],
+        'last_name':        last_name[:200],
+        'name_token_count': len(tokens),
+        'has_initials':     any(
+            letter.isupper() and name[index + 1:index + 2] == "."
+            for index, letter in enumerate(name)
+        ),
+        'is_alliterative':  len(tokens) >= 2 and tokens[0][0].lower() == tokens[-1][0].lower(),
+    }
+
+
+def backfill_author_features(apps, schema_editor):
+    Author = apps.get_model('library', 'Author')
+    authors = list(Author.objects.only('pk', 'name'))
+    for author in authors:
+        for field, value in author_features(author.name).items():
+            setattr(author, field, value)
+    Author.objects.bulk_update(authors, list(author_features('').keys()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0004_book_title_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='first_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='has_initials',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='is_alliterative',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='last_name',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='name_token_count',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_author_features, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:40
+
+from django.db import DatabaseError, migrations
+
+# See library/search.py. The index is vendor specific, so each database gets its own SQL.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE library_book_fts USING fts5(
+        book_id UNINDEXED, title, author, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO library_book_fts (book_id, title, author)
+    SELECT b.google_book_id, b.title, COALESCE(a.name, '')
+    FROM library_book b LEFT JOIN library_author a ON a.id = b.author_id
+    """,
+    """
+    CREATE TRIGGER library_book_fts_insert AFTER INSERT ON library_book BEGIN
+        INSERT INTO library_book_fts (book_id, title, author)
+        VALUES (new.google_book_id, new.title,
+                COALESCE((SELECT name FROM library_author WHERE id = new.author_id), ''));
+    END
+    """,
+    """
+    CREATE TRIGGER library_book_fts_update AFTER UPDATE OF google_book_id, title, author_id ON library_book BEGIN
+        DELETE FROM library_book_fts WHERE book_id = old.google_book_id;
+        INSERT INTO library_book_fts (book_id, title, author)
+        VALUES (new.google_book_id, new.title,
+                COALESCE((SELECT name FROM library_author WHERE id = new.author_id), ''));
+    END
+    """,
+    """
+    CREATE TRIGGER library_book_fts_delete AFTER DELETE ON library_book BEGIN
+        DELETE FROM library_book_fts WHERE book_id = old.google_book_id;
+    END
+    """,
+    """
+    CREATE TRIGGER library_author_fts_update AFTER UPDATE OF name ON library_author BEGIN
+        UPDATE library_book_fts SET author = new.name
+        WHERE book_id IN (SELECT google_book_id FROM library_book WHERE author_id = new.id);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS library_author_fts_update",
+    "DROP TRIGGER IF EXISTS library_book_fts_delete",
+    "DROP TRIGGER IF EXISTS library_book_fts_update",
+    "DROP TRIGGER IF EXISTS library_book_fts_insert",
+    "DROP TABLE IF EXISTS library_book_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS library_book_title_trgm ON library_book USING gin (normalized_title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS library_author_name_trgm ON library_author USING gin (UPPER(name) gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS library_author_name_trgm",
+    "DROP INDEX IF EXISTS library_book_title_trgm",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_FORWARD[:1])
+        except DatabaseError:
+            return  # SQLite built without FTS5: search falls back to plain filters
+        _run(schema_editor, SQLITE_FORWARD[1:])
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_author_name_features'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+def normalize_subject(name):
+    # library.features.normalize_subject as of this migration, frozen
+    return " ".join((name or "").lower().split())
+
+
+def backfill_normalized_names(apps, schema_editor):
+    Subject = apps.get_model('library', 'Subject')
+    through = apps.get_model('library', 'Book').subjects.through
+
+    subjects = list(Subject.objects.order_by('pk').only('pk', 'name'))
+    oldest, duplicates = {}, {}
+    for subject in subjects:
+        subject.normalized_name = normalize_subject(subject.name)
+        if subject.normalized_name in oldest:
+            duplicates[subject.pk] = oldest[subject.normalized_name]
+        else:
+            oldest[subject.normalized_name] = subject.pk
+
+    # Case variants ("Fiction", "fiction") merge into the oldest before the column turns unique
+    if duplicates:
+        links = through.objects.filter(subject_id__in=duplicates).values_list('book_id', 'subject_id')
+        through.objects.bulk_create(
+            [through(book_id=book_id, subject_id=duplicates[subject_id]) for book_id, subject_id in links],
+            ignore_conflicts=True,
+        )
+        Subject.objects.filter(pk__in=duplicates).delete()
+
+    Subject.objects.bulk_update(
+        [subject for subject in subjects if subject.pk not in duplicates], ['normalized_name'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0007_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='normalized_name',
+            field=models.CharField(default='', editable=False, max_length=500),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_normalized_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='subject',
+            name='normalized_name',
+            field=models.CharField(editable=False, max_length=500, unique=True),
+        ),
+    ]
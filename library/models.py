@@ -3,6 +3,9 @@ from django.db import models
 # Create your models here.
 
 from django.db import models
+from django.utils import timezone
+
+from .features import author_features, normalize_subject, title_features
 
 class Author(models.Model):
     """
@@ -20,9 +23,30 @@ class Author(models.Model):
         blank=True
     )
 
+    # Parsed name features for the Author (A) categories, derived from `name` on
+    # every save (see features.py) and backfilled with `manage.py backfill_features`
+    first_name       = models.CharField(max_length=200, blank=True, default="", db_index=True, editable=False)
+    last_name        = models.CharField(max_length=200, blank=True, default="", db_index=True, editable=False)
+    name_token_count = models.PositiveSmallIntegerField(default=0, db_index=True, editable=False)
+    has_initials     = models.BooleanField(default=False, db_index=True, editable=False)
+    is_alliterative  = models.BooleanField(default=False, db_index=True, editable=False)
+
+    NAME_FEATURE_FIELDS = ('first_name', 'last_name', 'name_token_count', 'has_initials', 'is_alliterative')
+
     def __str__(self):
         return self.name
 
+    def refresh_name_features(self):
+        for field, value in author_features(self.name).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_name_features()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.NAME_FEATURE_FIELDS)
+        super().save(*args, **kwargs)
+
 class Subject(models.Model):
     """
     Stores canonical subject categories (e.g., 'Fiction', 'History', 'War').
@@ -30,9 +54,20 @@ class Subject(models.Model):
     """
     name = models.CharField(max_length=500, unique=True)
 
+    # Case- and whitespace-folded name, so "Science fiction" and "Science Fiction"
+    # are one subject; set on every save, looked up by library/subjects.py
+    normalized_name = models.CharField(max_length=500, unique=True, editable=False)
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_subject(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'normalized_name'}
+        super().save(*args, **kwargs)
+
 class Book(models.Model):
     """
     Stores cached book data. The 'google_book_id' is used as the primary key
@@ -54,9 +89,61 @@ class Book(models.Model):
 
     # Link to Subject model (for War, Historical Fiction categories)
     subjects = models.ManyToManyField(Subject, related_name="books")
+
+    # Title features for the Name/Title (N) categories, derived from `title` on every
+    # save (see features.py) and backfilled with `manage.py backfill_features`
+    normalized_title   = models.CharField(max_length=500, blank=True, default="", db_index=True, editable=False)
+    title_word_count   = models.PositiveSmallIntegerField(default=0, db_index=True, editable=False)
+    title_leading_word = models.CharField(max_length=100, blank=True, default="", db_index=True, editable=False)
+    title_has_digit    = models.BooleanField(default=False, db_index=True, editable=False)
+    title_has_number   = models.BooleanField(default=False, db_index=True, editable=False)
+    title_has_color    = models.BooleanField(default=False, db_index=True, editable=False)
+    title_has_family   = models.BooleanField(default=False, db_index=True, editable=False)
+    title_has_season   = models.BooleanField(default=False, db_index=True, editable=False)
+
+    TITLE_FEATURE_FIELDS = (
+        'normalized_title', 'title_word_count', 'title_leading_word', 'title_has_digit',
+        'title_has_number', 'title_has_color', 'title_has_family', 'title_has_season',
+    )
     
     def __str__(self):
         return f"{self.title}"
 
+    def refresh_title_features(self):
+        for field, value in title_features(self.title).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.refresh_title_features()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.TITLE_FEATURE_FIELDS)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name_plural = "Books"
+
+
+class Job(models.Model):
+    """
+    Deferred work for the run_worker command, e.g. Open Library enrichment of
+    a book a player just guessed. See library/jobs.py.
+    """
+    PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    kind       = models.CharField(max_length=100)
+    payload    = models.JSONField(default=dict)
+    status     = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts   = models.PositiveSmallIntegerField(default=0)
+    run_after  = models.DateTimeField(default=timezone.now)
+    locked_at  = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
-        verbose_name_plural = "Books"
\ No newline at end of file
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
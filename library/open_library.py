@@ -0,0 +1,136 @@
+"""
+Open Library lookups for enriching a book: first publish year, subjects and a
+fallback cover.
+
+Independent lookups run concurrently on a shared thread pool: the ISBN and
+title searches race, as do the ISBN cover check and the title cover search.
+The answer comes from the most precise lookup that found something (ISBN
+over title), and everything shares one deadline (OL_DEADLINE by default), so
+a book costs about the slowest single request instead of the sum of them.
+Lookups still running at the deadline are ignored; their own request timeout
+ends them shortly after.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from . import resilience
+
+OPENLIBRARY_URL = "https://openlibrary.org/search.json"
+OL_WORKS_URL    = "https://openlibrary.org"
+OL_COVERS_URL   = "https://covers.openlibrary.org/b"
+
+OL_DEADLINE     = 8      # seconds for all of one book's lookups
+REQUEST_TIMEOUT = 5      # seconds, cap for any single request
+MIN_COVER_BYTES = 1000   # OL answers a missing cover with a ~807 byte 1×1 GIF
+SUBJECTS_LIMIT  = 10     # from the work record, when the search had none
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='open-library')
+
+
+def new_deadline(seconds=OL_DEADLINE):
+    return time.monotonic() + seconds
+
+
+def _timeout(deadline):
+    return max(0.1, min(REQUEST_TIMEOUT, deadline - time.monotonic()))
+
+
+def first_acceptable(calls, deadline):
+    """
+    Runs `calls` (each taking a deadline) concurrently and returns the first
+    truthy result in list order, or None. Never waits past `deadline`.
+    """
+    futures = [_pool.submit(call, deadline) for call in calls]
+    try:
+        for future in futures:
+            try:
+                result = future.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception:   # failed, or still running at the deadline
+                continue
+            if result:
+                return result
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+# ── Single lookups (each returns None when it finds nothing) ──────────────────
+
+def _search_doc(params, deadline):
+    params = {'limit': 1, 'fields': 'key,first_publish_year,subject', **params}
+    resp   = resilience.get('open_library', OPENLIBRARY_URL, params=params, timeout=_timeout(deadline))
+    docs   = resp.json().get('docs', [])
+    return docs[0] if docs else None
+
+
+def _work_subjects(key, deadline):
+    resp = resilience.get('open_library', f"{OL_WORKS_URL}{key}.json", timeout=_timeout(deadline))
+    if resp.status_code != 200:
+        return []
+    return [
+        s if isinstance(s, str) else s.get('name', '')
+        for s in resp.json().get('subjects', [])
+        if isinstance(s, (str, dict))
+    ][:SUBJECTS_LIMIT]
+
+
+def _isbn_cover(isbn, deadline):
+    url  = f"{OL_COVERS_URL}/isbn/{isbn}-L.jpg"
+    head = resilience.head('open_library', url, timeout=_timeout(deadline), allow_redirects=True)
+    if head.status_code == 200 and int(head.headers.get('Content-Length', 0)) > MIN_COVER_BYTES:
+        return url
+    return None
+
+
+def _title_cover(title, deadline):
+    params = {'q': title, 'limit': 1, 'fields': 'cover_i'}
+    docs   = resilience.get('open_library', OPENLIBRARY_URL, params=params, timeout=_timeout(deadline)).json().get('docs', [])
+    if docs and docs[0].get('cover_i'):
+        return f"{OL_COVERS_URL}/id/{docs[0]['cover_i']}-L.jpg"
+    return None
+
+
+# ── Public ────────────────────────────────────────────────────────────────────
+
+def fetch_ol_cover(isbn=None, title=None, deadline=None):
+    """
+    Fallback cover from Open Library — only called when Google has no cover.
+    Verifies the image is real via Content-Length.
+    """
+    deadline = deadline or new_deadline()
+    calls = []
+    if isbn:
+        calls.append(partial(_isbn_cover, isbn))
+    if title:
+        calls.append(partial(_title_cover, title))
+    return first_acceptable(calls, deadline)
+
+
+def fetch_ol_data(title, isbn=None, deadline=None):
+    """
+    Fetches publish year and subjects from Open Library.
+    Does NOT fetch covers — Google's cover is used directly.
+    """
+    deadline = deadline or new_deadline()
+    result   = {'year': None, 'subjects': []}
+
+    calls = []
+    if isbn:
+        calls.append(partial(_search_doc, {'isbn': isbn}))
+    calls.append(partial(_search_doc, {'q': title}))
+    doc = first_acceptable(calls, deadline)
+
+    if doc:
+        year = doc.get('first_publish_year')
+        if year and isinstance(year, int):
+            result['year'] = year
+
+        result['subjects'] = doc.get('subject', [])
+
+        # Needs the work key from the search, so it can't start any earlier
+        if not result['subjects'] and 'key' in doc:
+            result['subjects'] = first_acceptable([partial(_work_subjects, doc['key'])], deadline) or []
+
+    return result
@@ -0,0 +1,177 @@
+"""
+Circuit breakers and a retry budget for outbound API calls.
+
+Each provider (Google Books, Open Library) has a CircuitBreaker:
+
+  closed     requests flow; FAILURE_THRESHOLD consecutive failures open it
+  open       requests fail fast with CircuitOpenError for RESET_TIMEOUT seconds
+  half-open  one trial request is let through; success closes, failure reopens
+
+Failed attempts are retried at once (no sleeping inside a request) but only
+while the process-wide RetryBudget allows: retries may be at most
+RETRY_RATIO of recent requests, plus a small floor. A degraded provider can't
+multiply our traffic, and callers fall back to local data instead of waiting.
+
+State is per worker process. CircuitOpenError subclasses RequestException, so
+existing `except requests.exceptions.RequestException` handlers cover it.
+"""
+import threading
+import time
+from collections import deque
+
+import requests
+
+from . import http
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT     = 30     # seconds an open circuit waits before a trial request
+MAX_RETRIES       = 2      # extra attempts per call, if the budget allows
+RETRY_RATIO       = 0.1
+RETRY_FLOOR       = 3      # retries always allowed per window
+RETRY_WINDOW      = 60     # seconds
+
+# Statuses that mean "provider unhealthy": count as failures and may be retried
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
+
+
+class RetryBudget:
+    def __init__(self, ratio=RETRY_RATIO, floor=RETRY_FLOOR, window=RETRY_WINDOW):
+        self.ratio = ratio
+        self.floor = floor
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self):
+        """Takes one retry from the budget; False when it is used up."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if len(self._retries) >= self.floor + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self):
+        with self._lock:
+            self._trim(time.monotonic())
+            return {'requests': len(self._requests), 'retries': len(self._retries)}
+
+
+BREAKERS = {
+    'google_books': CircuitBreaker('google_books'),
+    'open_library': CircuitBreaker('open_library'),
+}
+RETRY_BUDGET = RetryBudget()
+
+
+def request(provider, method, url, **kwargs):
+    """
+    http.request() guarded by the provider's breaker and the retry budget.
+    Returns the last response (even a 5xx, for the caller's raise_for_status)
+    or raises the last transport error / CircuitOpenError.
+    """
+    breaker = BREAKERS[provider]
+    RETRY_BUDGET.record_request()
+
+    for attempt in range(MAX_RETRIES + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"{provider} is unavailable (circuit open)")
+
+        response, error = None, None
+        try:
+            response = http.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as exc:
+            error = exc
+        except Exception:
+            # Not a transport error, but it still ends a half-open trial
+            breaker.record_failure()
+            raise
+
+        if error is None and response.status_code not in RETRYABLE_STATUSES:
+            breaker.record_success()
+            return response
+
+        breaker.record_failure()
+        if attempt == MAX_RETRIES or not RETRY_BUDGET.try_spend():
+            break
+
+    if error is not None:
+        raise error
+    return response
+
+
+def get(provider, url, **kwargs):
+    return request(provider, 'GET', url, **kwargs)
+
+
+def head(provider, url, **kwargs):
+    return request(provider, 'HEAD', url, **kwargs)
+
+
+def resilience_stats():
+    return {
+        'breakers':     {name: breaker.stats() for name, breaker in BREAKERS.items()},
+        'retry_budget': RETRY_BUDGET.stats(),
+    }
@@ -0,0 +1,118 @@
+"""
+Local full-text search over Book title and author name.
+
+The index depends on the database (see migration 0006_book_search_index):
+
+  * SQLite:     an FTS5 table, library_book_fts, kept in sync by triggers
+  * PostgreSQL: pg_trgm GIN indexes on Book.normalized_title and UPPER(Author.name)
+  * otherwise:  plain ORM filters, ranked in Python
+
+Every backend returns candidates that are re-ranked the same way, so an exact
+title beats a title prefix, which beats matching words anywhere in the title
+and then the author's name.
+"""
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+from .features import PUNCTUATION_TABLE, normalize_title
+from .models import Book
+
+FTS_TABLE = 'library_book_fts'
+
+# Candidates fetched before ranking, per search
+CANDIDATE_LIMIT = 50
+
+
+def query_tokens(query):
+    """'The Hobbit,' -> ['the', 'hobbit']"""
+    return normalize_title(query).translate(PUNCTUATION_TABLE).split()
+
+
+def _word_prefixes(tokens, words):
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+def rank(query, book):
+    """Sort key for a candidate: lower is better."""
+    normalized = normalize_title(query)
+    tokens = query_tokens(query)
+    title = book.normalized_title or normalize_title(book.title)
+    title_words = title.translate(PUNCTUATION_TABLE).split()
+    author_words = query_tokens(book.author.name) if book.author else []
+
+    if title == normalized:
+        tier = 0
+    elif title.startswith(normalized):
+        tier = 1
+    elif _word_prefixes(tokens, title_words):
+        tier = 2
+    elif _word_prefixes(tokens, title_words + author_words):
+        tier = 3
+    else:
+        tier = 4
+    return (tier, len(title))
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+def _fts_candidates(tokens, limit):
+    # Every token as a prefix term: "hob"* "the"* (implicit AND), best bm25 first
+    match = " ".join(f'"{token}"*' for token in tokens)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT book_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _filter_candidates(tokens, limit):
+    # On PostgreSQL these LIKE '%...%' filters are served by the trigram indexes
+    q = Q()
+    for token in tokens:
+        q &= Q(normalized_title__contains=token) | Q(author__name__icontains=token)
+    return list(Book.objects.filter(q).values_list('pk', flat=True)[:limit])
+
+
+_fts_available = None
+
+
+def fts_available():
+    """Whether the FTS5 table exists here (SQLite built with FTS5, migration applied)."""
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = False
+        if connection.vendor == 'sqlite':
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT 1 FROM {FTS_TABLE} LIMIT 1")
+                _fts_available = True
+            except DatabaseError:
+                pass
+    return _fts_available
+
+
+def search_backend():
+    if fts_available():
+        return 'fts5'
+    if connection.vendor == 'postgresql':
+        return 'trigram'
+    return 'python'
+
+
+def search_books(query, limit=10):
+    """Local books matching the query, best first (author preloaded)."""
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+
+    if fts_available():
+        book_ids = _fts_candidates(tokens, CANDIDATE_LIMIT)
+    else:
+        book_ids = _filter_candidates(tokens, CANDIDATE_LIMIT)
+
+    books = Book.objects.select_related('author').in_bulk(book_ids)
+    candidates = [books[pk] for pk in book_ids if pk in books]
+    candidates.sort(key=lambda book: rank(query, book))
+    return candidates[:limit]
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import autocomplete
+from .models import Author, Book
+
+
+# ── Autocomplete index ────────────────────────────────────────────────────────
+# Rebuilt after commit so the background load sees the new rows, and only in
+# processes that serve typeahead (the web workers build theirs in wsgi.py).
+
+@receiver([post_save, post_delete], sender=Book)
+@receiver([post_save, post_delete], sender=Author)
+def refresh_autocomplete(sender, raw=False, **kwargs):
+    if not raw and autocomplete.in_use():
+        transaction.on_commit(autocomplete.refresh_in_background)
@@ -0,0 +1,87 @@
+"""
+Set-based subject resolution for saving books.
+
+A book from Google or Open Library can carry dozens of subject names.
+resolve_subjects() finds all of them with one query on the unique
+Subject.normalized_name, so case and spacing variants resolve to the same
+row, and inserts the missing ones with a single bulk_create. The ignored
+conflicts cover a concurrent request creating the same subject first.
+set_book_subjects() then links the book with one bulk insert into the
+through table.
+
+Bulk writes skip model signals, so the ones the game listens to are sent by
+hand: post_save for each newly created Subject, which files it under its
+genres, and m2m_changed for the links, which refreshes the book's answers.
+"""
+from django.db import router
+from django.db.models.signals import m2m_changed, post_save
+
+from .features import normalize_subject
+from .models import Book, Subject
+
+
+def display_name(name):
+    """How a new subject is named: ' science  fiction ' -> 'Science Fiction'."""
+    return " ".join(name.split()).title()
+
+
+def resolve_subjects(names):
+    """Subjects for `names` in first-seen order without repeats, creating the missing ones."""
+    wanted = {}
+    for name in names:
+        display = display_name(name)
+        if display:
+            wanted.setdefault(normalize_subject(display), display)
+    if not wanted:
+        return []
+
+    found = {s.normalized_name: s for s in Subject.objects.filter(normalized_name__in=wanted)}
+    missing = [
+        Subject(name=display, normalized_name=normalized)
+        for normalized, display in wanted.items() if normalized not in found
+    ]
+    if missing:
+        Subject.objects.bulk_create(missing, ignore_conflicts=True)
+        using = router.db_for_write(Subject)
+        for subject in Subject.objects.filter(normalized_name__in=[s.normalized_name for s in missing]):
+            found[subject.normalized_name] = subject
+            post_save.send(sender=Subject, instance=subject, created=True, update_fields=None, raw=False, using=using)
+
+    return [found[normalized] for normalized in wanted if normalized in found]
+
+
+def _send_m2m(action, book, pk_set, using):
+    m2m_changed.send(
+        sender=Book.subjects.through, instance=book, action=action,
+        reverse=False, model=Subject, pk_set=pk_set, using=using,
+    )
+
+
+def set_book_subjects(book, names, replace=True):
+    """
+    Links `book` to the subjects for `names` with one bulk insert. With
+    replace (like book.subjects.set) links to other subjects are removed,
+    otherwise they are kept (like book.subjects.add). Returns the subjects.
+    """
+    subjects = resolve_subjects(names)
+    through  = Book.subjects.through
+    using    = router.db_for_write(through)
+
+    wanted  = {subject.pk for subject in subjects}
+    current = set(through.objects.filter(book_id=book.pk).values_list('subject_id', flat=True))
+
+    removed = current - wanted if replace else set()
+    if removed:
+        _send_m2m('pre_remove', book, removed, using)
+        through.objects.filter(book_id=book.pk, subject_id__in=removed).delete()
+        _send_m2m('post_remove', book, removed, using)
+
+    added = wanted - current
+    if added:
+        _send_m2m('pre_add', book, added, using)
+        through.objects.bulk_create(
+            [through(book_id=book.pk, subject_id=subject_id) for subject_id in added], ignore_conflicts=True
+        )
+        _send_m2m('post_add', book, added, using)
+
+    return subjects
@@ -0,0 +1,47 @@
+"""
+Job handlers for run_worker (see library/jobs.py).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import transaction
+
+from . import jobs
+from .models import Book
+from .open_library import fetch_ol_cover, fetch_ol_data, new_deadline
+from .subjects import set_book_subjects
+
+
+@jobs.handler('enrich_book')
+def enrich_book(book_id):
+    """
+    Open Library year, subjects and (if Google had none) cover for a book
+    saved from Google data alone by save_and_validate_guess.
+
+    Saving the book and adding subjects fire the game's answer signals, so any
+    category verdicts the new data changes are recomputed here as well.
+    """
+    book = Book.objects.filter(pk=book_id).first()
+    if book is None:
+        return
+
+    # Data and cover lookups run side by side under one deadline
+    deadline = new_deadline()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        cover = None if book.thumbnail_url else pool.submit(
+            fetch_ol_cover, isbn=book.isbn, title=book.title, deadline=deadline
+        )
+        ol_data  = fetch_ol_data(book.title, isbn=book.isbn, deadline=deadline)
+        ol_cover = cover.result() if cover else None
+
+    changed = []
+    if ol_data['year'] and ol_data['year'] != book.publish_year:
+        book.publish_year = ol_data['year']
+        changed.append('publish_year')
+    if ol_cover:
+        book.thumbnail_url = ol_cover
+        changed.append('thumbnail_url')
+
+    with transaction.atomic():
+        if changed:
+            book.save(update_fields=changed)
+        set_book_subjects(book, ol_data['subjects'], replace=False)
@@ -1,3 +1,1112 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models.signals import m2m_changed
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from game.models import Category, CategoryAnswer, DailyPuzzle
+from . import autocomplete, fuzzy, google_books, http, http_cache, jobs, resilience, search, throttling
+from .management.commands.populate_from_json import Command as PopulateCommand
+from .models import Author, Book, Job, Subject
+from .subjects import set_book_subjects
+
+
+# ── Job queue ─────────────────────────────────────────────────────────────────
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def ok(**payload):
+            self.calls.append(payload)
+
+        def boom(**payload):
+            raise RuntimeError("upstream down")
+
+        patcher = mock.patch.dict(jobs.HANDLERS, {'ok': ok, 'boom': boom})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claim_takes_the_oldest_due_job_once(self):
+        first  = jobs.enqueue('ok', n=1)
+        second = jobs.enqueue('ok', n=2)
+        later  = jobs.enqueue('ok', n=3)
+        Job.objects.filter(pk=later.pk).update(run_after=timezone.now() + timedelta(minutes=5))
+
+        claimed = jobs.claim()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual((claimed.status, claimed.attempts), (Job.RUNNING, 1))
+        self.assertIsNotNone(claimed.locked_at)
+        self.assertEqual(jobs.claim().pk, second.pk)
+        self.assertIsNone(jobs.claim())   # the third isn't due yet
+
+    def test_successful_job_is_done(self):
+        jobs.enqueue('ok', book_id='b1')
+        self.assertTrue(jobs.run(jobs.claim()))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(self.calls, [{'book_id': 'b1'}])
+
+    def test_failed_job_is_retried_with_exponential_backoff(self):
+        job = jobs.enqueue('boom')
+        for attempt in range(1, jobs.MAX_ATTEMPTS):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            before = timezone.now()
+            with self.assertLogs('library.jobs', 'WARNING'):
+                self.assertFalse(jobs.run(jobs.claim()))
+
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.PENDING, attempt))
+            self.assertIn("upstream down", job.last_error)
+            delay = (job.run_after - before).total_seconds()
+            self.assertAlmostEqual(delay, jobs.BACKOFF * 2 ** (attempt - 1), delta=1)
+            self.assertIsNone(jobs.claim())   # not due until the backoff passes
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs('library.jobs', 'ERROR'):
+            self.assertFalse(jobs.run(jobs.claim()))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, jobs.MAX_ATTEMPTS))
+        self.assertIsNone(jobs.claim())
+
+    def test_unknown_kind_fails_without_retrying(self):
+        jobs.enqueue('nope')
+        with self.assertLogs('library.jobs', 'ERROR'):
+            self.assertFalse(jobs.run(jobs.claim()))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_stale_running_job_goes_back_to_pending(self):
+        jobs.enqueue('ok')
+        job = jobs.claim()
+        self.assertEqual(jobs.requeue_stale(), 0)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=jobs.STALE_AFTER + 1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(jobs.claim().pk, job.pk)
+
+    def test_work_runs_due_jobs_up_to_the_limit(self):
+        for n in range(3):
+            jobs.enqueue('ok', n=n)
+        self.assertEqual(jobs.work(limit=2), 2)
+        self.assertEqual(jobs.work(), 1)
+        self.assertEqual(self.calls, [{'n': 0}, {'n': 1}, {'n': 2}])
+
+    def test_prune_deletes_only_old_finished_jobs(self):
+        old = timezone.now() - timedelta(days=jobs.KEEP_DAYS + 1)
+        done_old    = jobs.enqueue('ok')
+        done_recent = jobs.enqueue('ok')
+        failed_old  = jobs.enqueue('boom')
+        Job.objects.filter(pk__in=[done_old.pk, done_recent.pk]).update(status=Job.DONE)
+        Job.objects.filter(pk=failed_old.pk).update(status=Job.FAILED)
+        Job.objects.filter(pk__in=[done_old.pk, failed_old.pk]).update(updated_at=old)
+
+        self.assertEqual(jobs.prune(), 1)
+        self.assertEqual(set(Job.objects.values_list('pk', flat=True)), {done_recent.pk, failed_old.pk})
+
+
+# ── Subjects ──────────────────────────────────────────────────────────────────
+
+class SetBookSubjectsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book    = Book.objects.create(google_book_id='b1', title='Dune', author=Author.objects.create(name='Frank Herbert'))
+        cls.fiction = Subject.objects.create(name='Science Fiction')
+        cls.classic = Subject.objects.create(name='Classics')
+
+    def setUp(self):
+        self.actions = []
+
+        def record(sender, instance, action, pk_set, **kwargs):
+            if instance == self.book:
+                self.actions.append((action, frozenset(pk_set)))
+
+        m2m_changed.connect(record, sender=Book.subjects.through, weak=False)
+        self.addCleanup(m2m_changed.disconnect, record, sender=Book.subjects.through)
+
+    def linked(self):
+        return set(self.book.subjects.values_list('name', flat=True))
+
+    def test_variants_resolve_to_the_existing_subject(self):
+        subjects = set_book_subjects(self.book, [' science  FICTION', 'Science fiction', 'space opera '])
+        self.assertEqual([s.name for s in subjects], ['Science Fiction', 'Space Opera'])
+        self.assertEqual(subjects[0].pk, self.fiction.pk)
+        self.assertEqual(Subject.objects.filter(normalized_name='science fiction').count(), 1)
+        self.assertEqual(self.linked(), {'Science Fiction', 'Space Opera'})
+
+    def test_replace_removes_other_links(self):
+        self.book.subjects.add(self.classic)
+        self.actions.clear()
+        set_book_subjects(self.book, ['Science Fiction'])
+        self.assertEqual(self.linked(), {'Science Fiction'})
+        self.assertEqual(self.actions, [
+            ('pre_remove',  {self.classic.pk}), ('post_remove', {self.classic.pk}),
+            ('pre_add',     {self.fiction.pk}), ('post_add',    {self.fiction.pk}),
+        ])
+
+    def test_add_keeps_other_links(self):
+        self.book.subjects.add(self.classic)
+        self.actions.clear()
+        set_book_subjects(self.book, ['Science Fiction', 'classics'], replace=False)
+        self.assertEqual(self.linked(), {'Science Fiction', 'Classics'})
+        self.assertEqual(self.actions, [('pre_add', {self.fiction.pk}), ('post_add', {self.fiction.pk})])
+
+    def test_nothing_changes_when_the_links_already_match(self):
+        self.book.subjects.add(self.fiction)
+        self.actions.clear()
+        set_book_subjects(self.book, ['Science Fiction'])
+        self.assertEqual(self.actions, [])
+
+    def test_empty_names_clear_only_with_replace(self):
+        self.book.subjects.add(self.classic)
+        set_book_subjects(self.book, ['  ', ''], replace=False)
+        self.assertEqual(self.linked(), {'Classics'})
+        set_book_subjects(self.book, [])
+        self.assertEqual(self.linked(), set())
+
+
+# ── On-disk HTTP cache ────────────────────────────────────────────────────────
+
+def fake_response(body, status=200, url='https://openlibrary.org/works/OL1W.json'):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(body).encode()
+    return response
+
+
+class DiskCacheTests(SimpleTestCase):
+    URL = 'https://openlibrary.org/search.json'
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def cache(self, **kwargs):
+        return http_cache.DiskCache(self.directory, **kwargs)
+
+    def test_round_trip_ignores_param_order(self):
+        cache = self.cache()
+        cache.put(self.URL, {'q': 'dune', 'limit': 1}, fake_response({'docs': [1]}))
+        hit = cache.get(self.URL + '?limit=1', {'q': 'dune'})
+        self.assertEqual((hit.status_code, hit.json()), (200, {'docs': [1]}))
+        self.assertTrue(hit.from_cache)
+        self.assertIsNone(cache.get(self.URL, {'q': 'dune', 'limit': 2}))
+        self.assertEqual((cache.counts['hits'], cache.counts['misses']), (1, 1))
+
+    def test_only_200_and_404_are_stored(self):
+        cache = self.cache()
+        for status in (200, 404, 429, 503):
+            cache.put(self.URL, {'status': status}, fake_response({}, status=status))
+        self.assertEqual(
+            [cache.get(self.URL, {'status': status}) is not None for status in (200, 404, 429, 503)],
+            [True, True, False, False],
+        )
+
+    def test_expired_entries_are_misses_online_and_hits_offline(self):
+        self.cache(ttl=60).put(self.URL, {'q': 'dune'}, fake_response({'docs': []}))
+        later = time.time() + 61
+        with mock.patch.object(http_cache.time, 'time', return_value=later):
+            self.assertIsNone(self.cache(ttl=60).get(self.URL, {'q': 'dune'}))
+            self.assertIsNotNone(self.cache(ttl=60, offline=True).get(self.URL, {'q': 'dune'}))
+
+    def test_offline_miss_raises_a_request_exception(self):
+        with self.assertRaises(requests.exceptions.RequestException) as raised:
+            self.cache(offline=True).get(self.URL, {'q': 'dune'})
+        self.assertIsInstance(raised.exception, http_cache.OfflineMiss)
+
+    def test_eviction_drops_least_recently_used_entries(self):
+        body = {'padding': 'x' * 1000}
+        size = len(json.dumps(body)) + 300
+        cache = self.cache(max_bytes=size * 3)
+        now = time.time()
+        for n in range(3):
+            cache.put(self.URL, {'n': n}, fake_response(body))
+            path = cache._path(http_cache.cache_key(self.URL, {'n': n}))
+            os.utime(path, (now - 100 + n, now - 100 + n))
+        cache.get(self.URL, {'n': 0})   # now the most recently used
+
+        cache.put(self.URL, {'n': 3}, fake_response(body))
+        self.assertGreater(cache.counts['evicted'], 0)
+        self.assertLessEqual(cache.size_bytes, cache.max_bytes * http_cache.EVICT_TO)
+        self.assertIsNotNone(cache.get(self.URL, {'n': 0}))
+        self.assertIsNone(cache.get(self.URL, {'n': 1}))
+
+    def test_size_is_recounted_from_disk(self):
+        cache = self.cache()
+        cache.put(self.URL, {'q': 'dune'}, fake_response({'docs': []}))
+        self.assertEqual(self.cache().size_bytes, cache.size_bytes)
+
+    def test_http_get_is_served_from_the_active_cache(self):
+        options = {'http_cache_dir': self.directory}
+        with mock.patch.object(http_cache, '_active', None):
+            http_cache.configure(options)
+            with mock.patch.object(requests.Session, 'request', return_value=fake_response({'n': 1})) as network:
+                first  = http.get(self.URL, params={'q': 'dune'})
+                second = http.get(self.URL, params={'q': 'dune'})
+            self.assertEqual(network.call_count, 1)
+            self.assertEqual(second.json(), first.json())
+
+            http_cache.configure({**options, 'offline': True})
+            with self.assertRaises(http_cache.OfflineMiss):
+                http.get(self.URL, params={'q': 'unseen'})
+
+
+# ── Bulk import ───────────────────────────────────────────────────────────────
+
+class PopulateFromJsonTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.json_file  = os.path.join(tmp.name, 'books.json')
+        self.checkpoint = self.json_file + '.checkpoint'
+        self.cache_dir  = os.path.join(tmp.name, 'http')
+        self.write_file([
+            {'author_name': f'Author {a}', 'books': [
+                {'title': f'Book {a}-{b}', 'key': f'/works/OL{a}{b}W', 'publish_year': 1990 + b, 'subjects': ['Fiction']}
+                for b in range(3)
+            ]}
+            for a in range(2)
+        ])
+
+        patcher = mock.patch.object(http_cache, '_active', None)   # don't leak the command's cache
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.requested = []
+        self.down = set()
+
+    def write_file(self, data):
+        with open(self.json_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def fake_request(self, method, url, **kwargs):
+        self.requested.append(url)
+        if any(f'/works/{work}' in url for work in self.down):
+            raise requests.exceptions.ConnectionError("down")
+        if url.endswith('/editions.json'):
+            return fake_response({'entries': [{'isbn_13': ['9780000000002'], 'number_of_pages': 123, 'covers': [7]}]})
+        return fake_response({})
+
+    def populate(self, *args):
+        def fake(session, method, url, **kwargs):
+            return self.fake_request(method, url, **kwargs)
+
+        with mock.patch.object(requests.Session, 'request', fake):
+            call_command(
+                'populate_from_json', self.json_file, '--batch-size', '2', '--rate', '1000',
+                '--http-cache-dir', self.cache_dir, *args, stdout=StringIO(),
+            )
+
+    def checkpoint_data(self):
+        with open(self.checkpoint, encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_interrupted_import_resumes_after_the_last_chunk(self):
+        write_chunk = PopulateCommand.write_chunk
+        chunks = []
+
+        def fail_on_second_chunk(command, chunk, fetched):
+            chunks.append(chunk)
+            if len(chunks) == 2:
+                raise KeyboardInterrupt
+            return write_chunk(command, chunk, fetched)
+
+        with mock.patch.object(PopulateCommand, 'write_chunk', fail_on_second_chunk), \
+                self.assertRaises(KeyboardInterrupt):
+            self.populate('--no-http-cache')
+        self.assertEqual(self.checkpoint_data(), {'done': ['OL00W', 'OL01W'], 'failed': []})
+        self.assertEqual(Book.objects.count(), 2)
+
+        self.requested.clear()
+        self.populate('--no-http-cache')
+        self.assertEqual(len(self.requested), 4 * 2)   # the four remaining books only
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.assertEqual(Book.objects.count(), 6)
+        book = Book.objects.get(pk='OL12W')
+        self.assertEqual((book.isbn, book.page_count, book.title_word_count), ('9780000000002', 123, 2))
+        self.assertEqual(list(book.subjects.values_list('name', flat=True)), ['Fiction'])
+
+    def test_failed_fetches_are_saved_and_retried_on_the_next_run(self):
+        self.down = {'OL01W'}
+        self.populate('--no-http-cache')
+        checkpoint = self.checkpoint_data()
+        self.assertEqual(checkpoint['failed'], ['OL01W'])
+        self.assertNotIn('OL01W', checkpoint['done'])
+        self.assertIsNone(Book.objects.get(pk='OL01W').isbn)   # written from the file alone
+
+        self.down = set()
+        self.requested.clear()
+        self.populate('--no-http-cache')
+        self.assertEqual(len(self.requested), 2)
+        self.assertEqual(Book.objects.get(pk='OL01W').isbn, '9780000000002')
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_offline_cache_misses_are_not_checkpointed_as_done(self):
+        self.populate('--offline')
+        self.assertEqual(self.requested, [])
+        checkpoint = self.checkpoint_data()
+        self.assertEqual((len(checkpoint['done']), len(checkpoint['failed'])), (0, 6))
+
+        self.populate()   # online, filling the cache
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+        self.requested.clear()
+        self.populate('--offline', '--restart')
+        self.assertEqual(self.requested, [])
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_books_without_subjects_in_the_file_keep_theirs(self):
+        book = Book.objects.create(google_book_id='g1', title='Book 0-0', author=Author.objects.create(name='Author 0'))
+        book.subjects.add(Subject.objects.create(name='Mystery'))
+        self.write_file([{'author_name': 'Author 0', 'books': [
+            {'title': 'Book 0-0', 'key': '/works/OL00W', 'subjects': []},
+            {'title': 'Book 0-1', 'key': '/works/OL01W', 'subjects': ['Horror']},
+        ]}])
+        self.populate('--no-http-cache')
+        self.assertEqual(list(Book.objects.get(pk='g1').subjects.values_list('name', flat=True)), ['Mystery'])
+        self.assertEqual(list(Book.objects.get(pk='OL01W').subjects.values_list('name', flat=True)), ['Horror'])
+
+    def test_import_rebuilds_the_answer_tables(self):
+        nineties = Category.objects.create(display_name='1990s', logic_code='Td99')
+        two_word = Category.objects.create(display_name='Two words', logic_code='Nw2')
+        puzzle = DailyPuzzle.objects.create(
+            date=timezone.now().date(),
+            row_1=nineties, row_2=nineties, row_3=nineties, col_1=two_word, col_2=two_word, col_3=two_word,
+        )
+        self.populate('--no-http-cache')
+
+        imported = sorted(Book.objects.values_list('pk', flat=True))
+        self.assertEqual(len(imported), 6)
+        self.assertEqual(CategoryAnswer.objects.filter(category=nineties).count(), 6)
+        puzzle.refresh_from_db()
+        self.assertEqual(puzzle.get_cell_answers(1, 1), imported)
+
+
+# ── Grid validation ───────────────────────────────────────────────────────────
+
+class ValidateGridTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        nineties = Category.objects.create(display_name='1990s', logic_code='Td99')
+        modern   = Category.objects.create(display_name='21st century', logic_code='Tc21')
+        two_word = Category.objects.create(display_name='Two words', logic_code='Nw2')
+        cls.puzzle = DailyPuzzle.objects.create(
+            date=timezone.now().date(),
+            row_1=nineties, row_2=modern, row_3=nineties, col_1=two_word, col_2=two_word, col_3=two_word,
+        )
+        author = Author.objects.create(name='Ann Author')
+        Book.objects.create(google_book_id='b1', title='Blue Moon', author=author, publish_year=1995)
+        Book.objects.create(google_book_id='b2', title='Red Sun', author=author, publish_year=2010)
+
+    def post(self, body):
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        return self.client.post(reverse('validate-grid'), body, content_type='application/json')
+
+    def guess(self, book_id, row, col):
+        return {'book_id': book_id, 'row': row, 'col': col}
+
+    def test_verdicts_come_back_in_order(self):
+        response = self.post({'puzzle_date': str(self.puzzle.date), 'guesses': [
+            self.guess('b1', 1, 1), self.guess('b2', 1, 2), self.guess('b2', 2, 3), self.guess('nope', 3, 3),
+        ]})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['is_correct'] for r in results], [True, False, True, False])
+        self.assertEqual([r['book_title'] for r in results], ['Blue Moon', 'Red Sun', 'Red Sun', None])
+
+    def test_guess_count_is_capped(self):
+        for guesses in ([], [self.guess('b1', 1, 1)] * 10):
+            with self.subTest(count=len(guesses)):
+                self.assertEqual(self.post({'guesses': guesses}).status_code, 400)
+        self.assertEqual(self.post({'guesses': [self.guess('b1', 1, 1)] * 9}).status_code, 200)
+
+    def test_cells_outside_the_grid_are_rejected(self):
+        for row, col in ((0, 1), (4, 1), (1, 0), (1, 4)):
+            with self.subTest(row=row, col=col):
+                self.assertEqual(self.post({'guesses': [self.guess('b1', row, col)]}).status_code, 400)
+
+    def test_missing_puzzle_is_a_404(self):
+        response = self.post({'puzzle_date': '1999-01-01', 'guesses': [self.guess('b1', 1, 1)]})
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_bodies_are_a_400(self):
+        bodies = [
+            'not json', '[]', '"x"', '5', 'null',
+            {'guesses': 5}, {'guesses': [1]}, {'guesses': ['a']}, {'guesses': [{'book_id': 'b1'}]},
+            {'guesses': [self.guess('b1', 'x', 1)]},
+            {'puzzle_date': 'yesterday', 'guesses': [self.guess('b1', 1, 1)]},
+            {'puzzle_date': 20260101, 'guesses': [self.guess('b1', 1, 1)]},
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+
+# ── Circuit breakers and retry budget ─────────────────────────────────────────
+
+class Clock:
+    """Stands in for a time function so cooldowns and windows can be stepped through."""
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(resilience.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = resilience.CircuitBreaker('test')
+
+    def open_breaker(self):
+        for _ in range(resilience.FAILURE_THRESHOLD):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(resilience.FAILURE_THRESHOLD - 1):
+            self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, self.breaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.rejected, 1)
+
+    def test_success_resets_the_failure_count(self):
+        for _ in range(resilience.FAILURE_THRESHOLD - 1):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, self.breaker.CLOSED)
+
+    def test_half_open_after_the_cooldown_lets_one_trial_through(self):
+        self.open_breaker()
+        self.clock.now += resilience.RESET_TIMEOUT - 1
+        self.assertFalse(self.breaker.allow())
+        self.clock.now += 1
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, self.breaker.HALF_OPEN)
+        self.assertFalse(self.breaker.allow())   # the trial is still in flight
+
+    def test_successful_trial_closes(self):
+        self.open_breaker()
+        self.clock.now += resilience.RESET_TIMEOUT
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, self.breaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_reopens_for_another_cooldown(self):
+        self.open_breaker()
+        self.clock.now += resilience.RESET_TIMEOUT
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, self.breaker.OPEN)
+        self.clock.now += resilience.RESET_TIMEOUT - 1
+        self.assertFalse(self.breaker.allow())
+        self.clock.now += 1
+        self.assertTrue(self.breaker.allow())
+
+
+class RetryBudgetTests(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(resilience.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.budget = resilience.RetryBudget()
+
+    def spend_all(self):
+        spent = 0
+        while self.budget.try_spend():
+            spent += 1
+        return spent
+
+    def test_floor_allows_a_few_retries_without_traffic(self):
+        self.assertEqual(self.spend_all(), resilience.RETRY_FLOOR)
+
+    def test_retries_are_capped_at_a_ratio_of_requests(self):
+        for _ in range(100):
+            self.budget.record_request()
+        self.assertEqual(self.spend_all(), resilience.RETRY_FLOOR + int(100 * resilience.RETRY_RATIO))
+
+    def test_budget_recovers_once_the_window_passes(self):
+        self.spend_all()
+        self.clock.now += resilience.RETRY_WINDOW + 1
+        self.assertEqual(self.spend_all(), resilience.RETRY_FLOOR)
+
+
+class ResilientRequestTests(TestCase):
+    URL = 'https://www.googleapis.com/books/v1/volumes'
+
+    def setUp(self):
+        self.breaker = resilience.CircuitBreaker('google_books')
+        for patcher in (
+            mock.patch.dict(resilience.BREAKERS, {'google_books': self.breaker}),
+            mock.patch.object(resilience, 'RETRY_BUDGET', resilience.RetryBudget()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def request(self, *outcomes):
+        with mock.patch.object(http, 'request', side_effect=list(outcomes)) as sent:
+            try:
+                return resilience.get('google_books', self.URL), sent.call_count
+            except requests.exceptions.RequestException as exc:
+                return exc, sent.call_count
+
+    def test_success_is_returned_at_once(self):
+        response, calls = self.request(fake_response({}))
+        self.assertEqual((response.status_code, calls), (200, 1))
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_rate_limits_and_server_errors_are_failures_and_retried(self):
+        for status in (429, 500, 502, 503, 504):
+            with self.subTest(status=status), mock.patch.object(resilience, 'RETRY_BUDGET', resilience.RetryBudget()):
+                self.breaker.record_success()
+                response, calls = self.request(fake_response({}, status=status), fake_response({}))
+                self.assertEqual((response.status_code, calls), (200, 2))
+                self.assertEqual(self.breaker.state, self.breaker.CLOSED)
+
+    def test_persistent_failure_returns_the_last_response(self):
+        outcomes = [fake_response({}, status=503)] * (resilience.MAX_RETRIES + 1)
+        response, calls = self.request(*outcomes)
+        self.assertEqual((response.status_code, calls), (503, resilience.MAX_RETRIES + 1))
+        self.assertEqual(self.breaker.failures, resilience.MAX_RETRIES + 1)
+
+    def test_transport_errors_are_raised_after_retries(self):
+        error = requests.exceptions.ConnectionError("down")
+        raised, calls = self.request(*[error] * (resilience.MAX_RETRIES + 1))
+        self.assertIs(raised, error)
+        self.assertEqual(calls, resilience.MAX_RETRIES + 1)
+
+    def test_retries_stop_when_the_budget_is_spent(self):
+        resilience.RETRY_BUDGET.record_request()
+        while resilience.RETRY_BUDGET.try_spend():
+            pass
+        response, calls = self.request(fake_response({}, status=503), fake_response({}))
+        self.assertEqual((response.status_code, calls), (503, 1))
+
+    def test_open_circuit_fails_fast(self):
+        for _ in range(resilience.FAILURE_THRESHOLD):
+            self.breaker.record_failure()
+        raised, calls = self.request(fake_response({}))
+        self.assertIsInstance(raised, resilience.CircuitOpenError)
+        self.assertEqual(calls, 0)
+
+    def test_unexpected_error_ends_a_half_open_trial(self):
+        self.breaker.state = self.breaker.HALF_OPEN
+        with mock.patch.object(http, 'request', side_effect=ValueError("bad")), self.assertRaises(ValueError):
+            resilience.get('google_books', self.URL)
+        self.assertEqual(self.breaker.state, self.breaker.OPEN)
+        self.assertFalse(self.breaker._trial_in_flight)
+
+
+# ── Throttling ────────────────────────────────────────────────────────────────
+
+class ThrottleTests(TestCase):
+    RATES = {
+        'search':   {'session': '2/min', 'ip': '3/min'},
+        'validate': {'session': '1/min', 'ip': '1/min'},
+    }
+
+    def setUp(self):
+        # Starts at the real time: the cache computes its expiries from time.time() too
+        self.clock = Clock(time.time())
+        for patcher in (
+            mock.patch.object(throttling, 'THROTTLE_RATES', self.RATES),
+            mock.patch.object(throttling.time, 'time', self.clock),
+            mock.patch.object(autocomplete, 'refresh_in_background'),   # searches don't need the index
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def client_request(self, session_key=None, ip='10.0.0.1'):
+        request = RequestFactory().get('/', REMOTE_ADDR=ip)
+        if session_key:
+            request.session = mock.Mock(session_key=session_key)
+        return request
+
+    def allowed(self, request, times, scope='search'):
+        return [throttling.take(request, scope)[0] for _ in range(times)]
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate('60/min'), (60, 1.0))
+        self.assertEqual(throttling.parse_rate('10/s'), (10, 10.0))
+        self.assertEqual(throttling.parse_rate('7200/hour'), (7200, 2.0))
+        self.assertEqual(throttling.parse_rate('30/ Min'), (30, 0.5))
+        with self.assertRaises(KeyError):
+            throttling.parse_rate('30/fortnight')
+
+    def test_session_and_ip_buckets_are_separate(self):
+        self.assertEqual(self.allowed(self.client_request('alice'), 3), [True, True, False])
+        # Same address, another session: only the IP bucket has been drawn on
+        self.assertEqual(self.allowed(self.client_request('bob'), 2), [True, False])
+        self.assertEqual(self.allowed(self.client_request('carol'), 1), [False])
+        self.assertEqual(self.allowed(self.client_request('carol', ip='10.0.0.2'), 2), [True, True])
+
+    def test_clients_without_a_session_share_their_ip_bucket(self):
+        self.assertEqual(self.allowed(self.client_request(), 4), [True, True, True, False])
+        self.assertEqual(self.allowed(self.client_request(ip='10.0.0.2'), 1), [True])
+
+    def test_ip_comes_from_the_trusted_proxy_hop(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.9.9.9', HTTP_X_FORWARDED_FOR='6.6.6.6, 10.0.0.1')
+        self.assertEqual(throttling.client_ip(request), '10.0.0.1')
+        with mock.patch.object(throttling, 'THROTTLE_TRUSTED_PROXIES', 0):
+            self.assertEqual(throttling.client_ip(request), '10.9.9.9')
+
+    def test_buckets_refill_over_time(self):
+        request = self.client_request('alice')
+        self.assertEqual(self.allowed(request, 3), [True, True, False])
+        self.assertEqual(throttling.take(request, 'search'), (False, 30))
+        self.clock.now += 30
+        self.assertEqual(self.allowed(request, 2), [True, False])
+
+    def test_throttled_search_skips_google(self):
+        with mock.patch.object(google_books, 'search_volumes', return_value=[]) as google:
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse('book-search'), {'q': 'dune messiah'}).status_code, 200)
+            self.assertEqual(google.call_count, 3)
+
+            response = self.client.get(reverse('book-search'), {'q': 'dune messiah'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), [])
+            response = self.client.get(reverse('book-search-stream'), {'q': 'dune messiah'})
+            self.assertEqual(b''.join(response.streaming_content).count(b'\n'), 1)
+            self.assertEqual(google.call_count, 3)
+
+    def test_throttled_validation_is_refused_with_retry_after(self):
+        body = json.dumps({'date': '2026-01-01', 'guesses': {}})
+        self.assertNotEqual(self.client.post(reverse('validate-grid'), body, content_type='application/json').status_code, 429)
+        response = self.client.post(reverse('validate-grid'), body, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+
+# ── Google Books search cache ─────────────────────────────────────────────────
+
+FETCH_SEARCH = google_books.fetch_search
+HOBBIT = [{'id': 'hobbit1', 'volumeInfo': {'title': 'The Hobbit', 'authors': ['J.R.R. Tolkien']}}]
+
+
+class GoogleBooksCacheTestCase(SimpleTestCase):
+    """Runs google_books against in-memory caches (no database) with fetch_search mocked."""
+
+    def setUp(self):
+        self.search_cache = LocMemCache('google-books-tests', {})
+        self.search_cache.clear()
+        self.default_cache = LocMemCache('google-books-tests-default', {})
+        self.default_cache.clear()
+        self.fetch = mock.Mock(return_value=HOBBIT)
+        for patcher in (
+            mock.patch.object(google_books, 'search_cache', lambda: self.search_cache),
+            mock.patch.object(google_books, 'cache', self.default_cache),
+            mock.patch.object(google_books, 'fetch_search', self.fetch),
+            mock.patch.dict(google_books._flights, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def key(self, query):
+        return google_books._search_key(google_books.normalize_query(query))
+
+
+class SearchCacheTests(GoogleBooksCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.clock = Clock()
+        for patcher in (
+            mock.patch.object(google_books.time, 'monotonic', self.clock),
+            mock.patch.object(google_books, '_last_flush', self.clock.now),
+            mock.patch.object(google_books, '_worker_counts', google_books.Counter()),
+            mock.patch.object(google_books, '_pending_counts', google_books.Counter()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_queries_are_normalized_into_one_entry(self):
+        self.assertEqual(google_books.normalize_query(' The  Hobbit! '), 'the hobbit')
+        for query in ('The Hobbit', 'the  hobbit', 'THE HOBBIT!', ' the hobbit. '):
+            self.assertEqual(google_books.search_volumes(query), HOBBIT)
+        self.fetch.assert_called_once_with('The Hobbit')
+        self.assertEqual(google_books.search_volumes('!!!'), [])
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_search_results_are_stashed_by_volume(self):
+        google_books.search_volumes('The Hobbit')
+        with mock.patch.object(google_books.resilience, 'get') as get:
+            self.assertEqual(google_books.get_volume('hobbit1'), HOBBIT[0])
+        get.assert_not_called()
+
+    def test_empty_results_are_cached_for_the_negative_ttl(self):
+        self.fetch.return_value = []
+        with mock.patch.object(self.search_cache, 'set', wraps=self.search_cache.set) as cache_set:
+            self.assertEqual(google_books.search_volumes('The Hobit'), [])
+        cache_set.assert_called_once_with(self.key('the hobit'), [], google_books.NEGATIVE_TTL)
+        self.assertEqual(google_books.search_volumes('the hobit'), [])
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(google_books.search_cache_stats()['worker']['negative_hits'], 1)
+
+    def test_failed_requests_are_not_cached(self):
+        self.fetch.return_value = None
+        self.assertEqual(google_books.search_volumes('The Hobbit'), [])
+        self.assertIsNone(self.search_cache.get(self.key('the hobbit')))
+        self.fetch.return_value = HOBBIT
+        self.assertEqual(google_books.search_volumes('The Hobbit'), HOBBIT)
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_failed_requests_to_google_are_not_cached(self):
+        for failure in (requests.exceptions.Timeout("slow"), fake_response({}, status=500)):
+            with self.subTest(failure=failure), \
+                    mock.patch.object(google_books, 'fetch_search', FETCH_SEARCH), \
+                    mock.patch.object(google_books.resilience, 'get', side_effect=[failure]):
+                self.assertEqual(google_books.search_volumes('The Hobbit'), [])
+                self.assertIsNone(self.search_cache.get(self.key('the hobbit')))
+
+    def test_counts_reach_the_shared_totals_in_batches(self):
+        for _ in range(5):
+            google_books.search_volumes('The Hobbit')
+        self.assertEqual(self.default_cache.get(google_books.STATS_KEYS['hits']), None)
+
+        self.clock.now += google_books.STATS_FLUSH_INTERVAL
+        google_books.search_volumes('The Hobbit')
+        self.assertEqual(self.default_cache.get(google_books.STATS_KEYS['hits']), 5)
+        self.assertEqual(self.default_cache.get(google_books.STATS_KEYS['misses']), 1)
+
+        stats = google_books.search_cache_stats()
+        self.assertEqual(stats['worker'], {'hits': 5, 'negative_hits': 0, 'misses': 1, 'coalesced': 0})
+        self.assertEqual(stats['shared'], stats['worker'])
+
+
+class SingleFlightTests(GoogleBooksCacheTestCase):
+    def setUp(self):
+        super().setUp()
+        self.clock = Clock()
+        self.sleeps = []
+        for patcher in (
+            mock.patch.object(google_books.time, 'monotonic', self.clock),
+            mock.patch.object(google_books.time, 'sleep', self.sleep),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.on_sleep = lambda: None
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.clock.now += seconds
+        self.on_sleep()
+
+    def test_follower_in_the_worker_takes_the_leaders_result(self):
+        flight = google_books._Flight()
+        flight.items = HOBBIT
+        flight.done.set()
+        google_books._flights['the hobbit'] = flight
+        self.assertEqual(google_books.search_volumes('The Hobbit'), HOBBIT)
+        self.fetch.assert_not_called()
+
+    def test_follower_in_the_worker_fetches_itself_when_the_leader_is_slow(self):
+        google_books._flights['the hobbit'] = google_books._Flight()
+        with mock.patch.object(google_books, 'COALESCE_WAIT', 0.01):
+            self.assertEqual(google_books.search_volumes('The Hobbit'), HOBBIT)
+        self.fetch.assert_called_once_with('The Hobbit')
+
+    def test_leader_releases_its_lock(self):
+        self.fetch.return_value = None
+        self.assertEqual(google_books.search_volumes('The Hobbit'), [])
+        self.assertIsNone(self.search_cache.get('lock:' + self.key('the hobbit')))
+        self.assertEqual(google_books._flights, {})
+
+    def test_other_workers_lock_is_waited_on(self):
+        key = self.key('the hobbit')
+        self.search_cache.add('lock:' + key, 1, google_books.LOCK_TTL)
+        self.on_sleep = lambda: len(self.sleeps) == 3 and self.search_cache.set(key, HOBBIT)
+        self.assertEqual(google_books.search_volumes('The Hobbit'), HOBBIT)
+        self.assertEqual(len(self.sleeps), 3)
+        self.fetch.assert_not_called()
+
+    def test_lock_released_without_an_entry_means_fetch_at_once(self):
+        key = self.key('the hobbit')
+        self.search_cache.add('lock:' + key, 1, google_books.LOCK_TTL)
+        self.on_sleep = lambda: self.search_cache.delete('lock:' + key)
+        self.assertEqual(google_books.search_volumes('The Hobbit'), HOBBIT)
+        self.assertEqual(len(self.sleeps), 1)
+        self.fetch.assert_called_once_with('The Hobbit')
+
+    def test_fetches_itself_once_the_wait_runs_out(self):
+        self.search_cache.add('lock:' + self.key('the hobbit'), 1, google_books.LOCK_TTL)
+        self.assertEqual(google_books.search_volumes('The Hobbit'), HOBBIT)
+        self.assertAlmostEqual(sum(self.sleeps), google_books.COALESCE_WAIT)
+        self.fetch.assert_called_once_with('The Hobbit')
+
+
+class ConcurrentSearchTests(GoogleBooksCacheTestCase):
+    def test_concurrent_misses_make_one_request(self):
+        def slow_fetch(query):
+            time.sleep(0.2)   # long enough for every thread to find the flight
+            return HOBBIT
+
+        self.fetch.side_effect = slow_fetch
+        queries = ['The Hobbit', 'the hobbit', 'The  Hobbit!', ' THE HOBBIT '] * 2
+        results = [None] * len(queries)
+
+        def search(i):
+            results[i] = google_books.search_volumes(queries[i])
+
+        threads = [threading.Thread(target=search, args=(i,)) for i in range(len(queries))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(results, [HOBBIT] * len(queries))
+        self.assertEqual(google_books.search_volumes('the hobbit'), HOBBIT)
+        self.assertEqual(self.fetch.call_count, 1)
+
+
+# ── Local search ──────────────────────────────────────────────────────────────
+
+class LocalSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i, (title, author) in enumerate([
+            ('Letters', 'Hobbitson Smith'),
+            ('The Annotated Hobbit', 'Douglas Anderson'),
+            ('Hobbit Hole Stories', 'Ann Other'),
+            ('Hobbit', 'J.R.R. Tolkien'),
+            ('Dune', 'Frank Herbert'),
+        ]):
+            Book.objects.create(google_book_id=f'b{i}', title=title, author=Author.objects.create(name=author))
+
+    def titles(self, query, **kwargs):
+        return [book.title for book in search.search_books(query, **kwargs)]
+
+    def test_sqlite_uses_the_fts_index(self):
+        self.assertEqual(search.search_backend(), 'fts5')
+
+    def test_exact_title_beats_prefix_beats_word_beats_author(self):
+        expected = ['Hobbit', 'Hobbit Hole Stories', 'The Annotated Hobbit', 'Letters']
+        self.assertEqual(self.titles('Hobbit'), expected)
+        self.assertEqual(self.titles('hob'), expected)
+        self.assertEqual(self.titles('HOBBIT', limit=2), expected[:2])
+
+    def test_every_word_must_match_a_prefix(self):
+        self.assertEqual(self.titles('annotated hob'), ['The Annotated Hobbit'])
+        self.assertEqual(self.titles('hobbit frank'), [])
+        self.assertEqual(self.titles('?!'), [])
+
+    def test_orm_fallback_ranks_the_same(self):
+        with mock.patch.object(search, 'fts_available', return_value=False):
+            self.assertEqual(self.titles('Hobbit'), ['Hobbit', 'Hobbit Hole Stories', 'The Annotated Hobbit', 'Letters'])
+
+    def test_index_follows_edits_and_deletes(self):
+        book = Book.objects.get(title='Dune')
+        book.title = 'Dune Messiah'
+        book.save()
+        self.assertEqual(self.titles('messiah'), ['Dune Messiah'])
+        book.delete()
+        self.assertEqual(self.titles('dune'), [])
+
+
+class FuzzyMatchTests(SimpleTestCase):
+    BOOKS = [
+        {'id': 'b1', 'title': 'The Hobbit', 'author': 'J.R.R. Tolkien'},
+        {'id': 'b2', 'title': 'Hobbit Hole Stories', 'author': 'Ann Other'},
+        {'id': 'b3', 'title': 'Dune', 'author': 'Frank Herbert'},
+        {'id': 'b4', 'title': 'Middlemarch', 'author': 'George Eliot'},
+    ]
+
+    def setUp(self):
+        self.index = fuzzy.FuzzyIndex(self.BOOKS)
+
+    def ids(self, query):
+        return [book['id'] for _, book in self.index.search(query)]
+
+    def test_fold(self):
+        self.assertEqual(fuzzy.fold('  The Hobbit, or There and Back Again! '), 'hobbit or there and back again')
+        self.assertEqual(fuzzy.fold('The'), 'the')
+
+    def test_typos_find_the_title(self):
+        for query in ('hobit', 'Hobbbit', 'the hobbit!'):
+            with self.subTest(query=query):
+                self.assertEqual(self.ids(query)[0], 'b1')
+        self.assertEqual(self.ids('midlemarch'), ['b4'])
+
+    def test_misspelled_author_finds_their_books(self):
+        self.assertEqual(self.ids('frank herbet'), ['b3'])
+        self.assertEqual(self.ids('jrr tolkein'), ['b1'])
+
+    def test_unrelated_queries_find_nothing(self):
+        self.assertEqual(self.ids('xyzzy'), [])
+        self.assertEqual(self.ids('!!'), [])
+
+    def test_bounded_edit_distance(self):
+        self.assertEqual(fuzzy.bounded_edit_distance('hobit', 'hobbit', 2), 1)
+        self.assertEqual(fuzzy.bounded_edit_distance('hobbit', 'dune', 2), 3)
+
+    def test_rank_key_puts_exact_then_prefix_then_closeness(self):
+        results = [
+            ('Hobbit Hole Stories', 'Ann Other'),
+            ('The Annotated Hobbit', 'Douglas Anderson'),
+            ('The Hobbit', 'J.R.R. Tolkien'),
+        ]
+        ranked = sorted(results, key=lambda book: fuzzy.rank_key('hobbit', *book))
+        self.assertEqual([title for title, _ in ranked], ['The Hobbit', 'Hobbit Hole Stories', 'The Annotated Hobbit'])
+
+
+class FuzzySearchViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        tolkien = Author.objects.create(name='J.R.R. Tolkien')
+        Book.objects.create(google_book_id='b1', title='The Hobbit', author=tolkien)
+        Book.objects.create(google_book_id='b2', title='The Silmarillion', author=tolkien)
+
+    def setUp(self):
+        patcher = mock.patch.object(autocomplete, '_index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        autocomplete.build_index()
+
+    def test_misspelled_query_finds_the_local_book(self):
+        with mock.patch.object(google_books, 'search_volumes', return_value=[]):
+            response = self.client.get(reverse('book-search'), {'q': 'hobit'})
+        self.assertEqual(response.json()[0]['id'], 'b1')
+
+    def test_short_misspelled_prefix_is_padded_with_fuzzy_matches(self):
+        self.assertEqual([book['id'] for book in autocomplete.suggest('hob')], ['b1'])
+        self.assertEqual([book['id'] for book in autocomplete.suggest('hobi')], ['b1'])
+
+
+def volume(volume_id, title, author):
+    return {'id': volume_id, 'volumeInfo': {'title': title, 'authors': [author]}}
+
+
+class SearchStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        herbert = Author.objects.create(name='Frank Herbert')
+        for i, title in enumerate(['Dune', 'Dune Messiah', 'Children of Dune', 'God Emperor of Dune']):
+            Book.objects.create(google_book_id=f'dune{i}', title=title, author=herbert)
+
+    def setUp(self):
+        google = mock.patch.object(google_books, 'search_volumes', return_value=[
+            volume('g1', 'Dune Messiah', 'Frank Herbert'),   # already local
+            volume('g2', 'Dune: House Atreides', 'Brian Herbert'),
+        ])
+        self.google = google.start()
+        self.addCleanup(google.stop)
+        # Built here, or the first search would rebuild it on a background thread
+        index = mock.patch.object(autocomplete, '_index', None)
+        index.start()
+        self.addCleanup(index.stop)
+        autocomplete.build_index()
+
+    def stream(self, query):
+        response = self.client.get(reverse('book-search-stream'), {'q': query})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_local_line_then_only_new_google_books(self):
+        local, remote = self.stream('herbert')
+        self.assertEqual(local['phase'], 'local')
+        self.assertEqual({book['id'] for book in local['results']}, {'dune0', 'dune1', 'dune2', 'dune3'})
+        self.assertEqual(remote, {'phase': 'remote', 'results': [
+            {'id': 'g2', 'title': 'Dune: House Atreides', 'author': 'Brian Herbert',
+             'cover': 'https://placehold.co/55x80/4a4a4a/ffffff?text=N/A'},
+        ]})
+        self.google.assert_called_once_with('herbert')
+
+    def test_no_remote_line_for_an_exact_title(self):
+        lines = self.stream('dune messiah')
+        self.assertEqual([line['phase'] for line in lines], ['local'])
+        self.assertEqual(lines[0]['results'][0]['id'], 'dune1')
+        self.google.assert_not_called()
+
+    def test_no_remote_line_when_local_results_are_enough(self):
+        author = Author.objects.get(name='Frank Herbert')
+        Book.objects.create(google_book_id='dune4', title='Heretics of Dune', author=author)
+        self.assertEqual([line['phase'] for line in self.stream('herbert')], ['local'])
+        self.google.assert_not_called()
+
+    def test_no_remote_line_when_throttled(self):
+        with mock.patch.object(throttling, 'take', return_value=(False, 1)):
+            lines = self.stream('herbert')
+        self.assertEqual([line['phase'] for line in lines], ['local'])
+        self.assertEqual(len(lines[0]['results']), 4)
+        self.google.assert_not_called()
+
+    def test_plain_search_dedupes_google_results(self):
+        results = self.client.get(reverse('book-search'), {'q': 'herbert'}).json()
+        self.assertEqual(sorted(book['id'] for book in results), ['dune0', 'dune1', 'dune2', 'dune3', 'g2'])
+
+
+# ── Save & validate a guess ───────────────────────────────────────────────────
+
+class SaveAndValidateGuessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        short = Category.objects.create(display_name='Under 300 pages', logic_code='Lu300')
+        cls.puzzle = DailyPuzzle.objects.create(
+            date=timezone.localdate(),
+            row_1=short, row_2=short, row_3=short, col_1=short, col_2=short, col_3=short,
+        )
+        # No stored answers: the verdict comes from the answer matrix, which a new book is in at once
+        DailyPuzzle.objects.filter(pk=cls.puzzle.pk).update(cell_answers=None)
+
+    def setUp(self):
+        patcher = mock.patch.object(throttling, 'take', return_value=(True, 0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def guess(self, book_id='g1'):
+        body = {'book_id': book_id, 'row': 1, 'col': 1, 'puzzle_date': self.puzzle.date.isoformat()}
+        return self.client.post(reverse('validate-guess'), json.dumps(body), content_type='application/json').json()
+
+    def google_volume(self, **kwargs):
+        volume_info = {'title': 'Short Stories', 'authors': ['Ann Other'], 'pageCount': 120}
+        return mock.patch.object(google_books, 'get_volume', return_value={'id': 'g1', 'volumeInfo': volume_info}, **kwargs)
+
+    def test_new_book_is_saved_enqueued_and_validated(self):
+        with self.google_volume():
+            result = self.guess()
+        self.assertEqual(result, {'is_correct': True, 'message': 'Book selected and saved.', 'book_title': 'Short Stories'})
+        self.assertEqual(list(Job.objects.values_list('kind', 'payload')), [('enrich_book', {'book_id': 'g1'})])
+
+    def test_failed_enqueue_keeps_the_book_and_the_verdict(self):
+        with self.google_volume(), \
+                mock.patch.object(jobs, 'enqueue', side_effect=DatabaseError("queue down")), \
+                self.assertLogs('library.views', 'ERROR') as logs:
+            result = self.guess()
+        self.assertTrue(result['is_correct'])
+        self.assertTrue(Book.objects.filter(pk='g1').exists())
+        self.assertIn("Could not queue enrichment for book g1", logs.output[0])
+
+    def test_google_failure_is_logged_and_reported(self):
+        for failure in (requests.exceptions.ConnectionError("down"), KeyError('volumeInfo')):
+            with self.subTest(failure=failure), \
+                    mock.patch.object(google_books, 'get_volume', side_effect=failure), \
+                    self.assertLogs('library.views', 'ERROR') as logs:
+                result = self.guess()
+            self.assertEqual(result, {'is_correct': False, 'message': 'Could not verify and save book details.'})
+            self.assertIn("Could not fetch Google Books volume g1", logs.output[0])
+        self.assertFalse(Book.objects.exists())
+
+    def test_programming_errors_are_not_swallowed(self):
+        with mock.patch.object(google_books, 'get_volume', side_effect=TypeError("bug")), self.assertRaises(TypeError):
+            self.guess()
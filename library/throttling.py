@@ -0,0 +1,117 @@
+"""
+Token-bucket throttling for the public API endpoints.
+
+Each scope ('search', 'validate') has two buckets per client: one per session
+and one per IP, with rates from THROTTLE_RATES in settings ("60/min" means a
+burst of 60, refilled at one a second). A request needs a token from both;
+the IP bucket is looser since players behind one NAT share it. Clients
+without a session only have the IP bucket (we never create a session here).
+
+Buckets live in the 'throttle' cache as (tokens, updated_at), shared so every
+worker sees the same counts. Reads and writes aren't atomic, so two workers
+racing on one bucket may both spend the same token: good enough to stop a
+runaway client, not an exact meter.
+
+Over the limit, @throttle either answers 429 with Retry-After or, with
+degrade=True, marks the request (request.throttled) and lets the view serve
+a cheaper answer, as book search does by skipping Google.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600}
+
+DEFAULT_RATES = {
+    'search':   {'session': '60/min', 'ip': '300/min'},
+    'validate': {'session': '30/min', 'ip': '120/min'},
+}
+THROTTLE_RATES = getattr(settings, 'THROTTLE_RATES', DEFAULT_RATES)
+
+# Proxies in front of the app that append to X-Forwarded-For (0: use REMOTE_ADDR)
+THROTTLE_TRUSTED_PROXIES = getattr(settings, 'THROTTLE_TRUSTED_PROXIES', 1)
+
+
+def parse_rate(rate):
+    """'60/min' -> (capacity 60, refill 1.0 token per second)"""
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count, count / PERIODS[period.strip().lower()]
+
+
+def client_ip(request):
+    """
+    The client's address as seen by the nearest trusted proxy. Each of the
+    THROTTLE_TRUSTED_PROXIES proxies appends the address it saw, so hops
+    further left were written by the client and can't be trusted.
+    """
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    if THROTTLE_TRUSTED_PROXIES and hops:
+        return hops[-min(THROTTLE_TRUSTED_PROXIES, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _buckets(request, scope):
+    """{cache key: (capacity, refill per second)} for this request's buckets."""
+    rates = THROTTLE_RATES[scope]
+    buckets = {}
+    session = getattr(request, 'session', None)
+    if session is not None and session.session_key:
+        buckets[f'throttle:{scope}:session:{session.session_key}'] = parse_rate(rates['session'])
+    ip = client_ip(request)
+    if ip:
+        buckets[f'throttle:{scope}:ip:{ip}'] = parse_rate(rates['ip'])
+    return buckets
+
+
+def take(request, scope):
+    """
+    Spends one token from each of the request's buckets for `scope`.
+    Returns (allowed, retry_after_seconds); nothing is spent when not allowed.
+    """
+    buckets = _buckets(request, scope)
+    if not buckets:
+        return True, 0
+
+    cache = caches['throttle']
+    now = time.time()
+    stored = cache.get_many(list(buckets))
+    levels = {}
+    retry_after = 0
+    for key, (capacity, refill) in buckets.items():
+        tokens, updated_at = stored.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill)
+        levels[key] = tokens
+        if tokens < 1:
+            retry_after = max(retry_after, math.ceil((1 - tokens) / refill))
+
+    allowed = retry_after == 0
+    spent = 1 if allowed else 0
+    cache.set_many({
+        # An idle bucket refills completely within capacity / refill seconds
+        key: (levels[key] - spent, now) for key in buckets
+    }, timeout=max(math.ceil(capacity / refill) for capacity, refill in buckets.values()))
+    return allowed, retry_after
+
+
+def throttle(scope, degrade=False):
+    """
+    View decorator. Sets request.throttled; over the limit the view is only
+    called with degrade=True, otherwise the client gets a 429.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            allowed, retry_after = take(request, scope)
+            request.throttled = not allowed
+            if not allowed and not degrade:
+                response = JsonResponse({'error': 'Too many requests, slow down'}, status=429)
+                response['Retry-After'] = str(retry_after)
+                return response
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -4,5 +4,7 @@ from . import views
 
 urlpatterns = [
     path('book-search/', views.book_search, name='book-search'),
+    path('book-search/stream/', views.book_search_stream, name='book-search-stream'),
     path('validate-guess/', views.save_and_validate_guess, name='validate-guess'),
+    path('validate-grid/', views.validate_grid, name='validate-grid'),
 ]
\ No newline at end of file
@@ -1,20 +1,23 @@
-import requests
 import json
-import time
-from django.http import JsonResponse
+import logging
+import requests
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST, require_GET
-from django.db import transaction
-from django.conf import settings
+from django.db import DatabaseError, transaction
 
-from .models import Book, Author, Subject
+from .models import Book, Author
+from . import autocomplete, fuzzy, google_books, jobs, search
+from .subjects import set_book_subjects
+from .throttling import throttle
 from game import views
+from game.models import DailyPuzzle
 from datetime import datetime, date
 
-GOOGLE_BOOKS_API_KEY = getattr(settings, 'GOOGLE_BOOKS_API_KEY', '')
-GOOGLE_BOOKS_URL     = "https://www.googleapis.com/books/v1/volumes"
-OPENLIBRARY_URL      = "https://openlibrary.org/search.json"
-OL_COVERS_URL        = "https://covers.openlibrary.org/b"
-MAX_RETRIES          = 3
+logger = logging.getLogger(__name__)
+
+MAX_GRID_GUESSES     = 9
+SEARCH_RESULTS       = 10
+LOCAL_RESULTS_ENOUGH = 5   # local hits that make a Google call unnecessary
 
 
 # ── Utility ───────────────────────────────────────────────────────────────────
@@ -23,98 +26,6 @@ def get_or_create_author(name):
     author, created = Author.objects.get_or_create(name=name)
     return author
 
-def get_or_create_subjects(subject_list):
-    subject_objects = []
-    for subject_name in subject_list:
-        clean_name = subject_name.strip().title()
-        if clean_name:
-            subject, _ = Subject.objects.get_or_create(
-                name__iexact=clean_name,
-                defaults={'name': clean_name}
-            )
-            subject_objects.append(subject)
-    return subject_objects
-
-def fetch_ol_cover(isbn=None, title=None):
-    """
-    Fallback cover from Open Library — only called when Google has no cover.
-    Verifies the image is real via Content-Length (OL returns a 1×1 GIF ~807
-    bytes for missing covers).
-    """
-    headers = {'User-Agent': 'Litgrid/1.0 (contact@example.com)'}
-
-    if isbn:
-        url = f"{OL_COVERS_URL}/isbn/{isbn}-L.jpg"
-        try:
-            head = requests.head(url, headers=headers, timeout=4, allow_redirects=True)
-            if head.status_code == 200 and int(head.headers.get('Content-Length', 0)) > 1000:
-                return url
-        except Exception:
-            pass
-
-    if title:
-        try:
-            params = {'q': title, 'limit': 1, 'fields': 'cover_i'}
-            docs   = requests.get(OPENLIBRARY_URL, params=params, headers=headers, timeout=5).json().get('docs', [])
-            if docs and docs[0].get('cover_i'):
-                return f"{OL_COVERS_URL}/id/{docs[0]['cover_i']}-L.jpg"
-        except Exception:
-            pass
-
-    return None
-
-def fetch_ol_data(title, isbn=None):
-    """
-    Fetches publish year and subjects from Open Library.
-    Does NOT fetch covers — Google's cover is used directly.
-    """
-    headers = {'User-Agent': 'Litgrid/1.0 (contact@example.com)'}
-    result  = {'year': None, 'subjects': []}
-    doc     = None
-
-    if isbn:
-        try:
-            params = {'limit': 1, 'fields': 'key,first_publish_year,subject', 'isbn': isbn}
-            docs   = requests.get(OPENLIBRARY_URL, params=params, headers=headers, timeout=5).json().get('docs', [])
-            if docs:
-                doc = docs[0]
-        except Exception:
-            pass
-
-    if not doc:
-        try:
-            params = {'limit': 1, 'fields': 'key,first_publish_year,subject', 'q': title}
-            docs   = requests.get(OPENLIBRARY_URL, params=params, headers=headers, timeout=5).json().get('docs', [])
-            if docs:
-                doc = docs[0]
-        except Exception:
-            pass
-
-    if doc:
-        year = doc.get('first_publish_year')
-        if year and isinstance(year, int):
-            result['year'] = year
-
-        result['subjects'] = doc.get('subject', [])
-
-        if not result['subjects'] and 'key' in doc:
-            try:
-                work_resp = requests.get(
-                    f"https://openlibrary.org{doc['key']}.json",
-                    headers=headers, timeout=5
-                )
-                if work_resp.status_code == 200:
-                    result['subjects'] = [
-                        s if isinstance(s, str) else s.get('name', '')
-                        for s in work_resp.json().get('subjects', [])
-                        if isinstance(s, (str, dict))
-                    ][:10]
-            except Exception:
-                pass
-
-    return result
-
-
 def format_book_data(volume_info, volume_id):
     """Extracts data from Google Books API response."""
     authors_list = volume_info.get('authors', [])
@@ -179,54 +90,102 @@ def format_for_frontend(book_obj, source='local'):
 
 # ── Search ────────────────────────────────────────────────────────────────────
 
+def local_results(query):
+    """
+    Frontend dicts for a query from local data only, and whether Google should
+    still be asked: full-text hits (library/search.py) plus typo-tolerant
+    matches from memory (library/fuzzy.py). Google only tops up thin results.
+    """
+    local   = search.search_books(query, limit=SEARCH_RESULTS)
+    results = [format_for_frontend(b) for b in local]
+    seen    = {r['id'] for r in results}
+    for _, book in autocomplete.fuzzy_search(query, limit=SEARCH_RESULTS):
+        if book['id'] not in seen:
+            seen.add(book['id'])
+            results.append(book)
+
+    folded = fuzzy.fold(query)
+    exact  = any(fuzzy.fold(r['title']) == folded for r in results)
+    return results, not exact and len(local) < LOCAL_RESULTS_ENOUGH
+
+
+def remote_results(query, results):
+    """Frontend dicts for Google results not already in `results` (same title and author)."""
+    seen  = {(r['title'].strip().lower(), r['author'].strip().lower()) for r in results}
+    extra = []
+    for bd in google_search(query):
+        key = (bd['title'].strip().lower(), bd['author_name'].strip().lower())
+        if key not in seen:
+            seen.add(key)
+            extra.append(format_for_frontend(bd, source='api'))
+    return extra
+
+
+def rank_results(query, results):
+    return sorted(results, key=lambda b: fuzzy.rank_key(query, b['title'], b['author']))
+
+
 @require_GET
+@throttle('search', degrade=True)
 def book_search(request):
     query = request.GET.get('q', '').strip()
     if len(query) < 4:
-        return JsonResponse([], safe=False)
+        # Short typeahead queries come from this worker's in-memory prefix index
+        return JsonResponse(autocomplete.suggest(query, limit=SEARCH_RESULTS), safe=False)
 
-    cached = Book.objects.filter(title__iexact=query).select_related('author')
-    if cached.exists():
-        return JsonResponse([format_for_frontend(b) for b in cached[:5]], safe=False)
+    # Over the rate limit (library/throttling.py) clients get local results only
+    results, needs_remote = local_results(query)
+    if needs_remote and not request.throttled:
+        # Ranked together, so Google results can displace weak fuzzy padding
+        results += remote_results(query, results)
+    return JsonResponse(rank_results(query, results)[:SEARCH_RESULTS], safe=False)
 
-    params = {'q': query, 'maxResults': 15, 'key': GOOGLE_BOOKS_API_KEY}
-    data   = None
-    for attempt in range(MAX_RETRIES):
-        if data: break
-        try:
-            resp = requests.get(GOOGLE_BOOKS_URL, params=params, timeout=5)
-            if resp.status_code == 503:
-                time.sleep(2 ** attempt)
-                continue
-            resp.raise_for_status()
-            data = resp.json()
-        except requests.exceptions.RequestException:
-            break
-
-    if not data or 'items' not in data:
-        return JsonResponse([], safe=False)
-
-    seen, results = set(), []
-    for item in data['items']:
-        vid  = item.get('id')
-        info = item.get('volumeInfo', {})
-        if not vid or not info: continue
-        bd  = format_book_data(info, vid)
-        key = (bd['title'].strip().lower(), bd['author_name'].strip().lower())
-        if key not in seen:
-            seen.add(key)
-            results.append(format_for_frontend(bd, source='api'))
 
-    results.sort(key=lambda b: (
-        0 if b['title'].lower().strip() == query.lower().strip() else
-        1 if b['title'].lower().strip().startswith(query.lower().strip()) else 2
-    ))
-    return JsonResponse(results[:10], safe=False)
+@require_GET
+@throttle('search', degrade=True)
+def book_search_stream(request):
+    """
+    book_search as NDJSON, one object per line, so local matches show without
+    waiting on Google:
+
+      {"phase": "local",  "results": [...]}   always, straight away
+      {"phase": "remote", "results": [...]}   only if Google was asked; new books only
+
+    Results have the format_for_frontend shape. The local line is computed
+    before the response starts, so the generator itself only talks to Google.
+    """
+    query = request.GET.get('q', '').strip()
+    if len(query) < 4:
+        results, needs_remote = autocomplete.suggest(query, limit=SEARCH_RESULTS), False
+    else:
+        results, needs_remote = local_results(query)
+        results = rank_results(query, results)[:SEARCH_RESULTS]
+        # The local line is final and Google's only append to it, so a full
+        # list leaves no room for them
+        needs_remote = needs_remote and not request.throttled and len(results) < SEARCH_RESULTS
+
+    def chunks():
+        yield json.dumps({'phase': 'local', 'results': results}) + "\n"
+        if needs_remote:
+            extra = remote_results(query, results)
+            extra = rank_results(query, extra)[:SEARCH_RESULTS - len(results)]
+            yield json.dumps({'phase': 'remote', 'results': extra}) + "\n"
+
+    response = StreamingHttpResponse(chunks(), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # don't let a proxy hold the first line back
+    return response
+
+
+def google_search(query):
+    """Formatted book dicts (see format_book_data) for a Google Books query (cached)."""
+    return [format_book_data(item['volumeInfo'], item['id']) for item in google_books.search_volumes(query)]
 
 
 # ── Save & Validate (original Litgrid game) ───────────────────────────────────
 
 @require_POST
+@throttle('validate')
 def save_and_validate_guess(request):
     try:
         data        = json.loads(request.body)
@@ -243,12 +202,10 @@ def save_and_validate_guess(request):
 
     book = None
     try:
-        book = Book.objects.get(google_book_id=book_id)
+        book = Book.objects.select_related('author').get(google_book_id=book_id)
     except Book.DoesNotExist:
         try:
-            resp      = requests.get(f"{GOOGLE_BOOKS_URL}/{book_id}?key={GOOGLE_BOOKS_API_KEY}", timeout=5)
-            resp.raise_for_status()
-            vol_data  = resp.json()
+            vol_data  = google_books.get_volume(book_id)
             book_info = format_book_data(vol_data['volumeInfo'], vol_data['id'])
 
             existing = Book.objects.filter(
@@ -259,18 +216,8 @@ def save_and_validate_guess(request):
             if existing:
                 book = existing
             else:
-                ol_data = fetch_ol_data(book_info['title'], isbn=book_info['isbn'])
-                if ol_data['year']:
-                    book_info['publish_year'] = ol_data['year']
-
-                # Only use OL cover if Google has none
-                if not book_info['thumbnail_url']:
-                    ol_cover = fetch_ol_cover(isbn=book_info['isbn'], title=book_info['title'])
-                    if ol_cover:
-                        book_info['thumbnail_url'] = ol_cover
-
-                combined = list(set(book_info['subjects'] + ol_data['subjects']))
-
+                # Save what Google gave us and answer now; Open Library year,
+                # subjects and cover are filled in by run_worker (library/tasks.py)
                 with transaction.atomic():
                     author_obj = get_or_create_author(book_info['author_name'])
                     book, _    = Book.objects.update_or_create(
@@ -284,10 +231,65 @@ def save_and_validate_guess(request):
                             'isbn':          book_info['isbn'],
                         }
                     )
-                    book.subjects.set(get_or_create_subjects(combined))
-        except Exception:
-            import traceback; traceback.print_exc()
+                    set_book_subjects(book, book_info['subjects'])
+                    try:
+                        # A savepoint, so losing the (optional) enrichment keeps the book
+                        with transaction.atomic():
+                            jobs.enqueue('enrich_book', book_id=book.pk)
+                    except DatabaseError:
+                        logger.exception("Could not queue enrichment for book %s", book.pk)
+        except (requests.exceptions.RequestException, KeyError):
+            logger.exception("Could not fetch Google Books volume %s", book_id)
             return JsonResponse({'is_correct': False, 'message': 'Could not verify and save book details.'})
 
     is_correct = views.validate_cell(book, col, row, target_date=target_date)
-    return JsonResponse({'is_correct': is_correct, 'message': 'Book selected and saved.', 'book_title': book.title})
\ No newline at end of file
+    return JsonResponse({'is_correct': is_correct, 'message': 'Book selected and saved.', 'book_title': book.title})
+
+@require_POST
+@throttle('validate')
+def validate_grid(request):
+    """
+    Validates up to MAX_GRID_GUESSES guesses for one puzzle in a single request,
+    e.g. when the board is restored from localStorage. Books are resolved in one
+    query; only books already in the catalog can be correct (the single-cell
+    endpoint is what fetches and saves new ones).
+    """
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise TypeError("body must be a JSON object")
+        date_str    = data.get('puzzle_date')
+        target_date = (
+            datetime.strptime(date_str, "%Y-%m-%d").date()
+            if date_str else date.today()
+        )
+        guesses = [
+            (str(g['book_id']), int(g['row']), int(g['col']))
+            for g in data.get('guesses', [])
+        ]
+    except (ValueError, TypeError, KeyError, AttributeError, json.JSONDecodeError):
+        return JsonResponse({'error': 'Invalid data'}, status=400)
+
+    if not guesses or len(guesses) > MAX_GRID_GUESSES:
+        return JsonResponse({'error': f'Send between 1 and {MAX_GRID_GUESSES} guesses'}, status=400)
+    if any(not (1 <= row <= 3 and 1 <= col <= 3) for _, row, col in guesses):
+        return JsonResponse({'error': 'Invalid data'}, status=400)
+
+    books = Book.objects.only('google_book_id', 'title').in_bulk({g[0] for g in guesses})
+    known = [g for g in guesses if g[0] in books]
+
+    try:
+        verdicts = dict(zip(known, views.validate_cells(known, target_date=target_date))) if known else {}
+    except DailyPuzzle.DoesNotExist:
+        return JsonResponse({'error': 'No puzzle for that date'}, status=404)
+
+    return JsonResponse({'results': [
+        {
+            'book_id':    book_id,
+            'row':        row,
+            'col':        col,
+            'is_correct': verdicts.get((book_id, row, col), False),
+            'book_title': books[book_id].title if book_id in books else None,
+        }
+        for book_id, row, col in guesses
+    ]})
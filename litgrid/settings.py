@@ -56,6 +56,28 @@ DATABASES = {
     'default': dj_database_url.config(default=os.environ.get('DATABASE_URL', config('DATABASE_URL')))
 }
 
+# Shared by every worker, so version tokens (game/puzzle_cache.py) invalidate everywhere.
+# Create the table with `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND':  'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'litgrid_cache',
+    },
+    # Google Books search responses (library/google_books.py), culled past MAX_ENTRIES
+    'google_books': {
+        'BACKEND':  'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'litgrid_google_books_cache',
+        'OPTIONS':  {'MAX_ENTRIES': config('GOOGLE_BOOKS_CACHE_MAX_ENTRIES', default=20000, cast=int)},
+    },
+    # Token buckets (library/throttling.py), two per active client per scope;
+    # kept apart so culling them never drops the entries in 'default'
+    'throttle': {
+        'BACKEND':  'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'litgrid_throttle_cache',
+        'OPTIONS':  {'MAX_ENTRIES': config('THROTTLE_CACHE_MAX_ENTRIES', default=50000, cast=int)},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -76,6 +98,27 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 GOOGLE_BOOKS_API_KEY = config('GOOGLE_BOOKS_API_KEY', default='')
+GOOGLE_BOOKS_SEARCH_TTL   = config('GOOGLE_BOOKS_SEARCH_TTL', default=60 * 60 * 24, cast=int)
+GOOGLE_BOOKS_NEGATIVE_TTL = config('GOOGLE_BOOKS_NEGATIVE_TTL', default=60 * 60, cast=int)
+
+# On-disk GET cache for the ingestion commands (see library/http_cache.py)
+HTTP_CACHE_DIR       = config('HTTP_CACHE_DIR', default=str(BASE_DIR / '.http_cache'))
+HTTP_CACHE_TTL       = config('HTTP_CACHE_TTL', default=60 * 60 * 24 * 30, cast=int)
+HTTP_CACHE_MAX_BYTES = config('HTTP_CACHE_MAX_BYTES', default=1024 * 1024 * 1024, cast=int)
+
+# Token buckets per session and per IP for the API (see library/throttling.py)
+THROTTLE_RATES = {
+    'search': {
+        'session': config('THROTTLE_SEARCH_SESSION_RATE', default='60/min'),
+        'ip':      config('THROTTLE_SEARCH_IP_RATE', default='300/min'),
+    },
+    'validate': {
+        'session': config('THROTTLE_VALIDATE_SESSION_RATE', default='30/min'),
+        'ip':      config('THROTTLE_VALIDATE_IP_RATE', default='120/min'),
+    },
+}
+# Proxies that append to X-Forwarded-For; the platform router is one
+THROTTLE_TRUSTED_PROXIES = config('THROTTLE_TRUSTED_PROXIES', default=1, cast=int)
 
 CSRF_TRUSTED_ORIGINS = ['https://playlitgrid.com', 'https://www.playlitgrid.com']
 
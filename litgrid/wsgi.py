@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'litgrid.settings')
 
 application = get_wsgi_application()
+
+# Build this worker's typeahead index in the background (library/autocomplete.py)
+from library.autocomplete import refresh_in_background  # noqa: E402
+refresh_in_background()